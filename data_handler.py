@@ -8,13 +8,14 @@ import location_database as ldb
 
 import json
 import copy
+import math
+from collections.abc import Mapping
 from typing import Tuple, Union
 
 import numpy as np
 import pandas as pd
 from datetime import datetime
 from operator import itemgetter
-import itertools
 
 
 
@@ -29,6 +30,70 @@ MONTH_NAMES = ["January", "February", "March", "April", "May", "June", "July", "
 DATA_DEFAULT = None
 DATA_PARAMETER_OPTIONS = None
 
+# operation schedule parameters only entering the aggregation of results (no re-simulation, see
+# update_results_post_processing)
+OPERATION_SCHEDULE_PARAMETERS_POST_PROCESSING = ["cost_electricity"]
+
+# numeric parameters with optional uncertain values (uncertainty analysis, see model.simulate_system_uncertainty)
+OPERATION_SCHEDULE_PARAMETERS_UNCERTAINTY = ["passenger_number", "obstacle_distance", "obstacle_height",
+                                             "cost_electricity"]
+VEHICLE_PARAMETERS_FRACTION = ["time_fraction_door_open", "cabin_absorptivity", "window_transmissivity",
+                               "fraction_obstruction_roof", "fraction_obstruction_floor"]
+
+
+
+##### CLASS DEFINITIONS #####
+
+class VehicleVersionOverlays(Mapping):
+    # vehicle versions of one vehicle as read-only mapping of version name to overlay ({"parameter_set": ...}), each
+    # overlay generated on access from the alternative values per parameter (default version first, then the
+    # combinations of alternative values except those identical to the default version, see
+    # regenerate_vehicle_versions), versions are not stored
+    def __init__(self, vehicle_data:dict, alternative_values:dict):
+        self.parameter_set_default = {parameter: vehicle_data[parameter] for parameter in alternative_values.keys()}
+        self.alternative_values = {parameter: list(values) for parameter, values in alternative_values.items()}
+
+        # combination indices (in the order of itertools.product) identical to the default version, skipped
+        # (product order: the last parameter varies fastest)
+        self.indices_default = [0]
+        for parameter, values in self.alternative_values.items():
+            self.indices_default = [index * len(values) + value_index for index in self.indices_default
+                                    for value_index, value in enumerate(values)
+                                    if value == self.parameter_set_default[parameter]]
+        self.number_combinations = math.prod(len(values) for values in self.alternative_values.values())
+
+    def __len__(self)->int:
+        return 1 + self.number_combinations - len(self.indices_default)
+
+    def __iter__(self):
+        yield "default"
+        for alternative_number in range(1, len(self)):
+            yield "alternative_" + str(alternative_number)
+
+    def __getitem__(self, version_name:str)->dict:
+        if version_name == "default":
+            return {"parameter_set": dict(self.parameter_set_default)}
+
+        alternative_number = None
+        if isinstance(version_name, str) and version_name.startswith("alternative_"):
+            alternative_number = version_name[len("alternative_"):]
+        if alternative_number is None or not alternative_number.isdigit() or not (
+                1 <= int(alternative_number) < len(self)):
+            raise KeyError(version_name)
+
+        # combination index of the alternative (skipping combinations identical to the default version)
+        index = int(alternative_number) - 1
+        for index_default in self.indices_default:
+            if index_default <= index:
+                index += 1
+
+        parameter_set = {}
+        for parameter, values in reversed(self.alternative_values.items()):
+            index, value_index = divmod(index, len(values))
+            parameter_set[parameter] = values[value_index]
+
+        return {"parameter_set": {parameter: parameter_set[parameter] for parameter in self.alternative_values.keys()}}
+
 
 
 ##### FUNCTION DEFINITIONS #####
@@ -138,6 +203,7 @@ def create_session_state_dictionaries(session_state:dict)->None:
 
     # flags
     session_state["flag_input_changed"] = False
+    session_state["flag_post_processing_changed"] = False
     session_state["flag_stop"] = False
 
     # nominatim email
@@ -146,6 +212,39 @@ def create_session_state_dictionaries(session_state:dict)->None:
     # temporary data
     session_state["tmp"] = {}
 
+    # simulation of all hours of the year (instead of month-hour means)
+    session_state["simulation_hourly"] = False
+    # transient simulation of cabin & chassis temperature (instead of the steady state per hour)
+    session_state["simulation_transient"] = False
+
+    # uncertainty analysis settings (uncertain parameter values, number of samples & seed of random samples)
+    session_state["uncertainty"] = create_uncertainty_settings()
+    # sensitivity analysis settings (design sizes, parameter range & seed)
+    session_state["sensitivity"] = create_sensitivity_settings()
+
+    # cached data of previous result calculations (location data per location, vehicle results per simulation unit)
+    session_state["location_data"] = {}
+    session_state["simulation_cache"] = {}
+
+
+
+def create_uncertainty_settings()->dict:
+    return {
+        "parameter_uncertainties": [],
+        "number_samples": get_parameter_option("uncertainty", "number_samples_default"),
+        "seed": get_parameter_option("uncertainty", "seed_default")
+    }
+
+
+
+def create_sensitivity_settings()->dict:
+    return {
+        "number_trajectories": get_parameter_option("sensitivity", "number_trajectories_default"),
+        "number_base_samples": get_parameter_option("sensitivity", "number_base_samples_default"),
+        "relative_range": get_parameter_option("sensitivity", "relative_range_default"),
+        "seed": get_parameter_option("sensitivity", "seed_default")
+    }
+
 
 
 def import_specification_dictionary(session_state:dict, import_dict:dict)->None:
@@ -169,6 +268,19 @@ def import_specification_dictionary(session_state:dict, import_dict:dict)->None:
 
 
 
+def get_specification_dictionary(session_state:dict)->dict:
+    # specification as plain (JSON serializable) dictionary, vehicle versions materialized from their overlays (see
+    # VehicleVersionOverlays)
+    specification_dict = dict(session_state["specification"])
+    specification_dict["vehicle_versions"] = {
+        vehicle_name: dict(vehicle_versions.items())
+        for vehicle_name, vehicle_versions in session_state["specification"]["vehicle_versions"].items()
+    }
+
+    return specification_dict
+
+
+
 def load_default_specification(session_state:dict)->None:
     create_session_state_dictionaries(session_state)
 
@@ -1153,6 +1265,29 @@ def get_vehicle_parameter_boundary_precision(parameter:str)->Tuple[float,float,i
 
 
 
+def get_uncertainty_parameter_names(group:str)->list:
+    if group == "vehicle":
+        parameter_names = get_vehicle_parameter_names()
+        parameter_names.remove("temperature_control_curve")
+        return parameter_names
+    return copy.deepcopy(OPERATION_SCHEDULE_PARAMETERS_UNCERTAINTY)
+
+
+
+def get_parameter_uncertainty_boundaries(group:str, parameter:str)->Tuple[float,float]:
+    # admissible range of sampled parameter values (group "vehicle" or "operation_schedule")
+    if group == "vehicle" and parameter in VEHICLE_PARAMETERS_FRACTION:
+        return get_parameter_option("vehicle", "fraction_min"), get_parameter_option("vehicle", "fraction_max")
+    if group == "operation_schedule" and parameter == "cost_electricity":
+        return get_parameter_option("operation_schedule", "cost_min"), get_parameter_option("operation_schedule",
+                                                                                            "cost_max")
+
+    value_min = DATA_PARAMETER_OPTIONS[group].get(parameter + "_min", 0.0)
+    value_max = DATA_PARAMETER_OPTIONS[group].get(parameter + "_max", np.inf)
+    return value_min, value_max
+
+
+
 def update_vehicle_parameter_alternative_float(session_state:dict, vehicle:str, parameter:str, value_str:str)->None:
     value_list = []
     for value in value_str.split(","):
@@ -1362,8 +1497,10 @@ def update_operation_schedule_specification(session_state:dict, df_updated:pd.Da
                     session_state["specification"]["operation_schedules"][name][key] = copy.copy(value)
 
                 if value_old != value:
-                    session_state["flag_input_changed"] = True
-                    pass
+                    if key in OPERATION_SCHEDULE_PARAMETERS_POST_PROCESSING:
+                        session_state["flag_post_processing_changed"] = True
+                    else:
+                        session_state["flag_input_changed"] = True
 
 
 
@@ -1490,9 +1627,15 @@ def update_operation_schedule_vehicles(session_state:dict, schedule_name:str,
     for name, data in df_updated.iterrows():
         vehicles_in_operation[data["vehicle"]] = data["number"]
 
+    # (changed vehicle numbers only enter the aggregation of results)
+    vehicles_in_operation_old = session_state["specification"]["operation_schedules"][schedule_name]["vehicles_in_operation"]
+    if list(vehicles_in_operation.keys()) == list(vehicles_in_operation_old.keys()):
+        session_state["flag_post_processing_changed"] = True
+    else:
+        session_state["flag_input_changed"] = True
+
     session_state["specification"]["operation_schedules"][schedule_name]["vehicles_in_operation"] = copy.deepcopy(vehicles_in_operation)
 
-    session_state["flag_input_changed"] = True
     reload_vehicle_version_and_scenario_data(session_state)
 
 
@@ -1517,52 +1660,19 @@ def remove_all_operation_schedules(session_state:dict)->None:
 
 
 def regenerate_vehicle_versions(session_state:dict):
-
+    # vehicle versions as lazily generated overlays (parameter set per version, see VehicleVersionOverlays), the vehicle
+    # data of a version is only materialized from the base vehicle when needed (see model.get_vehicle_version_data)
     version_data = {}
 
     for vehicle_name, vehicle_data in session_state["specification"]["vehicles"].items():
-        version_data[vehicle_name] = {
-            "default": {
-                "vehicle_data": copy.deepcopy(vehicle_data),
-                "parameter_set": {}
-            }
-        }
-
-        # create vehicle parameter sets
         vehicle_parameter_alternative_values = {}
         for alternative in session_state["specification"]["vehicle_parameter_alternatives"]:
             if alternative["vehicle"] == vehicle_name:
-                vehicle_parameter_alternative_values[alternative["parameter"]] = copy.deepcopy(alternative["values"])
-
-        if len(vehicle_parameter_alternative_values) > 0:
-            parameters, values = zip(*vehicle_parameter_alternative_values.items())
-
-            for parameter in parameters:
-                version_data[vehicle_name]["default"]["parameter_set"][parameter] = vehicle_data[parameter]
-
-            combinations = list(itertools.product(*values))
-            alternative_number = 1
-            for combination in combinations:
-                # check whether combination is identical to default
-                flag_identical = True
-                for parameter, value in zip(parameters, combination):
-                    if value != vehicle_data[parameter]:
-                        flag_identical = False
-                        break
-                if not flag_identical:
-                    vehicle_version = copy.deepcopy(vehicle_data)
-                    parameter_set = {}
-                    for parameter, value in zip(parameters, combination):
-                        vehicle_version[parameter] = value
-                        parameter_set[parameter] = value
-                    version_name = "alternative_" + str(alternative_number)
-                    version_data[vehicle_name][version_name] = {
-                        "vehicle_data": copy.deepcopy(vehicle_version),
-                        "parameter_set": copy.deepcopy(parameter_set)
-                    }
-                    alternative_number += 1
-
-    session_state["specification"]["vehicle_versions"] = copy.deepcopy(version_data)
+                vehicle_parameter_alternative_values[alternative["parameter"]] = alternative["values"]
+
+        version_data[vehicle_name] = VehicleVersionOverlays(vehicle_data, vehicle_parameter_alternative_values)
+
+    session_state["specification"]["vehicle_versions"] = version_data
 
 
 
@@ -1639,8 +1749,7 @@ def update_scenario_specification(session_state:dict, df_updated:pd.DataFrame)->
                 session_state["specification"]["scenarios"][name][key] = copy.copy(value)
 
                 if value_old != value:
-                    session_state["flag_input_changed"] = True
-                    pass
+                    session_state["flag_post_processing_changed"] = True
     """
     scenarios = {}
     for row in df_updated.iterrows():
@@ -1663,7 +1772,7 @@ def add_scenario(session_state:dict, name:str)->None:
     session_state["specification"]["scenarios"][name] = copy.deepcopy(scenario_data)
 
 
-    session_state["flag_input_changed"] = True
+    session_state["flag_post_processing_changed"] = True
 
 
 
@@ -1682,7 +1791,7 @@ def rename_scenario(session_state:dict, old_name:str, new_name:str)->None:
 
     sort_dict(session_state["specification"]["scenarios"])
 
-    session_state["flag_input_changed"] = True
+    session_state["flag_post_processing_changed"] = True
 
 
 
@@ -1692,20 +1801,20 @@ def remove_scenario(session_state:dict, name:str)->None:
     if session_state["specification"]["scenario_reference"] == name:
         session_state["specification"]["scenario_reference"] = None
 
-    session_state["flag_input_changed"] = True
+    session_state["flag_post_processing_changed"] = True
 
 
 
 def remove_all_scenarios(session_state:dict)->None:
     session_state["specification"]["scenarios"] = {}
 
-    session_state["flag_input_changed"] = True
+    session_state["flag_post_processing_changed"] = True
 
 
 
 def set_reference_scenario(session_state:dict, name:str)->None:
     if session_state["specification"]["scenario_reference"] != name:
-        session_state["flag_input_changed"] = True
+        session_state["flag_post_processing_changed"] = True
 
     session_state["specification"]["scenario_reference"] = name
 
@@ -1714,22 +1823,61 @@ def set_reference_scenario(session_state:dict, name:str)->None:
 # results
 
 
-def generate_location_data(specification:dict, nominatim_email:str, path_directory_raw_climate_data:str=None)->dict:
-    location_data = {}
+def preload_location_resources()->None:
+    # time zone finder loaded in the background at server start (not on first result calculation)
+    if get_parameter_option("location_cache", "preload_time_zone_finder"):
+        ldb.preload_time_zone_finder()
+
+
+
+def generate_location_data(specification:dict, nominatim_email:str, path_directory_raw_climate_data:str=None,
+                           location_data_cached:dict=None)->dict:
+    # (location_data_cached: location data of previous calculation, only retrieved for new locations)
+    if location_data_cached is None:
+        location_data_cached = {}
+
+    location_names = []
     for key, data in specification["operation_schedules"].items():
         if data["location"] is None:
             raise ValueError(f"Location for operation schedule \'{key}\' is not defined.")
-        if data["location"] not in location_data.keys():
-            location_data[data["location"]] = ldb.retrieve_location_data(data["location"],
-                                                                         nominatim_email,
-                                                                         path_directory_raw_climate_data)
+        if data["location"] not in location_names:
+            location_names.append(data["location"])
+
+    # retrieve new locations (or locations cached without hourly data) concurrently
+    location_data_retrieved = ldb.retrieve_locations_data(
+        [location_name for location_name in location_names if location_name not in location_data_cached.keys()
+         or "temperature_hourly" not in location_data_cached[location_name].keys()],
+        nominatim_email, path_directory_raw_climate_data,
+        path_directory_cache=get_parameter_option("location_cache", "directory"),
+        time_to_live=24 * 3600 * get_parameter_option("location_cache", "time_to_live_days"),
+        cache_size_max=int(2**20 * get_parameter_option("location_cache", "size_max_mb")),
+        offline=get_parameter_option("location_cache", "offline"))
+
+    location_data = {}
+    for location_name in location_names:
+        if location_name in location_data_cached.keys() and location_name not in location_data_retrieved.keys():
+            location_data[location_name] = location_data_cached[location_name]
+        else:
+            location_data[location_name] = location_data_retrieved[location_name]
 
     return location_data
 
 
 
+def verify_scenario_specification(session_state:dict)->None:
+    for key_scenario, data_scenario in session_state["specification"]["scenarios"].items():
+        for key_parameter, data_parameter in data_scenario.items():
+            if data_parameter is None:
+                raise ValueError(f"For scenario \'{key_scenario}\', parameter \'{key_parameter}\' is not defined. "
+                                 f"Please complete the specification.")
+    if len(session_state["specification"]["scenarios"]) > 0 and session_state["specification"]["scenario_reference"] is None:
+        raise ValueError("No reference scenario was specified. Please select a reference scenario.")
+
+
+
 def calculate_results(session_state:dict, path_directory_raw_climate_data:str=None)->None:
     session_state["flag_input_changed"] = False
+    session_state["flag_post_processing_changed"] = False
 
     # reset result data
     session_state["results"] = {}
@@ -1782,34 +1930,328 @@ def calculate_results(session_state:dict, path_directory_raw_climate_data:str=No
             raise ValueError(f"For operation schedule \'{key_schedule}\', no vehicles were specified. "
                              f"Please add at least one vehicle to the operation schedule.")
 
-    for key_scenario, data_scenario in session_state["specification"]["scenarios"].items():
-        for key_parameter, data_parameter in data_scenario.items():
-            if data_parameter is None:
-                raise ValueError(f"For scenario \'{key_scenario}\', parameter \'{key_parameter}\' is not defined. "
-                                 f"Please complete the specification.")
-    if len(session_state["specification"]["scenarios"]) > 0 and session_state["specification"]["scenario_reference"] is None:
-        raise ValueError("No reference scenario was specified. Please select a reference scenario.")
+    verify_scenario_specification(session_state)
 
     # location data
+    if "location_data" not in session_state.keys():
+        session_state["location_data"] = {}
     location_data = generate_location_data(session_state["specification"], session_state["nominatim_email"],
-                                           path_directory_raw_climate_data)
+                                           path_directory_raw_climate_data, session_state["location_data"])
     session_state["location_data"] = location_data
 
-    # run model
-    vehicle_results, vehicle_operation_totals, scenario_totals, demand_not_satisfied_warning = md.simulate_system(
+    run_model(session_state)
+
+
+
+def update_results_post_processing(session_state:dict)->None:
+    # re-aggregate results after changes of post-processing parameters only (vehicle numbers, electricity cost,
+    # scenarios) from the annual totals per unit & hourly results of the last run (no simulation), unless scenarios
+    # reference vehicle versions not simulated in the last run (see get_scenario_vehicle_version_selection)
+    verify_scenario_specification(session_state)
+
+    # uncertainty & sensitivity results refer to the previous post-processing parameters
+    clear_uncertainty_results(session_state)
+    session_state["results"].pop("sensitivity", None)
+
+    vehicle_version_selection = get_scenario_vehicle_version_selection(session_state)
+    vehicle_version_selection_simulated = session_state["results"]["vehicle_version_selection"]
+    if vehicle_version_selection_simulated is not None and (
+            vehicle_version_selection is None
+            or any(vehicle_name not in vehicle_version_selection.keys()
+                   or not vehicle_version_selection[vehicle_name] <= vehicle_versions_simulated
+                   for vehicle_name, vehicle_versions_simulated in vehicle_version_selection_simulated.items())):
+        run_model(session_state)
+    else:
+        (session_state["results"]["vehicles"], session_state["results"]["vehicle_operation_totals"],
+         session_state["results"]["scenario_totals"]) = md.aggregate_system_results(
+            session_state["results"]["aggregation_inputs"],
+            session_state["results"]["vehicles"],
+            session_state["specification"]["operation_schedules"],
+            session_state["specification"]["scenarios"],
+            session_state["specification"]["scenario_reference"]
+        )
+
+    session_state["flag_post_processing_changed"] = False
+
+
+
+def get_scenario_vehicle_version_selection(session_state:dict)->Union[dict,None]:
+    # vehicle versions referenced by scenarios per vehicle in operation with more vehicle versions than simulated in
+    # full (see option results.vehicle_versions_simulated_all_max), all vehicle versions of the other vehicles are
+    # simulated (None: all vehicle versions of all vehicles, also without scenarios)
+    if len(session_state["specification"]["scenarios"]) == 0:
+        return None
+
+    vehicle_versions_simulated_all_max = get_parameter_option("results", "vehicle_versions_simulated_all_max")
+    vehicle_version_labels = {}
+    for operation_schedule_name, operation_schedule_data in session_state["specification"]["operation_schedules"].items():
+        for vehicle_name, vehicle_number in operation_schedule_data["vehicles_in_operation"].items():
+            if len(session_state["specification"]["vehicle_versions"][vehicle_name]) <= vehicle_versions_simulated_all_max:
+                continue
+            vehicle_version_labels.setdefault(vehicle_name, set())
+            if vehicle_number > 0:
+                vehicle_version_labels[vehicle_name].update(
+                    scenario_data[f"{operation_schedule_name} - {vehicle_name}"]
+                    for scenario_data in session_state["specification"]["scenarios"].values())
+
+    if len(vehicle_version_labels) == 0:
+        return None
+
+    return {vehicle_name: {version_name for version_name, version_data
+                           in session_state["specification"]["vehicle_versions"][vehicle_name].items()
+                           if convert_dictionary_to_str(version_data["parameter_set"], keys_to_display_names=True)
+                           in vehicle_version_labels[vehicle_name]}
+            for vehicle_name in vehicle_version_labels.keys()}
+
+
+
+def generate_solar_profiles(session_state:dict)->dict:
+    if session_state["simulation_hourly"]:
+        return {location_name: md.calculate_solar_profile_hourly(location) for location_name, location
+                in session_state["location_data"].items()}
+    return {location_name: md.calculate_solar_profile(location) for location_name, location
+            in session_state["location_data"].items()}
+
+
+
+def run_model(session_state:dict)->None:
+    # run model (only simulation units with changed inputs are simulated, see model.simulate_system)
+    if "simulation_cache" not in session_state.keys():
+        session_state["simulation_cache"] = {}
+    if "simulation_hourly" not in session_state.keys():
+        session_state["simulation_hourly"] = False
+    if "simulation_transient" not in session_state.keys():
+        session_state["simulation_transient"] = False
+
+    solar_profiles = generate_solar_profiles(session_state)
+    aggregation_inputs = {}
+    vehicle_version_selection = get_scenario_vehicle_version_selection(session_state)
+    engine_statistics = {}
+
+    (vehicle_results, vehicle_operation_totals, scenario_totals, heat_pump_results, heat_pump_totals,
+     demand_not_satisfied_warning) = md.simulate_system(
         session_state["specification"]["operation_schedules"],
         session_state["specification"]["vehicle_versions"],
         session_state["specification"]["temperature_control_curves"],
         session_state["location_data"],
         session_state["specification"]["scenarios"],
-        session_state["specification"]["scenario_reference"]
+        session_state["specification"]["scenario_reference"],
+        solar_profiles=solar_profiles,
+        workers=get_parameter_option("results", "simulation_workers"),
+        simulation_cache=session_state["simulation_cache"],
+        hourly=session_state["simulation_hourly"],
+        transient=session_state["simulation_transient"],
+        vehicles=session_state["specification"]["vehicles"],
+        aggregation_inputs=aggregation_inputs,
+        vehicle_version_selection=vehicle_version_selection,
+        engine_statistics=engine_statistics
     )
 
-    # store results
+    # store results (uncertainty & sensitivity results of previous runs discarded)
+    clear_uncertainty_results(session_state)
+    session_state["results"].pop("sensitivity", None)
     session_state["results"]["vehicles"] = vehicle_results
     session_state["results"]["vehicle_operation_totals"] = vehicle_operation_totals
     session_state["results"]["scenario_totals"] = scenario_totals
+    session_state["results"]["heat_pumps"] = heat_pump_results
+    session_state["results"]["heat_pump_totals"] = heat_pump_totals
     session_state["results"]["warning"] = demand_not_satisfied_warning
+    session_state["results"]["engine_statistics"] = engine_statistics
+    session_state["results"]["aggregation_inputs"] = aggregation_inputs
+    session_state["results"]["vehicle_version_selection"] = vehicle_version_selection
+
+
+
+# uncertainty analysis
+
+
+def get_uncertainty_group_display_names()->list:
+    return list(DATA_PARAMETER_OPTIONS["groups_uncertainty"].values())
+
+
+
+def get_uncertainty_distribution_display_names()->list:
+    return list(DATA_PARAMETER_OPTIONS["distributions_uncertainty"].values())
+
+
+
+def get_uncertainty_parameter_display_names(group:str)->list:
+    return [get_parameter_option("parameters_" + group, parameter)
+            for parameter in get_uncertainty_parameter_names(group)]
+
+
+
+def generate_dataframe_from_parameter_uncertainties(session_state:dict)->pd.DataFrame:
+    if "uncertainty" not in session_state.keys():
+        session_state["uncertainty"] = create_uncertainty_settings()
+
+    df_data = []
+    for uncertainty in session_state["uncertainty"]["parameter_uncertainties"]:
+        # incomplete rows (group or parameter undefined) are shown without the undefined values
+        parameter_display_name = None
+        if uncertainty["group"] is not None and uncertainty["parameter"] is not None:
+            parameter_display_name = get_parameter_option("parameters_" + uncertainty["group"],
+                                                          uncertainty["parameter"])
+        df_data.append({
+            "group": DATA_PARAMETER_OPTIONS["groups_uncertainty"].get(uncertainty["group"]),
+            "name": uncertainty["name"],
+            "parameter": parameter_display_name,
+            "distribution": get_parameter_option("distributions_uncertainty", uncertainty["distribution"]),
+            "relative_spread": uncertainty["relative_spread"]
+        })
+
+    column_names = ["group", "name", "parameter", "distribution", "relative_spread"]
+
+    df = pd.DataFrame(df_data, columns=column_names)
+
+    return df
+
+
+
+def update_parameter_uncertainties(session_state:dict, df_updated:pd.DataFrame)->None:
+    # rows with display names (see generate_dataframe_from_parameter_uncertainties), incomplete rows are kept until
+    # they are completed or removed
+    groups = {value: key for key, value in DATA_PARAMETER_OPTIONS["groups_uncertainty"].items()}
+    distributions = {value: key for key, value in DATA_PARAMETER_OPTIONS["distributions_uncertainty"].items()}
+
+    parameter_uncertainties = []
+    for row in df_updated.to_dict("records"):
+        row = {key: None if isinstance(value, float) and np.isnan(value) else value for key, value in row.items()}
+        group = groups.get(row["group"])
+        parameter = None
+        if group is not None:
+            parameter = {get_parameter_option("parameters_" + group, parameter_name): parameter_name
+                         for parameter_name in get_uncertainty_parameter_names(group)}.get(row["parameter"])
+        relative_spread = row["relative_spread"]
+        if relative_spread is None:
+            relative_spread = get_parameter_option("uncertainty", "relative_spread_default")
+        parameter_uncertainties.append({
+            "group": group,
+            "name": row["name"],
+            "parameter": parameter,
+            "distribution": distributions.get(row["distribution"], md.UNCERTAINTY_DISTRIBUTIONS[0]),
+            "relative_spread": float(relative_spread)
+        })
+
+    if parameter_uncertainties != session_state["uncertainty"]["parameter_uncertainties"]:
+        session_state["uncertainty"]["parameter_uncertainties"] = parameter_uncertainties
+        clear_uncertainty_results(session_state)
+
+
+
+def update_uncertainty_sampling(session_state:dict, number_samples:int, seed:int)->None:
+    if (number_samples != session_state["uncertainty"]["number_samples"]
+            or seed != session_state["uncertainty"]["seed"]):
+        session_state["uncertainty"]["number_samples"] = int(number_samples)
+        session_state["uncertainty"]["seed"] = int(seed)
+        clear_uncertainty_results(session_state)
+
+
+
+def clear_uncertainty_results(session_state:dict)->None:
+    if "results" in session_state.keys():
+        session_state["results"].pop("vehicle_operation_totals_uncertainty", None)
+        session_state["results"].pop("scenario_totals_uncertainty", None)
+
+
+
+def calculate_uncertainty(session_state:dict)->None:
+    # mean & percentile bands of the results for the uncertain parameter values (steady state simulation, based on the
+    # location data of the last result calculation)
+    clear_uncertainty_results(session_state)
+
+    if "results" not in session_state.keys() or len(session_state["location_data"]) == 0:
+        raise ValueError("No results available. Please calculate the results first.")
+
+    parameter_uncertainties = session_state["uncertainty"]["parameter_uncertainties"]
+    if len(parameter_uncertainties) == 0:
+        raise ValueError("No uncertain parameters were specified. Please add at least one uncertain parameter.")
+    for uncertainty in parameter_uncertainties:
+        if uncertainty["group"] is None or uncertainty["name"] is None or uncertainty["parameter"] is None:
+            raise ValueError("At least one uncertain parameter is not defined completely. "
+                             "Please complete or remove it.")
+        names = session_state["specification"][uncertainty["group"] + "s"].keys()
+        if uncertainty["name"] not in names:
+            group_name = get_parameter_option("groups_uncertainty", uncertainty["group"])
+            raise ValueError(f"{group_name} \'{uncertainty['name']}\' of uncertain parameter does not exist. "
+                             f"Please select an existing {group_name.lower()}.")
+
+    verify_scenario_specification(session_state)
+
+    vehicle_operation_totals_uncertainty, scenario_totals_uncertainty = md.simulate_system_uncertainty(
+        session_state["specification"]["operation_schedules"],
+        session_state["specification"]["vehicle_versions"],
+        session_state["specification"]["temperature_control_curves"],
+        session_state["location_data"],
+        session_state["specification"]["scenarios"],
+        parameter_uncertainties,
+        session_state["uncertainty"]["number_samples"],
+        seed=session_state["uncertainty"]["seed"],
+        percentiles=get_parameter_option("uncertainty", "percentiles"),
+        solar_profiles=generate_solar_profiles(session_state),
+        hourly=session_state["simulation_hourly"],
+        workers=get_parameter_option("results", "simulation_workers"),
+        vehicles=session_state["specification"]["vehicles"]
+    )
+
+    session_state["results"]["vehicle_operation_totals_uncertainty"] = vehicle_operation_totals_uncertainty
+    session_state["results"]["scenario_totals_uncertainty"] = scenario_totals_uncertainty
+
+
+
+# sensitivity analysis
+
+
+def update_sensitivity_settings(session_state:dict, number_trajectories:int, number_base_samples:int,
+                                relative_range:float, seed:int)->None:
+    sensitivity_settings = {
+        "number_trajectories": int(number_trajectories),
+        "number_base_samples": int(number_base_samples),
+        "relative_range": float(relative_range),
+        "seed": int(seed)
+    }
+    if sensitivity_settings != session_state["sensitivity"]:
+        session_state["sensitivity"] = sensitivity_settings
+        if "results" in session_state.keys():
+            session_state["results"].pop("sensitivity", None)
+
+
+
+def get_sensitivity_evaluations(session_state:dict)->int:
+    # number of model evaluations per vehicle (morris trajectories & sobol base samples within the maximum number)
+    if "sensitivity" not in session_state.keys():
+        session_state["sensitivity"] = create_sensitivity_settings()
+
+    number_parameters = len(get_uncertainty_parameter_names("vehicle"))
+    number_trajectories, number_base_samples = md.get_sensitivity_design_sizes(
+        number_parameters, session_state["sensitivity"]["number_trajectories"],
+        session_state["sensitivity"]["number_base_samples"], get_parameter_option("sensitivity", "evaluations_max"))
+
+    return number_trajectories * (number_parameters + 1) + number_base_samples * (number_parameters + 2)
+
+
+
+def calculate_sensitivity(session_state:dict)->None:
+    # morris & sobol indices of the vehicle parameters (steady state simulation, based on the location data of the
+    # last result calculation)
+    if "results" not in session_state.keys() or len(session_state["location_data"]) == 0:
+        raise ValueError("No results available. Please calculate the results first.")
+    session_state["results"].pop("sensitivity", None)
+
+    session_state["results"]["sensitivity"] = md.simulate_system_sensitivity(
+        session_state["specification"]["operation_schedules"],
+        session_state["specification"]["vehicles"],
+        session_state["specification"]["temperature_control_curves"],
+        session_state["location_data"],
+        session_state["sensitivity"]["number_trajectories"],
+        session_state["sensitivity"]["number_base_samples"],
+        relative_range=session_state["sensitivity"]["relative_range"],
+        evaluations_max=get_parameter_option("sensitivity", "evaluations_max"),
+        seed=session_state["sensitivity"]["seed"],
+        solar_profiles=generate_solar_profiles(session_state),
+        hourly=session_state["simulation_hourly"],
+        workers=get_parameter_option("results", "simulation_workers")
+    )
 
 
 
@@ -1861,6 +2303,31 @@ def scale_scenario_totals(df_unscaled:pd.DataFrame)->Tuple[pd.DataFrame,str]:
 
 
 
+def generate_vehicle_results_heat_pump_str(df_vehicle_results:pd.DataFrame, df_heat_pump_results:pd.DataFrame)\
+        ->pd.DataFrame:
+    # heat pump electric power per vehicle result row as str (display only), e.g. "{HP 1: 2.5, HP 2: 0.0}"
+
+    keys = ["operation_schedule", "vehicle_name", "vehicle_version_parameter_set", "month_name", "hour"]
+
+    df_vehicle_results_str = copy.deepcopy(df_vehicle_results)
+    if len(df_heat_pump_results) == 0:
+        return df_vehicle_results_str
+
+    df_heat_pump_str = df_heat_pump_results[keys].astype(str)
+    df_heat_pump_str["electric_power_heat_pumps"] = (df_heat_pump_results["heat_pump_name"].astype(str) + ": "
+                                                     + df_heat_pump_results["electric_power_heat_pump"].astype(str))
+    df_heat_pump_str = df_heat_pump_str.groupby(keys, sort=False)["electric_power_heat_pumps"].agg(", ".join)
+    df_heat_pump_str = "{" + df_heat_pump_str + "}"
+
+    index_vehicle_results = pd.MultiIndex.from_frame(df_vehicle_results[keys].astype(str))
+    df_vehicle_results_str.insert(df_vehicle_results_str.columns.get_loc("electric_power_resistive_heating") + 1,
+                                  "electric_power_heat_pumps",
+                                  df_heat_pump_str.reindex(index_vehicle_results).to_numpy())
+
+    return df_vehicle_results_str
+
+
+
 def get_hour_list(df_heat_flows:pd.DataFrame, month_name:str)->list:
 
     hours = df_heat_flows[df_heat_flows["month_name"] == month_name]["hour"].unique()
@@ -1907,6 +2374,10 @@ def select_vehicle_comparison_heat_flows(df_results:pd.DataFrame, month_name, ho
         "power_demand_heating", "power_demand_cooling"
     ]]
 
+    # convert categorical labels for concatenation
+    for column in ["operation_schedule", "vehicle_name", "vehicle_version_parameter_set"]:
+        df_filtered[column] = df_filtered[column].astype(str)
+
     return df_filtered
 
 
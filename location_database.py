@@ -3,14 +3,21 @@
 
 # ##### IMPORTS #####
 
-from typing import Tuple
+from typing import Tuple, Union
+import numpy as np
 import pandas as pd
 import copy
+import os
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from requests.adapters import HTTPAdapter
 
 import pytz
-from datetime import datetime, timezone
+from datetime import datetime
 from timezonefinder import TimezoneFinder
 
 import json
@@ -20,18 +27,83 @@ import json
 ##### CONSTANTS #####
 
 TIME_ZONE_REFERENCE_YEAR = 2025
+HOURS_YEAR = 8760 # hours of the (non-leap) reference year
+
+LOCATION_CACHE_DIRECTORY = "./cache/location_data/" # directory of the persistent location data cache
+LOCATION_CACHE_TIME_TO_LIVE = 30 * 24 * 3600 # maximum age of cached location data [s]
+LOCATION_CACHE_SIZE_MAX = 64 * 2**20 # maximum size of the location data cache, oldest entries evicted first [B]
+LOCATION_CACHE_COORDINATE_DIGITS = 4 # decimal digits of latitude & longitude in climate data cache keys
+
+LOCATION_WORKERS_DEFAULT = 8 # number of threads retrieving location data concurrently
+HTTP_CONNECTIONS_MAX = 16 # pooled connections per host of the shared http session
+NOMINATIM_REQUESTS_PER_SECOND = 1.0 # nominatim usage policy: https://operations.osmfoundation.org/policies/nominatim/
+TIME_ZONE_COORDINATE_DIGITS = 4 # decimal digits of latitude & longitude in time zone memo keys
+
+
+
+##### CLASS DEFINITIONS #####
+
+class TokenBucket:
+    # thread-safe rate limiter, acquire blocks until a token is available
+    def __init__(self, rate:float, capacity:float=1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.time_update = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self)->None:
+        while True:
+            with self.lock:
+                time_now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (time_now - self.time_update) * self.rate)
+                self.time_update = time_now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                time_wait = (1 - self.tokens) / self.rate
+            time.sleep(time_wait)
+
+
+
+##### SHARED OBJECTS #####
+
+HTTP_SESSION = None # shared http session with connection pool (see get_http_session)
+HTTP_SESSION_LOCK = threading.Lock()
+NOMINATIM_RATE_LIMITER = TokenBucket(NOMINATIM_REQUESTS_PER_SECOND)
+TIME_ZONE_FINDER = None # process-wide time zone finder, initialized lazily or preloaded (see get_time_zone_finder)
+TIME_ZONE_FINDER_LOCK = threading.Lock() # (guards the initialization only, lookups run concurrently)
+TIME_ZONE_FINDER_PRELOAD_THREAD = None
+# time zone name per rounded coordinates (see retrieve_time_zone_name), without lock: single get & set operations on
+# the dict are atomic, concurrent misses of the same key only repeat the lookup and store the same name
+TIME_ZONE_NAMES = {}
 
 
 
 ##### FUNCTION DEFINITIONS #####
 
+def get_http_session()->requests.Session:
+    global HTTP_SESSION
+
+    with HTTP_SESSION_LOCK:
+        if HTTP_SESSION is None:
+            HTTP_SESSION = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_CONNECTIONS_MAX, pool_maxsize=HTTP_CONNECTIONS_MAX)
+            HTTP_SESSION.mount("https://", adapter)
+            HTTP_SESSION.mount("http://", adapter)
+
+    return HTTP_SESSION
+
+
+
 def retrieve_coordinates_nominatim(location_name:str, email_nominatim:str)->Tuple[float, float, str]:
     # api: https://nominatim.org/release-docs/develop/api/Search/
 
     url = (f"https://nominatim.openstreetmap.org/search?q={location_name}"
            f"&email={email_nominatim}&format=json&limit=1")
 
-    response = requests.get(url)
+    NOMINATIM_RATE_LIMITER.acquire()
+    response = get_http_session().get(url)
     if response.status_code == 200:
         try:
             data = response.json()
@@ -51,15 +123,48 @@ def retrieve_coordinates_nominatim(location_name:str, email_nominatim:str)->Tupl
 
 
 
+def get_time_zone_finder()->TimezoneFinder:
+    # (loading the polygon data once per process)
+    global TIME_ZONE_FINDER
+
+    with TIME_ZONE_FINDER_LOCK:
+        if TIME_ZONE_FINDER is None:
+            TIME_ZONE_FINDER = TimezoneFinder()
+
+    return TIME_ZONE_FINDER
+
+
+
+def preload_time_zone_finder(background:bool=True)->None:
+    # initialize the time zone finder ahead of the first location retrieval (e.g. at server start)
+    global TIME_ZONE_FINDER_PRELOAD_THREAD
+
+    if TIME_ZONE_FINDER is not None or TIME_ZONE_FINDER_PRELOAD_THREAD is not None:
+        return
+
+    if background:
+        TIME_ZONE_FINDER_PRELOAD_THREAD = threading.Thread(target=get_time_zone_finder, daemon=True)
+        TIME_ZONE_FINDER_PRELOAD_THREAD.start()
+    else:
+        get_time_zone_finder()
+
+
+
 def retrieve_time_zone_name(latitude:float, longitude:float)->str:
-    time_zone_finder = TimezoneFinder()
+    key = (round(latitude, TIME_ZONE_COORDINATE_DIGITS), round(longitude, TIME_ZONE_COORDINATE_DIGITS))
+    time_zone_name = TIME_ZONE_NAMES.get(key)
+    if time_zone_name is not None:
+        return time_zone_name
 
-    time_zone_name = time_zone_finder.timezone_at(lng=longitude, lat=latitude)
+    # (read-only lookup on the memory-mapped polygon data, thus outside of the lock)
+    time_zone_name = get_time_zone_finder().timezone_at(lng=longitude, lat=latitude)
 
     if time_zone_name is None:
         raise ValueError(f"Could not determine the time zone for the coordinates "
                          f"(latitude={latitude}, longitude={longitude}).")
 
+    TIME_ZONE_NAMES[key] = time_zone_name
+
     return time_zone_name
 
 
@@ -73,11 +178,12 @@ def convert_utc_to_local_time(utc_datetime:datetime, time_zone_name:str)->dateti
 
 
 def retrieve_climate_data(latitude:float, longitude:float, time_zone_name:str, path_output_raw_data:str=None)\
-        ->Tuple[list, list]:
+        ->Tuple[list, list, list, list]:
     # tool: https://re.jrc.ec.europa.eu/pvg_tools/en/
+    # (temperature & irradiation as month-hour means (12 x 24) and for all hours of the year in local time (8760))
 
     url = f"https://re.jrc.ec.europa.eu/api/tmy?lat={latitude}&lon={longitude}&outputformat=json"
-    response = requests.get(url)
+    response = get_http_session().get(url)
 
     if response.status_code == 200:
         try:
@@ -96,74 +202,149 @@ def retrieve_climate_data(latitude:float, longitude:float, time_zone_name:str, p
         with open(path_output_raw_data, "w") as file:
             file.write(data_raw_json)
 
-    # extract climate data
-    climate_data = []
+    # extract climate data (hourly entries of the selected month & year per month, utc time key format "YYYYMMDD:HH00")
     try:
-        for entry in data_raw['outputs']['months_selected']:
-            month = entry['month']
-            year = entry['year']
-            year_month_str = f"{year}{str(month).zfill(2)}"
-            keys_year_month = [entry["time(UTC)"] for entry in data_raw['outputs']['tmy_hourly']
-                               if entry["time(UTC)"].startswith(year_month_str)]
-            for key in keys_year_month:
-                # key format "YYYYMMDD:HH00"
-                day = int(key[6:8])
-                hour = int(key[9:11])
-                data_entry_raw = [entry for entry in data_raw['outputs']['tmy_hourly']
-                                  if entry["time(UTC)"] == key][0]
-                row_data = {
-                    "utc_month": month,
-                    "utc_day": day,
-                    "utc_hour": hour,
-                    "temperature": data_entry_raw["T2m"],
-                    "irradiation_direct_normal": data_entry_raw["Gb(n)"]
-                }
-                climate_data.append(row_data)
+        df_climate_data = pd.DataFrame(data_raw['outputs']['tmy_hourly'])[["time(UTC)", "T2m", "Gb(n)"]]
+        months_selected = {f"{entry['year']}{str(entry['month']).zfill(2)}"
+                           for entry in data_raw['outputs']['months_selected']}
     except KeyError:
         raise ValueError("Failed to extract climate data from the PVGIS API response.")
 
-    df_climate_data = pd.DataFrame(climate_data)
+    time_utc = df_climate_data["time(UTC)"].astype(str)
+    df_climate_data = df_climate_data[time_utc.str[0:6].isin(months_selected)]
+    time_utc = time_utc[df_climate_data.index]
 
     # convert utc time into local time
-    for index, row in df_climate_data.iterrows():
-        utc_datetime = datetime(TIME_ZONE_REFERENCE_YEAR, int(row["utc_month"]), int(row["utc_day"]),
-                                int(row["utc_hour"]), tzinfo=timezone.utc)
-        local_datetime = convert_utc_to_local_time(utc_datetime, time_zone_name)
-        df_climate_data.at[index, "local_month"] = local_datetime.month
-        df_climate_data.at[index, "local_day"] = local_datetime.day
-        df_climate_data.at[index, "local_hour"] = local_datetime.hour
-
-    # group data for month and hour
-    df_climate_data_grouped = df_climate_data.groupby(["local_month", "local_hour"]).agg(
-        temperature=("temperature", "mean"),
-        irradiation_direct_normal=("irradiation_direct_normal", "mean")
-    ).reset_index()
-
-    # convert dataframe into lists
-    temperature_list = []
-    irradiation_list = []
-    for month_id in range(0, 12):
-        month_temperature_list = []
-        month_irradiation_list = []
-        month = month_id + 1
-        for hour in range(0, 24):
-            try:
-                df_grouped_row = df_climate_data_grouped[
-                    (df_climate_data_grouped["local_month"] == month) & (df_climate_data_grouped["local_hour"] == hour)
-                ]
-                month_temperature_list.append(df_grouped_row["temperature"].iloc[0])
-                month_irradiation_list.append(df_grouped_row["irradiation_direct_normal"].iloc[0])
-            except ValueError:
-                raise ValueError("Failed to convert climate dataframe to lists.")
-        temperature_list.append(copy.deepcopy(month_temperature_list))
-        irradiation_list.append(copy.deepcopy(month_irradiation_list))
+    datetime_utc = pd.to_datetime(pd.DataFrame({
+        "year": TIME_ZONE_REFERENCE_YEAR,
+        "month": time_utc.str[4:6].astype(int),
+        "day": time_utc.str[6:8].astype(int),
+        "hour": time_utc.str[9:11].astype(int)
+    }), utc=True)
+    datetime_local = datetime_utc.dt.tz_convert(time_zone_name)
+
+    # average data for local month and hour (shape 12 x 24)
+    arrays = []
+    for key in ["T2m", "Gb(n)"]:
+        df_pivot = pd.pivot_table(pd.DataFrame({"local_month": datetime_local.dt.month.to_numpy(),
+                                                "local_hour": datetime_local.dt.hour.to_numpy(),
+                                                "value": df_climate_data[key].to_numpy(dtype=float)}),
+                                  values="value", index="local_month", columns="local_hour", aggfunc="mean")
+        array = df_pivot.reindex(index=range(1, 13), columns=range(0, 24)).to_numpy(dtype=float)
+        if np.isnan(array).any():
+            raise ValueError("Failed to convert climate dataframe to lists.")
+        arrays.append(array)
+
+    temperature_list = arrays[0].tolist()
+    irradiation_list = arrays[1].tolist()
+
+    # data for all hours of the reference year in local time (hours missing or doubled by daylight saving time
+    # interpolated or averaged)
+    datetime_local_naive = datetime_local.dt.tz_localize(None)
+    days_local = np.mod((datetime_local_naive.dt.normalize() - pd.Timestamp(TIME_ZONE_REFERENCE_YEAR, 1, 1)).dt.days
+                        .to_numpy(), HOURS_YEAR // 24)
+    hours_year_local = 24 * days_local + datetime_local_naive.dt.hour.to_numpy()
+    arrays_hourly = []
+    for key in ["T2m", "Gb(n)"]:
+        series = (pd.Series(df_climate_data[key].to_numpy(dtype=float), index=hours_year_local).groupby(level=0).mean()
+                  .reindex(range(0, HOURS_YEAR)).interpolate(limit_direction="both"))
+        if series.isna().any():
+            raise ValueError("Failed to convert climate dataframe to hourly lists.")
+        arrays_hourly.append(series.to_numpy(dtype=float))
+
+    temperature_hourly_list = arrays_hourly[0].tolist()
+    irradiation_hourly_list = arrays_hourly[1].tolist()
+
+    return temperature_list, irradiation_list, temperature_hourly_list, irradiation_hourly_list
 
 
-    return temperature_list, irradiation_list
 
+# location data cache (coordinates per normalized location name as json, climate data per rounded coordinates as npz)
 
+def normalize_location_name(location_name:str)->str:
+    return " ".join(location_name.lower().split())
 
-def retrieve_location_data(location_name:str, email_nominatim:str, path_directory_raw_climate_data:str=None)->dict:
+
+
+def get_location_cache_file_path(path_directory_cache:str, prefix:str, key:str, extension:str)->str:
+    key_hash = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+    return os.path.join(path_directory_cache, f"{prefix}_{key_hash}.{extension}")
+
+
+
+def get_climate_data_cache_key(latitude:float, longitude:float)->str:
+    return (f"{round(latitude, LOCATION_CACHE_COORDINATE_DIGITS):.{LOCATION_CACHE_COORDINATE_DIGITS}f},"
+            f"{round(longitude, LOCATION_CACHE_COORDINATE_DIGITS):.{LOCATION_CACHE_COORDINATE_DIGITS}f}")
+
+
+
+def read_location_cache_file(path:str, time_to_live:float)->Union[dict,None]:
+    # cached data or None if not cached or expired (read entries are marked as recently used)
+    if not os.path.isfile(path) or time.time() - os.path.getmtime(path) > time_to_live:
+        return None
+
+    try:
+        if path.endswith(".npz"):
+            with np.load(path) as file:
+                data = {key: file[key] for key in file.files}
+        else:
+            with open(path, "r") as file:
+                data = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    os.utime(path, (time.time(), os.path.getmtime(path)))
+
+    return data
+
+
+
+def write_location_cache_file(path:str, data:dict)->None:
+    # written to temporary file and renamed (no partially written cache entries)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    path_temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if path.endswith(".npz"):
+        with open(path_temporary, "wb") as file:
+            np.savez_compressed(file, **data)
+    else:
+        with open(path_temporary, "w") as file:
+            json.dump(data, file)
+    os.replace(path_temporary, path)
+
+
+
+def evict_location_cache(path_directory_cache:str, time_to_live:float=LOCATION_CACHE_TIME_TO_LIVE,
+                         size_max:int=LOCATION_CACHE_SIZE_MAX)->None:
+    # remove expired entries, then least recently used entries until the cache size is below the maximum
+    if not os.path.isdir(path_directory_cache):
+        return
+
+    # (entries concurrently removed by other threads or processes are skipped)
+    entries = []
+    for file_name in os.listdir(path_directory_cache):
+        path = os.path.join(path_directory_cache, file_name)
+        if file_name.endswith((".json", ".npz")):
+            try:
+                entries.append((os.path.getatime(path), os.path.getmtime(path), os.path.getsize(path), path))
+            except OSError:
+                pass
+
+    size_total = sum(entry[2] for entry in entries)
+    for time_access, time_modification, size, path in sorted(entries):
+        if time.time() - time_modification > time_to_live or size_total > size_max:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            size_total -= size
+
+
+
+def retrieve_location_data(location_name:str, email_nominatim:str, path_directory_raw_climate_data:str=None,
+                           path_directory_cache:str=LOCATION_CACHE_DIRECTORY,
+                           time_to_live:float=LOCATION_CACHE_TIME_TO_LIVE, cache_size_max:int=LOCATION_CACHE_SIZE_MAX,
+                           offline:bool=False)->dict:
+    # (path_directory_cache: None for no caching; offline: location data only from cache)
 
     flag_workaround = False
 
@@ -180,11 +361,45 @@ def retrieve_location_data(location_name:str, email_nominatim:str, path_director
             raise ValueError(f"Location name \'{location_name}\' not available for work around (offline).")
 
     else:
-        latitude, longitude, location_name_lookup = retrieve_coordinates_nominatim(location_name, email_nominatim)
+        # coordinates
+        coordinates_cached = None
+        if path_directory_cache is not None:
+            path_coordinates_cache = get_location_cache_file_path(path_directory_cache, "coordinates",
+                                                                  normalize_location_name(location_name), "json")
+            coordinates_cached = read_location_cache_file(path_coordinates_cache, time_to_live)
+        if coordinates_cached is not None:
+            latitude = coordinates_cached["latitude"]
+            longitude = coordinates_cached["longitude"]
+            location_name_lookup = coordinates_cached["location_name"]
+        elif offline:
+            raise ConnectionError(f"Coordinates for location \'{location_name}\' are not available in the location "
+                                  f"data cache (offline mode).")
+        else:
+            latitude, longitude, location_name_lookup = retrieve_coordinates_nominatim(location_name, email_nominatim)
+            if path_directory_cache is not None:
+                write_location_cache_file(path_coordinates_cache, {"latitude": latitude, "longitude": longitude,
+                                                                   "location_name": location_name_lookup})
 
         time_zone_name = retrieve_time_zone_name(latitude, longitude)
 
-        if path_directory_raw_climate_data is not None:
+        # climate data
+        climate_data_cached = None
+        if path_directory_cache is not None:
+            path_climate_data_cache = get_location_cache_file_path(
+                path_directory_cache, "climate_data", get_climate_data_cache_key(latitude, longitude) + ","
+                + time_zone_name, "npz")
+            climate_data_cached = read_location_cache_file(path_climate_data_cache, time_to_live)
+        if climate_data_cached is not None and "temperature_hourly" not in climate_data_cached.keys():
+            climate_data_cached = None # (cached before hourly data were stored)
+        if climate_data_cached is not None:
+            temperature_data = climate_data_cached["temperature"].tolist()
+            solar_irradiation_data = climate_data_cached["irradiation_direct_normal"].tolist()
+            temperature_hourly_data = climate_data_cached["temperature_hourly"].tolist()
+            solar_irradiation_hourly_data = climate_data_cached["irradiation_direct_normal_hourly"].tolist()
+        elif offline:
+            raise ConnectionError(f"Climate data for location \'{location_name}\' are not available in the location "
+                                  f"data cache (offline mode).")
+        elif path_directory_raw_climate_data is not None:
             location_name_print = (location_name.replace(" ", "_")
                                    .replace(",", "_")
                                    .replace(".", "_")
@@ -193,11 +408,21 @@ def retrieve_location_data(location_name:str, email_nominatim:str, path_director
             path_output_raw_climate_data = (path_directory_raw_climate_data + "climate_data_raw_" + location_name_print
                                             + ".json")
 
-            temperature_data, solar_irradiation_data = retrieve_climate_data(latitude, longitude, time_zone_name,
-                                                                             path_output_raw_climate_data)
+            (temperature_data, solar_irradiation_data, temperature_hourly_data,
+             solar_irradiation_hourly_data) = retrieve_climate_data(latitude, longitude, time_zone_name,
+                                                                    path_output_raw_climate_data)
         else:
-            temperature_data, solar_irradiation_data = retrieve_climate_data(latitude, longitude, time_zone_name,
-                                                                             None)
+            (temperature_data, solar_irradiation_data, temperature_hourly_data,
+             solar_irradiation_hourly_data) = retrieve_climate_data(latitude, longitude, time_zone_name, None)
+        if climate_data_cached is None and path_directory_cache is not None:
+            write_location_cache_file(path_climate_data_cache, {
+                "temperature": np.array(temperature_data, dtype=float),
+                "irradiation_direct_normal": np.array(solar_irradiation_data, dtype=float),
+                "temperature_hourly": np.array(temperature_hourly_data, dtype=float),
+                "irradiation_direct_normal_hourly": np.array(solar_irradiation_hourly_data, dtype=float)})
+
+        if path_directory_cache is not None:
+            evict_location_cache(path_directory_cache, time_to_live, cache_size_max)
 
         data = {
             "location_name": location_name_lookup,
@@ -205,7 +430,27 @@ def retrieve_location_data(location_name:str, email_nominatim:str, path_director
             "longitude": longitude,
             "time_zone": time_zone_name,
             "temperature": copy.deepcopy(temperature_data),
-            "irradiation_direct_normal": copy.deepcopy(solar_irradiation_data)
+            "irradiation_direct_normal": copy.deepcopy(solar_irradiation_data),
+            "temperature_hourly": copy.deepcopy(temperature_hourly_data),
+            "irradiation_direct_normal_hourly": copy.deepcopy(solar_irradiation_hourly_data)
         }
 
-        return data
\ No newline at end of file
+        return data
+
+
+
+def retrieve_locations_data(location_names:list, email_nominatim:str, path_directory_raw_climate_data:str=None,
+                            workers:int=LOCATION_WORKERS_DEFAULT, **kwargs)->dict:
+    # location data per location name (retrieved concurrently, in order of location names; kwargs: cache options of
+    # retrieve_location_data)
+    location_names = list(dict.fromkeys(location_names))
+    if len(location_names) == 0:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(location_names)))) as executor:
+        locations_data = list(executor.map(
+            lambda location_name: retrieve_location_data(location_name, email_nominatim,
+                                                         path_directory_raw_climate_data, **kwargs),
+            location_names))
+
+    return dict(zip(location_names, locations_data))
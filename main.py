@@ -278,10 +278,11 @@ def handle_import_export_specification()->None:
         # export tab
 
         tab_export.write("Current specification:")
-        tab_export.json(st.session_state["specification"], expanded=1)
+        specification_dict = dh.get_specification_dictionary(st.session_state)
+        tab_export.json(specification_dict, expanded=1)
         if tab_export.download_button(
                 "Export specification as JSON file",
-                json.dumps(st.session_state["specification"], indent=4),
+                json.dumps(specification_dict, indent=4),
                 file_name="specification.json"
             ):
             st.rerun()
@@ -1948,6 +1949,32 @@ def handle_calculate_results(result_tab:st.delta_generator.DeltaGenerator)->None
 
 
 
+def handle_update_results_post_processing(result_tab:st.delta_generator.DeltaGenerator)->bool:
+    try:
+        dh.update_results_post_processing(st.session_state)
+    except Exception as e:
+        result_tab.error(e)
+        return False
+    return True
+
+
+
+def handle_calculate_uncertainty(container:st.delta_generator.DeltaGenerator)->None:
+    try:
+        dh.calculate_uncertainty(st.session_state)
+    except Exception as e:
+        container.error(e)
+
+
+
+def handle_calculate_sensitivity(container:st.delta_generator.DeltaGenerator)->None:
+    try:
+        dh.calculate_sensitivity(st.session_state)
+    except Exception as e:
+        container.error(e)
+
+
+
 def generate_results_tab(tab:st.delta_generator.DeltaGenerator)->None:
     tab.write("## Results")
 
@@ -1963,6 +1990,25 @@ def generate_results_tab(tab:st.delta_generator.DeltaGenerator)->None:
         else:
             st.session_state["nominatim_email"] = nominatim_email
 
+    simulation_hourly = tab.checkbox("Hourly simulation (all 8760 hours of the typical meteorological year)",
+                                     value=st.session_state["simulation_hourly"],
+                                     help="Simulate every hour of the year with its own weather and sun position "
+                                          "instead of monthly mean days. Results are shown as means per month and "
+                                          "hour, the peak electric power is the maximum over all hours.")
+    if simulation_hourly != st.session_state["simulation_hourly"]:
+        st.session_state["simulation_hourly"] = simulation_hourly
+        st.session_state["flag_input_changed"] = True
+
+    simulation_transient = tab.checkbox("Transient simulation (thermal mass of cabin and chassis)",
+                                        value=st.session_state["simulation_transient"],
+                                        help="Integrate the cabin and chassis temperature over time in sub-hourly "
+                                             "steps instead of assuming a steady state in every hour. Captures the "
+                                             "heating and cooling of the parked vehicle at the begin of operation and "
+                                             "the lag from the thermal mass of the chassis.")
+    if simulation_transient != st.session_state["simulation_transient"]:
+        st.session_state["simulation_transient"] = simulation_transient
+        st.session_state["flag_input_changed"] = True
+
     tab.button("Calculate results", on_click=handle_calculate_results, args=[tab], use_container_width=True,
                key="calculate_results", disabled=(st.session_state["nominatim_email"] == ""))
 
@@ -1973,6 +2019,11 @@ def generate_results_tab(tab:st.delta_generator.DeltaGenerator)->None:
     if "results" not in st.session_state.keys() or len(st.session_state["results"]) == 0:
         return
 
+    # post-processing parameters changed (vehicle numbers, electricity cost, scenarios): re-aggregate results instantly
+    if st.session_state["flag_post_processing_changed"]:
+        if not handle_update_results_post_processing(tab):
+            return
+
     if len(st.session_state["location_data"]) > 0:
         if st.session_state["results"]["warning"] is not None:
             tab.warning(st.session_state["results"]["warning"])
@@ -2574,6 +2625,46 @@ def generate_results_tab(tab:st.delta_generator.DeltaGenerator)->None:
                 "electricity_cost_vehicle_operation_total": st.column_config.NumberColumn(
                     f"Electricity cost [{CURRENCY}]",
                     help="Total cost for electricity consumption of single vehicle operation"
+                ),
+                "electric_power_vehicle_peak": st.column_config.NumberColumn(
+                    "Peak electric power [kW]",
+                    help="Maximum hourly electric power for heating and cooling of single vehicle operation"
+                )
+            }
+        )
+
+    if len(st.session_state["results"]["heat_pump_totals"]) > 0:
+        flag_tabled = True
+
+        expander_heat_pump_results = tab.expander("Heat Pump Totals", expanded=False)
+
+        expander_heat_pump_results.dataframe(
+            format_result_dataframes(st.session_state["results"]["heat_pump_totals"]),
+            hide_index=True,
+            column_config={
+                "operation_schedule": st.column_config.TextColumn(
+                    "Operation schedule",
+                    help="Operation schedule name"
+                ),
+                "vehicle_name": st.column_config.TextColumn(
+                    "Vehicle",
+                    help="Vehicle type"
+                ),
+                "vehicle_version_parameter_set": st.column_config.TextColumn(
+                    "Vehicle version parameter",
+                    help="Vehicle version parameter set"
+                ),
+                "heat_pump_name": st.column_config.TextColumn(
+                    "Heat pump",
+                    help="Heat pump name"
+                ),
+                "electric_energy_heat_pump_operation_total": st.column_config.NumberColumn(
+                    "Electricity consumption [kWh]",
+                    help="Total electricity consumption of heat pump of single vehicle operation"
+                ),
+                "electric_power_heat_pump_peak": st.column_config.NumberColumn(
+                    "Peak electric power [kW]",
+                    help="Maximum hourly electric power of heat pump of single vehicle operation"
                 )
             }
         )
@@ -2585,7 +2676,8 @@ def generate_results_tab(tab:st.delta_generator.DeltaGenerator)->None:
                                                 expanded=False)
 
         expander_vehicle_results.dataframe(
-            format_result_dataframes(st.session_state["results"]["vehicles"]),
+            format_result_dataframes(dh.generate_vehicle_results_heat_pump_str(
+                st.session_state["results"]["vehicles"], st.session_state["results"]["heat_pumps"])),
             hide_index=True,
             column_config={
                 "operation_schedule": st.column_config.TextColumn(
@@ -2628,6 +2720,11 @@ def generate_results_tab(tab:st.delta_generator.DeltaGenerator)->None:
                     "Electric power [kW]",
                     help="Electric power for vehicle heating and cooling"
                 ),
+                "electric_power_vehicle_peak": st.column_config.NumberColumn(
+                    "Peak electric power [kW]",
+                    help="Maximum electric power for vehicle heating and cooling over the operation days (hourly "
+                         "simulation)"
+                ),
                 "electric_power_vehicle_heating": st.column_config.NumberColumn(
                     "Electric power [kW]",
                     help="Electric power for vehicle heating"
@@ -2711,6 +2808,276 @@ def generate_results_tab(tab:st.delta_generator.DeltaGenerator)->None:
         tab.write("No data for tables available after result calculation. "
                   "Change specification and then re-calculate results to generate tables.")
 
+    tab.write("### Uncertainty Analysis")
+
+    expander_uncertainty = tab.expander("Uncertainty of Results", expanded=False)
+    expander_uncertainty.write("Parameter values of vehicles and operation schedules can be specified as uncertain "
+                               "by a distribution of the relative deviation from the specified value. The results "
+                               "are calculated for random samples of these values and summarized by the mean and "
+                               "percentiles of the totals (steady state simulation).")
+    if st.session_state["simulation_transient"]:
+        expander_uncertainty.write(ICON_INFO + " The uncertainty analysis is based on the steady state simulation, "
+                                               "the transient simulation option is not considered.")
+
+    uncertainty_parameter_names = (dh.get_uncertainty_parameter_display_names("vehicle")
+                                   + dh.get_uncertainty_parameter_display_names("operation_schedule"))
+    df_parameter_uncertainties = expander_uncertainty.data_editor(
+        dh.generate_dataframe_from_parameter_uncertainties(st.session_state),
+        hide_index=True,
+        use_container_width=True,
+        num_rows="dynamic",
+        column_config={
+            "group": st.column_config.SelectboxColumn(
+                "Group",
+                help="Group of the uncertain parameter",
+                options=dh.get_uncertainty_group_display_names(),
+                required=True
+            ),
+            "name": st.column_config.SelectboxColumn(
+                "Name",
+                help="Vehicle or operation schedule with the uncertain parameter",
+                options=(list(st.session_state["specification"]["vehicles"].keys())
+                         + list(st.session_state["specification"]["operation_schedules"].keys())),
+                required=True
+            ),
+            "parameter": st.column_config.SelectboxColumn(
+                "Parameter",
+                help="Uncertain parameter (vehicle parameters for vehicles, operation schedule parameters for "
+                     "operation schedules)",
+                options=uncertainty_parameter_names,
+                required=True
+            ),
+            "distribution": st.column_config.SelectboxColumn(
+                "Distribution",
+                help="Distribution of the relative deviation from the specified value",
+                options=dh.get_uncertainty_distribution_display_names(),
+                default=dh.get_parameter_option("distributions_uncertainty", "normal"),
+                required=True
+            ),
+            "relative_spread": st.column_config.NumberColumn(
+                "Relative spread",
+                help="Spread of the distribution as fraction of the specified value (values are limited to the "
+                     "admissible range of the parameter)",
+                min_value=0.0,
+                max_value=dh.get_parameter_option("uncertainty", "relative_spread_max"),
+                step=dh.get_parameter_option("uncertainty", "relative_spread_step"),
+                format=dh.get_parameter_format_from_step("uncertainty", "relative_spread_step"),
+                default=dh.get_parameter_option("uncertainty", "relative_spread_default"),
+                required=True
+            )
+        }
+    )
+    if df_parameter_uncertainties is not None:
+        dh.update_parameter_uncertainties(st.session_state, df_parameter_uncertainties)
+
+    uncertainty_col1, uncertainty_col2 = expander_uncertainty.columns(2)
+    number_samples = uncertainty_col1.number_input(
+        "Number of samples",
+        min_value=dh.get_parameter_option("uncertainty", "number_samples_min"),
+        max_value=dh.get_parameter_option("uncertainty", "number_samples_max"),
+        value=st.session_state["uncertainty"]["number_samples"],
+        step=1,
+        help="Number of random samples of the uncertain parameter values"
+    )
+    seed = uncertainty_col2.number_input(
+        "Seed",
+        min_value=0,
+        value=st.session_state["uncertainty"]["seed"],
+        step=1,
+        help="Seed of the random samples (identical seeds reproduce identical results)"
+    )
+    dh.update_uncertainty_sampling(st.session_state, number_samples, seed)
+
+    expander_uncertainty.button("Calculate uncertainty", on_click=handle_calculate_uncertainty,
+                                args=[expander_uncertainty], use_container_width=True, key="calculate_uncertainty")
+
+    column_config_statistic = st.column_config.TextColumn(
+        "Statistic",
+        help="Mean or percentile (e.g. p95: 95 % of the samples are below this value) of the samples"
+    )
+
+    if "scenario_totals_uncertainty" in st.session_state["results"].keys():
+        expander_uncertainty.write("#### Scenario Totals")
+        expander_uncertainty.dataframe(
+            format_result_dataframes(st.session_state["results"]["scenario_totals_uncertainty"]),
+            hide_index=True,
+            column_config={
+                "scenario_name": st.column_config.TextColumn(
+                    "Scenario",
+                    help="Scenario name"
+                ),
+                "statistic": column_config_statistic,
+                "electric_energy_scenario_total": st.column_config.NumberColumn(
+                    "Electricity consumption total [kWh]",
+                    help="Total electricity consumption"
+                ),
+                "electric_energy_scenario_heating_total": st.column_config.NumberColumn(
+                    "Electricity consumption heating [kWh]",
+                    help="Total electricity consumption for heating"
+                ),
+                "electric_energy_scenario_cooling_total": st.column_config.NumberColumn(
+                    "Electricity consumption cooling [kWh]",
+                    help="Total electricity consumption for cooling"
+                ),
+                "electricity_cost_scenario_total": st.column_config.NumberColumn(
+                    f"Electricity cost [{CURRENCY}]",
+                    help="Total cost for electricity consumption"
+                )
+            }
+        )
+
+    if "vehicle_operation_totals_uncertainty" in st.session_state["results"].keys():
+        expander_uncertainty.write("#### Vehicle Operation Totals")
+        expander_uncertainty.dataframe(
+            format_result_dataframes(st.session_state["results"]["vehicle_operation_totals_uncertainty"]),
+            hide_index=True,
+            column_config={
+                "operation_schedule": st.column_config.TextColumn(
+                    "Operation schedule",
+                    help="Operation schedule name"
+                ),
+                "vehicle_name": st.column_config.TextColumn(
+                    "Vehicle",
+                    help="Vehicle type"
+                ),
+                "vehicle_version_parameter_set": st.column_config.TextColumn(
+                    "Vehicle version parameter",
+                    help="Vehicle version parameter set"
+                ),
+                "number_of_vehicles": st.column_config.NumberColumn(
+                    "Number of vehicles",
+                    help="Number of vehicles in operation"
+                ),
+                "statistic": column_config_statistic,
+                "electric_energy_vehicle_operation_total": st.column_config.NumberColumn(
+                    "Electricity consumption [kWh]",
+                    help="Total electricity consumption of single vehicle operation"
+                ),
+                "electric_energy_vehicle_operation_heating_total": st.column_config.NumberColumn(
+                    "Electricity consumption heating [kWh]",
+                    help="Total electricity consumption for heating of single vehicle operation"
+                ),
+                "electric_energy_vehicle_operation_cooling_total": st.column_config.NumberColumn(
+                    "Electricity consumption cooling [kWh]",
+                    help="Total electricity consumption for cooling of single vehicle operation"
+                ),
+                "electricity_cost_vehicle_operation_total": st.column_config.NumberColumn(
+                    f"Electricity cost [{CURRENCY}]",
+                    help="Total cost for electricity consumption of single vehicle operation"
+                )
+            }
+        )
+
+    tab.write("### Sensitivity Analysis")
+
+    expander_sensitivity = tab.expander("Parameter Sensitivity", expanded=False)
+    expander_sensitivity.write("All numeric vehicle parameters are varied within a range around the specified value "
+                               "to rank their influence on the annual electricity consumption of all vehicles of a "
+                               "type in operation (steady state simulation). Morris elementary effects screen the "
+                               "parameters with few evaluations, Sobol indices quantify the share of the variance "
+                               "caused by each parameter alone (first order) and including its interactions (total).")
+    if st.session_state["simulation_transient"]:
+        expander_sensitivity.write(ICON_INFO + " The sensitivity analysis is based on the steady state simulation, "
+                                               "the transient simulation option is not considered.")
+
+    sensitivity_col1, sensitivity_col2, sensitivity_col3, sensitivity_col4 = expander_sensitivity.columns(4)
+    number_trajectories = sensitivity_col1.number_input(
+        "Morris trajectories",
+        min_value=dh.get_parameter_option("sensitivity", "number_trajectories_min"),
+        max_value=dh.get_parameter_option("sensitivity", "number_trajectories_max"),
+        value=st.session_state["sensitivity"]["number_trajectories"],
+        step=1,
+        help="Number of one-at-a-time trajectories of the Morris design"
+    )
+    number_base_samples = sensitivity_col2.number_input(
+        "Sobol base samples",
+        min_value=dh.get_parameter_option("sensitivity", "number_base_samples_min"),
+        max_value=dh.get_parameter_option("sensitivity", "number_base_samples_max"),
+        value=st.session_state["sensitivity"]["number_base_samples"],
+        step=1,
+        help="Number of base samples of the Sobol design (rounded down to a power of 2)"
+    )
+    relative_range = sensitivity_col3.number_input(
+        "Relative parameter range",
+        min_value=dh.get_parameter_option("sensitivity", "relative_range_step"),
+        max_value=dh.get_parameter_option("sensitivity", "relative_range_max"),
+        value=st.session_state["sensitivity"]["relative_range"],
+        step=dh.get_parameter_option("sensitivity", "relative_range_step"),
+        format=dh.get_parameter_format_from_step("sensitivity", "relative_range_step"),
+        help="Parameters are varied by +/- this fraction of the specified value (limited to the admissible range)"
+    )
+    sensitivity_seed = sensitivity_col4.number_input(
+        "Seed",
+        min_value=0,
+        value=st.session_state["sensitivity"]["seed"],
+        step=1,
+        key="sensitivity_seed",
+        help="Seed of the random designs (identical seeds reproduce identical results)"
+    )
+    dh.update_sensitivity_settings(st.session_state, number_trajectories, number_base_samples, relative_range,
+                                   sensitivity_seed)
+
+    evaluations_max = dh.get_parameter_option("sensitivity", "evaluations_max")
+    try:
+        expander_sensitivity.write(f"Model evaluations per vehicle: {dh.get_sensitivity_evaluations(st.session_state)} "
+                                   f"(at most {evaluations_max}, the Sobol base samples are reduced if necessary)")
+    except ValueError as e:
+        expander_sensitivity.error(e)
+
+    expander_sensitivity.button("Calculate sensitivity", on_click=handle_calculate_sensitivity,
+                                args=[expander_sensitivity], use_container_width=True, key="calculate_sensitivity")
+
+    if "sensitivity" in st.session_state["results"].keys():
+        expander_sensitivity.dataframe(
+            format_result_dataframes(st.session_state["results"]["sensitivity"]).format(
+                precision=3, subset=["sobol_first_order", "sobol_total"]),
+            hide_index=True,
+            column_config={
+                "vehicle_name": st.column_config.TextColumn(
+                    "Vehicle",
+                    help="Vehicle type"
+                ),
+                "rank": st.column_config.NumberColumn(
+                    "Rank",
+                    help="Rank of the parameter by the total Sobol index (and Morris mu*)"
+                ),
+                "parameter": st.column_config.TextColumn(
+                    "Parameter",
+                    help="Vehicle parameter"
+                ),
+                "value": st.column_config.NumberColumn(
+                    "Specified value",
+                    help="Specified value of the vehicle parameter"
+                ),
+                "value_min": st.column_config.NumberColumn(
+                    "Min. value",
+                    help="Lower limit of the parameter range"
+                ),
+                "value_max": st.column_config.NumberColumn(
+                    "Max. value",
+                    help="Upper limit of the parameter range"
+                ),
+                "morris_mu_star": st.column_config.NumberColumn(
+                    "Morris mu* [kWh]",
+                    help="Mean absolute change of the annual electricity consumption over the parameter range"
+                ),
+                "morris_sigma": st.column_config.NumberColumn(
+                    "Morris sigma [kWh]",
+                    help="Standard deviation of the change over the parameter range (non-linearity and "
+                         "interactions)"
+                ),
+                "sobol_first_order": st.column_config.NumberColumn(
+                    "Sobol first order",
+                    help="Share of the variance of the annual electricity consumption caused by the parameter alone"
+                ),
+                "sobol_total": st.column_config.NumberColumn(
+                    "Sobol total",
+                    help="Share of the variance of the annual electricity consumption caused by the parameter "
+                         "including its interactions"
+                )
+            }
+        )
+
 
 
 # general
@@ -2744,6 +3111,9 @@ if not "initiated" in st.session_state:
 
 st.session_state["flag_stop"] = False
 
+# preload process-wide resources (only once per server process)
+dh.preload_location_resources()
+
 # generate the structure of the GUI
 generate()
 
@@ -5,13 +5,22 @@
 
 import data_handler as dh
 
+import contextvars
 import copy
+import functools
+import math
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+import time
 from typing import Tuple
 
 import numpy as np
 import pandas as pd
 from scipy.integrate import quad
+from scipy.sparse import csr_matrix
 from scipy.optimize import fsolve
+from scipy.stats import qmc
 from datetime import datetime
 
 
@@ -34,9 +43,96 @@ FLOAT_TOLERANCE = 1e-5 # tolerance for floating point comparisons
 
 MONTH_DAYS_BEGIN = [1, 32, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335, 366]     # day in year of monthly beginning
 MONTH_DAYS_MID = [16, 46, 75, 106, 136, 167, 197, 228, 259, 289, 320, 350]          # day in year of mid-month
+DAYS_YEAR = 365 # days of the (non-leap) reference year of the hourly simulation
 
 INFINITE_EFFICIENCY = 1e12 # Carnot efficiency for zero temperature difference
 
+SOLAR_ABSORPTION_CACHE_SIZE = 2**16 # maximum number of cached orientation-averaged solar absorption coefficients
+SUN_POSITION_CACHE_SIZE = 2**8 # maximum number of cached sun position tables (one per latitude)
+SOLAR_INTEGRATION_ORDERS = {"low": 4, "medium": 8, "high": 16} # gauss-legendre nodes per orientation subinterval
+SOLAR_INTEGRATION_DEFAULT = "high" # orientation averaging of vectorized engine ("quad" for adaptive reference)
+SOLAR_INTEGRATION_STEP_GRADING = [1, 4, 16, 64, 256, 1024] # subinterval limits around obstacle shading step
+                                                            # [multiples of arctan approximation width]
+VEHICLE_PARAMETERS_SOLAR_ABSORPTION = ["length", "width", "height", "area_windows_front", "area_windows_side",
+                                       "cabin_absorptivity", "window_transmissivity", "fraction_obstruction_roof"]
+VEHICLE_PARAMETERS_PASSIVE_HEAT_FLOWS = ["length", "width", "height", "area_windows_front", "area_windows_side",
+                                         "door_height", "door_width_total", "time_fraction_door_open",
+                                         "heat_transfer_coefficient_chassis", "cabin_absorptivity",
+                                         "window_transmissivity", "fraction_obstruction_roof",
+                                         "fraction_obstruction_floor", "volume_flow_rate_ventilation",
+                                         "heating_power_auxiliary"]
+
+TRANSIENT_TIME_STEPS_HOUR = 4 # implicit euler time steps per hour of the transient cabin model
+TRANSIENT_WARMUP_DAYS = 2 # days simulated ahead of the results (cyclic continuation) to forget the initial state
+HEAT_CAPACITY_CHASSIS_AREA = 40 # heat capacity of chassis & interior (steel, glazing, seats) per convection area
+                                # [kJ/m²K]
+
+ENGINE_TOLERANCE = 1e-6 # maximum absolute deviation of vectorized engine from scalar engine results [°C, kW]
+NEWTON_TOLERANCE = 1e-10 # temperature step for convergence of the newton solver [K]
+NEWTON_ITERATIONS_MAX = 50 # maximum number of newton iterations before falling back to fsolve
+
+HEAT_FLOW_KEYS = ["demand_heating", "demand_cooling", "solar_absorption", "heating_passengers", "heating_auxiliary",
+                  "heating_convection", "heating_ventilation_air", "heating_doors_air"] # keys of simulated heat flows
+
+# solver statistics of the simulation run executed in the current thread or worker process (None outside of
+# simulation runs, see create_engine_statistics & simulate_simulation_tasks)
+ENGINE_STATISTICS = contextvars.ContextVar("engine_statistics", default=None)
+
+SIMULATION_WORKERS_DEFAULT = 1 # number of worker processes of simulate_system (1 for serial execution)
+SIMULATION_TASKS_PER_WORKER = 4 # simulation tasks per worker process and vehicle (chunks of vehicle versions)
+SIMULATION_TASK_VERSIONS_MAX = 256 # maximum number of vehicle versions per simulation task (compiled at once)
+SIMULATION_WORKER_INPUTS = {} # compiled simulation inputs of a worker process (see initialize_simulation_worker)
+
+UNCERTAINTY_DISTRIBUTIONS = ["normal", "uniform", "triangular"] # distributions of relative parameter deviations
+UNCERTAINTY_PERCENTILES_DEFAULT = [5, 50, 95] # percentiles of the uncertainty analysis results
+SAMPLE_BATCH_VALUES_MAX = 2**22 # maximum number of samples x operation hours evaluated in one batch
+SENSITIVITY_RELATIVE_RANGE_DEFAULT = 0.2 # parameter range of the sensitivity analysis (fraction of specified value)
+SENSITIVITY_MORRIS_LEVELS = 4 # grid levels per parameter of the morris design
+SENSITIVITY_EVALUATIONS_MAX_DEFAULT = 20000 # maximum number of model evaluations per vehicle
+
+
+
+##### CLASS DEFINITIONS #####
+
+class CompiledVehicle:
+    # immutable vehicle version for the vectorized engine: copy of the vehicle data, derived heat flow coefficients,
+    # device table and content hash (see compile_vehicle)
+    __slots__ = ("vehicle_data", "content_hash", "temperature_control_curve", "solar_geometry", "passive_key",
+                 "heating_power_auxiliary", "conductance_convection", "conductance_ventilation", "coefficient_doors",
+                 "heat_capacity_cabin", "heat_capacity_chassis", "device_table")
+
+    def __init__(self, vehicle_data:dict):
+        vehicle_data = copy.deepcopy(vehicle_data)
+
+        attributes = {
+            "vehicle_data": vehicle_data,
+            "content_hash": calculate_vehicle_content_hash(vehicle_data),
+            "temperature_control_curve": vehicle_data["temperature_control_curve"],
+            "solar_geometry": get_solar_absorption_geometry(vehicle_data),
+            "passive_key": get_passive_heat_flow_parameters(vehicle_data),
+            # heat flow coefficients [kW, kW/K] & heat capacities of the transient cabin model [kJ/K]
+            **{name: float(value) for name, value in calculate_heat_flow_coefficients(vehicle_data).items()},
+            "device_table": compile_device_table(vehicle_data)
+        }
+        for name, value in attributes.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompiledVehicle is immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError("CompiledVehicle is immutable.")
+
+    def __eq__(self, other):
+        return isinstance(other, CompiledVehicle) and self.content_hash == other.content_hash
+
+    def __hash__(self):
+        return hash(self.content_hash)
+
+    def __reduce__(self):
+        # (re-)compiled from the vehicle data when unpickled, e.g. once per worker process
+        return CompiledVehicle, (self.vehicle_data,)
+
 
 
 ##### FUNCTION DEFINITIONS #####
@@ -92,37 +188,183 @@ def simulate_solar_absorption_single_orientation(angle_orientation:float,
 
 
 
+def calculate_heat_flow_coefficients(vehicle:dict)->dict:
+    # heat flow coefficients [kW, kW/K] & heat capacities of the transient cabin model (cabin air, chassis & interior)
+    # [kJ/K] (element-wise, thus also for arrays of vehicle parameter values, e.g. samples)
+    area_convection = (2 * vehicle["length"] * vehicle["height"] + 2 * vehicle["width"] * vehicle["height"]
+                       + (2 - vehicle["fraction_obstruction_roof"] - vehicle["fraction_obstruction_floor"])
+                       * vehicle["length"] * vehicle["width"])
+
+    return {
+        "heating_power_auxiliary": 1.0 * vehicle["heating_power_auxiliary"],
+        "conductance_convection": 1e-3 * area_convection * vehicle["heat_transfer_coefficient_chassis"],
+        "conductance_ventilation": 1e-3 * vehicle["volume_flow_rate_ventilation"] * RHO_AIR * C_P_AIR,
+        "coefficient_doors": (1e-3*(1/3) * RHO_AIR * C_P_AIR
+                              * np.sqrt(GRAVITAIONAL_ACCELERATION * np.power(vehicle["door_height"], 3))
+                              * vehicle["door_width_total"] * vehicle["time_fraction_door_open"]
+                              * DOOR_DISCHARGE_COEFFICIENT),
+        "heat_capacity_cabin": 1e-3 * vehicle["length"] * vehicle["width"] * vehicle["height"] * RHO_AIR * C_P_AIR,
+        "heat_capacity_chassis": area_convection * HEAT_CAPACITY_CHASSIS_AREA
+    }
+
+
+
+def get_solar_absorption_geometry(vehicle:dict)->tuple:
+    # vehicle parameters the solar absorption depends on (used as cache key instead of the vehicle version name)
+    return tuple(float(vehicle[parameter]) for parameter in VEHICLE_PARAMETERS_SOLAR_ABSORPTION)
+
+
+
+@functools.lru_cache(maxsize=SOLAR_ABSORPTION_CACHE_SIZE)
+def calculate_solar_absorption_coefficients(geometry:tuple,
+                                            obstacle_distance:float,
+                                            obstacle_height:float,
+                                            angle_altitude:float,
+                                            angle_azimuth:float)->Tuple[float,float]:
+    # orientation-averaged absorption per horizontal and vertical irradiation [m²]
+    # (process-wide cache, shared by all vehicle versions and operation schedules with identical geometry & sun angles)
+    vehicle = dict(zip(VEHICLE_PARAMETERS_SOLAR_ABSORPTION, geometry))
+
+    absorption_integrated_horizontal, absorption_error_horizontal = quad(
+        simulate_solar_absorption_single_orientation, 0, np.pi,
+        args=(vehicle, obstacle_distance, obstacle_height, angle_altitude, angle_azimuth, 1, 0))
+    absorption_integrated_vertical, absorption_error_vertical = quad(
+        simulate_solar_absorption_single_orientation, 0, np.pi,
+        args=(vehicle, obstacle_distance, obstacle_height, angle_altitude, angle_azimuth, 0, 1))
+
+    return np.abs(absorption_integrated_horizontal / np.pi), np.abs(absorption_integrated_vertical / np.pi)
+
+
+
+def get_solar_absorption_cache_info()->dict:
+    cache_info = calculate_solar_absorption_coefficients.cache_info()
+    return {"hits": cache_info.hits, "misses": cache_info.misses,
+            "size": cache_info.currsize, "size_max": cache_info.maxsize}
+
+
+
+def clear_solar_absorption_cache()->None:
+    calculate_solar_absorption_coefficients.cache_clear()
+
+
+
+def calculate_solar_absorption_areas(vehicle:dict)->Tuple[float,float,float]:
+    # effective absorption areas [m²] of roof (horizontal irradiation), front & side (vertical irradiation)
+    area_absorption_roof = vehicle["length"] * vehicle["width"] * (1-vehicle["fraction_obstruction_roof"])
+    area_front_cabin = vehicle["width"] * vehicle["height"] - vehicle["area_windows_front"]
+    area_side_cabin = vehicle["length"] * vehicle["height"] - vehicle["area_windows_side"]
+    area_horizontal = vehicle["cabin_absorptivity"] * area_absorption_roof
+    area_front = (vehicle["cabin_absorptivity"] * area_front_cabin
+                  + vehicle["window_transmissivity"] * vehicle["area_windows_front"])
+    area_side = (vehicle["cabin_absorptivity"] * area_side_cabin
+                 + vehicle["window_transmissivity"] * vehicle["area_windows_side"])
+
+    return area_horizontal, area_front, area_side
+
+
+
+def calculate_solar_orientation_integrals_gauss_legendre(slope_obstacle:np.ndarray,
+                                                         angle_altitude:np.ndarray,
+                                                         solar_integration:str=SOLAR_INTEGRATION_DEFAULT)\
+        ->Tuple[np.ndarray,np.ndarray,np.ndarray]:
+    # orientation averages of the unshaded fraction (times 1, cos & sin of the orientation) for arrays of altitude
+    # angles, which only depend on the obstacle slope (scalar or one value per altitude angle)
+    # the integrand depends on the orientation relative to the azimuth only via |sin| & |cos| (period pi, symmetric to
+    # pi/2), thus the average over [0, pi] equals the average over [0, pi/2], where the integrand is smooth except for
+    # the obstacle shading step (arctan approximation), at which the interval is split with graded subintervals
+    angle_altitude = np.atleast_1d(np.asarray(angle_altitude, dtype=float))
+    slope_obstacle = np.reshape(slope_obstacle, (-1, 1, 1))
+
+    # shading step at angle_altitude = arctan(slope_obstacle * sin(angle)), subintervals limited by the angles with
+    # graded altitude distances from the step
+    altitude_steps = [0]
+    for grading in SOLAR_INTEGRATION_STEP_GRADING:
+        altitude_steps += [-grading / MINIMUM_ANGLE_ARCTAN_APPROXIMATION_CONSTANT,
+                           grading / MINIMUM_ANGLE_ARCTAN_APPROXIMATION_CONSTANT]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sin_angle_step = np.tan(np.clip(angle_altitude[:, np.newaxis] + np.array(altitude_steps),
+                                        0, np.pi / 2)) / slope_obstacle[:, :, 0]
+    limits = np.sort(np.hstack([np.zeros((len(angle_altitude), 1)), np.full((len(angle_altitude), 1), np.pi / 2),
+                                np.arcsin(np.clip(np.nan_to_num(sin_angle_step, nan=1), 0, 1))]), axis=1)
+
+    # gauss-legendre rule on each subinterval (hours x subintervals x nodes)
+    nodes, weights = np.polynomial.legendre.leggauss(SOLAR_INTEGRATION_ORDERS[solar_integration])
+    limits_lower = limits[:, :-1, np.newaxis]
+    limits_half_width = 0.5 * np.diff(limits, axis=1)[:, :, np.newaxis]
+    angle = limits_lower + limits_half_width * (nodes + 1)
+
+    minimum_angle_factor = (np.arctan((angle_altitude[:, np.newaxis, np.newaxis]
+                                       - np.arctan(slope_obstacle * np.sin(angle)))
+                                      * MINIMUM_ANGLE_ARCTAN_APPROXIMATION_CONSTANT) / np.pi + 0.5)
+    weighted_factor = 2 / np.pi * limits_half_width * weights * minimum_angle_factor
+
+    return (np.sum(weighted_factor, axis=(1, 2)), np.sum(weighted_factor * np.cos(angle), axis=(1, 2)),
+            np.sum(weighted_factor * np.sin(angle), axis=(1, 2)))
+
+
+
+def calculate_solar_absorption_coefficients_gauss_legendre(geometry:tuple,
+                                                           obstacle_distance:float,
+                                                           obstacle_height:float,
+                                                           angle_altitude:np.ndarray,
+                                                           solar_integration:str=SOLAR_INTEGRATION_DEFAULT)\
+        ->Tuple[np.ndarray,np.ndarray]:
+    # orientation-averaged absorption per horizontal and vertical irradiation [m²] for arrays of altitude angles
+    # (geometry & obstacle values either scalars or arrays with one value per altitude angle)
+    vehicle = dict(zip(VEHICLE_PARAMETERS_SOLAR_ABSORPTION, geometry))
+    slope_obstacle = np.abs((np.asarray(obstacle_height) - vehicle["height"]) / obstacle_distance)
+    integral, integral_cos, integral_sin = calculate_solar_orientation_integrals_gauss_legendre(
+        slope_obstacle, angle_altitude, solar_integration)
+    area_horizontal, area_front, area_side = calculate_solar_absorption_areas(vehicle)
+
+    return np.abs(area_horizontal * integral), np.abs(area_front * integral_cos + area_side * integral_sin)
+
+
+
+def calculate_solar_integration_error_report(vehicle:dict,
+                                             obstacle_distance:float,
+                                             obstacle_height:float,
+                                             latitude:float,
+                                             solar_integration:str=SOLAR_INTEGRATION_DEFAULT)->dict:
+    # deviation of gauss-legendre orientation averaging from adaptive quad reference for all months & hours with
+    # the sun above the horizon
+    geometry = get_solar_absorption_geometry(vehicle)
+    months, hours = np.meshgrid(np.arange(1, 13), np.arange(0, 24), indexing="ij")
+    angle_altitude, angle_zenith, angle_azimuth = calculate_solar_angles_array(months.flatten(), hours.flatten(),
+                                                                               latitude)
+    angle_altitude = angle_altitude[angle_altitude > 0]
+
+    coefficients = np.array(calculate_solar_absorption_coefficients_gauss_legendre(
+        geometry, obstacle_distance, obstacle_height, angle_altitude, solar_integration))
+    coefficients_reference = np.array([calculate_solar_absorption_coefficients(
+        geometry, float(obstacle_distance), float(obstacle_height), float(altitude), 0.0)
+        for altitude in angle_altitude]).T.reshape(2, len(angle_altitude))
+
+    error_absolute = np.abs(coefficients - coefficients_reference)
+    error_relative = error_absolute / np.maximum(np.abs(coefficients_reference), FLOAT_TOLERANCE)
+    report = {"solar_integration": solar_integration, "hours": len(angle_altitude)}
+    for index, component in enumerate(["horizontal", "vertical"]):
+        report[f"error_absolute_max_{component}"] = float(np.max(error_absolute[index], initial=0))
+        report[f"error_relative_max_{component}"] = float(np.max(error_relative[index], initial=0))
+
+    return report
+
+
+
 def simulate_solar_absorption(vehicle:dict,
-                              vehicle_name_version:str,
                               obstacle_distance:float,
                               obstacle_height:float,
                               irradiation:float,
                               month:int,
                               hour:int,
                               latitude:float,
-                              solar_heating_lookup_table:dict,
                               irradiation_normal:bool=True)->float:
     # (horizontal solar irradiation measurement)
-    delta = 23.45 / 180 * np.pi * np.sin(2 * np.pi / 365 * (284 + MONTH_DAYS_MID[month-1]))
-    omega = 15 / 180 * np.pi * (hour - 12)
-
-    # convert latitude from degree to radians
-    angle_latitude = np.pi/180 * latitude
-
-    # calculate solar angles
-    trigon_arg = (np.cos(angle_latitude) * np.cos(delta) * np.cos(omega)
-                  + np.sin(angle_latitude) * np.sin(delta))
-    angle_zenith = np.arccos(trigon_arg)
-    # source: duffie, equation (1.6.5)
-    angle_altitude = np.arcsin(trigon_arg)
-
-    arg_arccos = ((np.cos(angle_zenith)*np.sin(angle_latitude) - np.sin(delta))
-                  /(np.sin(angle_zenith) * np.cos(angle_latitude)))
-    arg_arccos = min(arg_arccos, 1)
-    arg_arccos = max(arg_arccos, -1)
-    angle_azimuth_south = np.sign(omega) * np.abs(np.arccos(arg_arccos))
-    # source: duffie, equation (1.6.6)
-    angle_azimuth = np.mod(np.pi-angle_azimuth_south, 2*np.pi)
+    # look up solar angles (memoized per latitude)
+    angle_altitude_table, angle_zenith_table, angle_azimuth_table = calculate_sun_position_table(float(latitude))
+    angle_altitude = angle_altitude_table[month-1, hour]
+    angle_zenith = angle_zenith_table[month-1, hour]
+    angle_azimuth = angle_azimuth_table[month-1, hour]
     #print("month=" + str(month) + ",\t hour=" + str(hour) + ", \t angle_altitude=" + str(180/np.pi*angle_altitude)
     #     + "°,\t azimuth=" + str(180/np.pi*angle_azimuth) + "°")
 
@@ -148,25 +390,21 @@ def simulate_solar_absorption(vehicle:dict,
 
     # TODO check SOLAR calculation
 
-    # integrate over angle_orientation [0, pi] and calculate average absorption (if already calculated, use table)
-    key = (vehicle_name_version, obstacle_distance, obstacle_height, angle_altitude, angle_azimuth,
-           irradiation_horizontal, irradiation_vertical)
-    if key in solar_heating_lookup_table.keys():
-        absorption_average = solar_heating_lookup_table[key]
-    else:
-        absorption_integrated, absorption_error = quad(
-            simulate_solar_absorption_single_orientation, 0, np.pi,
-            args=(vehicle, obstacle_distance, obstacle_height, angle_altitude, angle_azimuth,
-                  irradiation_horizontal, irradiation_vertical))
-        absorption_average = np.abs(absorption_integrated / np.pi)
-        solar_heating_lookup_table[key] = absorption_average
+    if irradiation_horizontal == 0 and irradiation_vertical == 0:
+        return 0
+
+    # average absorption over angle_orientation [0, pi] (linear in horizontal and vertical irradiation)
+    absorption_coefficient_horizontal, absorption_coefficient_vertical = calculate_solar_absorption_coefficients(
+        get_solar_absorption_geometry(vehicle), float(obstacle_distance), float(obstacle_height),
+        float(angle_altitude), float(angle_azimuth))
+    absorption_average = (absorption_coefficient_horizontal * irradiation_horizontal
+                          + absorption_coefficient_vertical * irradiation_vertical)
 
     return absorption_average
 
 
 
 def simulate_passive_heat_flows(vehicle:dict,
-                                vehicle_name_version:str,
                                 obstacle_distance:float,
                                 obstacle_height:float,
                                 passenger_number:float,
@@ -177,15 +415,13 @@ def simulate_passive_heat_flows(vehicle:dict,
                                 hour:int,
                                 latitude:float,
                                 consider_solar_heating:bool,
-                                solar_heating_lookup_table:dict=None,
                                 irradiation_normal:bool=True)->Tuple[float,float,float,float,float,float]:
 
     # calculate solar heat flow
     heat_solar = 0
     if consider_solar_heating:
-        heat_solar = 1e-3 * simulate_solar_absorption(vehicle, vehicle_name_version, obstacle_distance, obstacle_height,
-                                                      irradiation, month, hour, latitude,
-                                                      solar_heating_lookup_table, irradiation_normal)
+        heat_solar = 1e-3 * simulate_solar_absorption(vehicle, obstacle_distance, obstacle_height,
+                                                      irradiation, month, hour, latitude, irradiation_normal)
 
     area_convection = (2 * vehicle["length"] * vehicle["height"] + 2 * vehicle["width"] * vehicle["height"]
                        + (2 - vehicle["fraction_obstruction_roof"] - vehicle["fraction_obstruction_floor"])
@@ -209,7 +445,6 @@ def simulate_passive_heat_flows(vehicle:dict,
 
 
 def simulate_heat_flows(vehicle:dict,
-                        vehicle_name_version:str,
                         obstacle_distance:float,
                         obstacle_height:float,
                         passenger_number:float,
@@ -220,13 +455,11 @@ def simulate_heat_flows(vehicle:dict,
                         hour:int,
                         latitude:float,
                         consider_solar_heating:bool,
-                        solar_heating_lookup_table:dict=None,
                         irradiation_normal:bool=True)->dict:
     (heat_solar, heat_passenger, heat_auxiliary_devices, heat_convection, heat_ventilation, heat_doors)\
-        = simulate_passive_heat_flows(vehicle, vehicle_name_version, obstacle_distance, obstacle_height,
+        = simulate_passive_heat_flows(vehicle, obstacle_distance, obstacle_height,
                                       passenger_number, temperature_vehicle, temperature_environment, irradiation,
-                                      month, hour, latitude, consider_solar_heating, solar_heating_lookup_table,
-                                      irradiation_normal)
+                                      month, hour, latitude, consider_solar_heating, irradiation_normal)
 
     heat_difference = (heat_solar + heat_passenger + heat_auxiliary_devices
                        + heat_convection + heat_ventilation + heat_doors)
@@ -281,13 +514,13 @@ def simulate_device_electricity_demand(vehicle:dict,
     # 1: all heat pumps with eta_ex > eta_ex_min (in order of decreasing eta_ex)
     # 2: all resistive heaters
     # 3: all heat pumps with eta_ex <= eta_ex_min (in order of decreasing eta_ex)
-    heat_pumps_sorted = copy.deepcopy(vehicle["heating_cooling_devices"]["heat_pumps"])
-    sorted(heat_pumps_sorted, key=lambda x: x["exergy_efficiency"], reverse=True)
-    # TODO check sorting
+    # (electricity consumption of heat pumps in original order)
+    heat_pumps_sorted = sorted(enumerate(vehicle["heating_cooling_devices"]["heat_pumps"]),
+                               key=lambda x: x[1]["exergy_efficiency"], reverse=True)
 
     heat_demand_remainder = heat_demand
-    k = 1
-    for heat_pump in heat_pumps_sorted:
+    for index_original, heat_pump in heat_pumps_sorted:
+        k = 1 + index_original
         if (heat_demand > 0) and heat_pump['heating']:
             heating_efficiency = heat_pump['exergy_efficiency'] * carnot_efficiency_heating
             #print("heat", T_environment, T_setpoint, carnot_efficiency_heating, heating_efficiency)
@@ -302,7 +535,6 @@ def simulate_device_electricity_demand(vehicle:dict,
             heat = max(heat_demand_remainder, heat_pump_max_cool)
             heat_demand_remainder -= heat
             electricity_consumption[k] = heat_pump['electric_power_max'] * (heat / heat_pump_max_cool)
-        k += 1
     if (heat_demand > 0):
         heat = min(heat_demand_remainder, vehicle["heating_cooling_devices"]["resistive_heating_power_max"])
         heat_demand_remainder -= heat
@@ -321,9 +553,75 @@ def simulate_device_electricity_demand(vehicle:dict,
 
 
 
+def compile_device_table(vehicle:dict)->dict:
+    # read-only arrays of heat pump parameters in dispatch order (decreasing exergy efficiency) and original indices
+    heat_pumps = vehicle["heating_cooling_devices"]["heat_pumps"]
+    dispatch_order = np.argsort([-heat_pump["exergy_efficiency"] for heat_pump in heat_pumps], kind="stable")
+
+    device_table = {
+        "dispatch_order": dispatch_order.astype(int),
+        "electric_power_max": np.array([heat_pumps[i]["electric_power_max"] for i in dispatch_order], dtype=float),
+        "exergy_efficiency": np.array([heat_pumps[i]["exergy_efficiency"] for i in dispatch_order], dtype=float),
+        "heating": np.array([heat_pumps[i]["heating"] for i in dispatch_order], dtype=bool),
+        "cooling": np.array([heat_pumps[i]["cooling"] for i in dispatch_order], dtype=bool)
+    }
+    for value in device_table.values():
+        value.setflags(write=False)
+    device_table["resistive_heating_power_max"] = float(
+        vehicle["heating_cooling_devices"]["resistive_heating_power_max"])
+
+    return device_table
+
+
+
+def simulate_device_electricity_demand_array(device_table:dict,
+                                             heat_demand:np.ndarray,
+                                             temperature_environment:np.ndarray,
+                                             temperature_vehicle:np.ndarray)->Tuple[np.ndarray,np.ndarray,np.ndarray]:
+    # greedy dispatch (as simulate_device_electricity_demand) for arrays of hours, electric power of shape
+    # hours x (1 + heat pumps) with resistive heating in column 0 and heat pumps in original order
+
+    # carnot efficiencies
+    temperature_difference = np.abs(temperature_vehicle - temperature_environment)
+    temperature_equal = temperature_difference == 0
+    temperature_difference = np.where(temperature_equal, 1, temperature_difference)
+    carnot_efficiency_heating = np.where(temperature_equal, INFINITE_EFFICIENCY,
+                                         (temperature_vehicle + C_TO_K) / temperature_difference)
+    carnot_efficiency_cooling = np.where(temperature_equal, INFINITE_EFFICIENCY,
+                                         (temperature_environment + C_TO_K) / temperature_difference)
+
+    # thermal capacity of heat pumps in dispatch order (hours x heat pumps)
+    heating = heat_demand > 0
+    cooling = heat_demand < 0
+    capacity = device_table["electric_power_max"] * device_table["exergy_efficiency"] * (
+            (heating[:, np.newaxis] & device_table["heating"]) * carnot_efficiency_heating[:, np.newaxis]
+            + (cooling[:, np.newaxis] & device_table["cooling"]) * carnot_efficiency_cooling[:, np.newaxis])
+
+    # allocate heat demand to heat pumps in dispatch order, remainder to resistive heating
+    heat_demand_absolute = np.abs(heat_demand)
+    capacity_preceding = np.cumsum(capacity, axis=1) - capacity
+    heat = np.clip(heat_demand_absolute[:, np.newaxis] - capacity_preceding, 0, capacity)
+    electricity_heat_pumps = device_table["electric_power_max"] * np.divide(heat, capacity,
+                                                                            out=np.zeros(capacity.shape),
+                                                                            where=capacity > 0)
+    heat_demand_remainder = heat_demand_absolute - np.sum(heat, axis=1)
+    heat_resistive = np.where(heating, np.minimum(heat_demand_remainder,
+                                                  device_table["resistive_heating_power_max"]), 0)
+    heat_demand_remainder = heat_demand_remainder - heat_resistive
+
+    electricity_demand = np.zeros((len(heat_demand), 1 + len(device_table["dispatch_order"])))
+    electricity_demand[:, 0] = heat_resistive
+    electricity_demand[:, 1 + device_table["dispatch_order"]] = electricity_heat_pumps
+
+    heating_satisfied = ~heating | (heat_demand_remainder <= FLOAT_TOLERANCE)
+    cooling_satisfied = ~cooling | (heat_demand_remainder <= FLOAT_TOLERANCE)
+
+    return electricity_demand, heating_satisfied, cooling_satisfied
+
+
+
 def power_difference(temperature_vehicle:float,
                      vehicle:dict,
-                     vehicle_name_version:str,
                      obstacle_distance:float,
                      obstacle_height:float,
                      passenger_number:float,
@@ -333,34 +631,69 @@ def power_difference(temperature_vehicle:float,
                      hour:int,
                      latitude:float,
                      consider_solar_heating:bool,
-                     solar_heating_lookup_table:dict=None,
                      irradiation_normal:bool=True)->float:
 
     (heat_solar, heat_passenger, heat_auxiliary_devices, heat_convection, heat_ventilation, heat_doors) \
-        = simulate_passive_heat_flows(vehicle, vehicle_name_version, obstacle_distance, obstacle_height,
+        = simulate_passive_heat_flows(vehicle, obstacle_distance, obstacle_height,
                                       passenger_number, temperature_vehicle, temperature_environment, irradiation,
-                                      month, hour, latitude, consider_solar_heating, solar_heating_lookup_table,
-                                      irradiation_normal)
+                                      month, hour, latitude, consider_solar_heating, irradiation_normal)
 
     return (heat_solar + heat_passenger + heat_auxiliary_devices + heat_convection + heat_ventilation + heat_doors)
 
 
 
-def interpolate_temperature_points(temperature_points:list, temperature_environment:float)->float:
-    if len(temperature_points) == 1:
-        return temperature_points[1]
+def compile_temperature_control_curve(temperature_control_curve:dict)->dict:
+    # sorted, read-only arrays of environment & setpoint temperatures (shape 2 x points) for heating & cooling
+    # (copies, the specified temperature control curve remains unchanged)
+    compiled_curve = {}
+    for mode in ["heating", "cooling"]:
+        points = np.array(sorted(temperature_control_curve[mode], key=lambda point: point[0]),
+                          dtype=float).reshape(-1, 2)
+        points = np.ascontiguousarray(points.T)
+        points.setflags(write=False)
+        compiled_curve[mode] = points
+
+    return compiled_curve
+
+
+
+def compile_temperature_control_curves(temperature_control_curves:dict)->dict:
+    return {name: compile_temperature_control_curve(temperature_control_curve)
+            for name, temperature_control_curve in temperature_control_curves.items()}
+
 
-    for i in range(1, len(temperature_points)):
-        x0, y0 = temperature_points[i - 1]
-        x1, y1 = temperature_points[i]
-        if x0 <= temperature_environment <= x1:
-            return y0 + (y1 - y0) * (temperature_environment - x0) / (x1 - x0)
+
+def calculate_setpoint_temperatures_array(compiled_curve:dict,
+                                          temperature_environment:np.ndarray)->Tuple[np.ndarray,np.ndarray]:
+    # linear interpolation of heating & cooling temperature (clamped to first & last point, no heating or cooling for
+    # curves without points) for environment temperatures of any shape (e.g. 12 x 24)
+    temperature_environment = np.asarray(temperature_environment, dtype=float)
+
+    heating_temperature = np.full(temperature_environment.shape, -np.inf)
+    if compiled_curve["heating"].shape[1] > 0:
+        heating_temperature = np.interp(temperature_environment, compiled_curve["heating"][0],
+                                        compiled_curve["heating"][1])
+
+    cooling_temperature = np.full(temperature_environment.shape, np.inf)
+    if compiled_curve["cooling"].shape[1] > 0:
+        cooling_temperature = np.interp(temperature_environment, compiled_curve["cooling"][0],
+                                        compiled_curve["cooling"][1])
+
+    return heating_temperature, cooling_temperature
+
+
+
+def calculate_setpoint_temperatures(compiled_curve:dict,
+                                    temperature_environment:float)->Tuple[float,float]:
+    heating_temperature, cooling_temperature = calculate_setpoint_temperatures_array(compiled_curve,
+                                                                                     temperature_environment)
+
+    return float(heating_temperature), float(cooling_temperature)
 
 
 
 def simulate_vehicle_temperature(vehicle:dict,
-                                 vehicle_name_version:str,
-                                 temperature_control_curve:dict,
+                                 compiled_curve:dict,
                                  obstacle_distance:float,
                                  obstacle_height:float,
                                  passenger_number:float,
@@ -370,57 +703,41 @@ def simulate_vehicle_temperature(vehicle:dict,
                                  hour:int,
                                  latitude:float,
                                  consider_solar_heating:bool,
-                                 solar_heating_lookup_table:dict=None,
                                  irradiation_normal:bool=True)->float:
 
-    # calculate theoretical vehicle temperature from heat balance
-    # TODO check parameters
-    theoretical_temperature_vehicle = fsolve(power_difference, temperature_environment,
-                    args=(vehicle, vehicle_name_version, obstacle_distance, obstacle_height, passenger_number,
-                          temperature_environment, irradiation, month, hour, latitude, consider_solar_heating,
-                          solar_heating_lookup_table, irradiation_normal))[0]
-
-    # ensure sorted input data
-    temperature_control_curve["heating"].sort(key=lambda point: point[0])
-    temperature_control_curve["cooling"].sort(key=lambda point: point[0])
-
-    # calculate heating & cooling temperature
-    heating_temperature = -np.inf
-    if len(temperature_control_curve["heating"]) > 0:
-        if (temperature_control_curve["heating"][0][0] <= temperature_environment
-                and temperature_environment <= temperature_control_curve["heating"][-1][0]):
-            heating_temperature = interpolate_temperature_points(temperature_control_curve["heating"],
-                                                                 temperature_environment)
-        elif temperature_environment < temperature_control_curve["heating"][0][0]:
-            heating_temperature = temperature_control_curve["heating"][0][1]
-        else:
-            heating_temperature = temperature_control_curve["heating"][-1][1]
-
-    cooling_temperature = np.inf
-    if len(temperature_control_curve["cooling"]) > 0:
-        if (temperature_control_curve["cooling"][0][0] <= temperature_environment
-                and temperature_environment <= temperature_control_curve["cooling"][-1][0]):
-            cooling_temperature = interpolate_temperature_points(temperature_control_curve["cooling"],
-                                                                 temperature_environment)
-        elif temperature_environment < temperature_control_curve["cooling"][0][0]:
-            cooling_temperature = temperature_control_curve["cooling"][0][1]
-        else:
-            cooling_temperature = temperature_control_curve["cooling"][-1][1]
+    heating_temperature, cooling_temperature = calculate_setpoint_temperatures(compiled_curve, temperature_environment)
 
-    # check whether theoretical temperature is within heating & cooling temperature range
-    if (heating_temperature <= theoretical_temperature_vehicle
-            and theoretical_temperature_vehicle <= cooling_temperature):
-        return theoretical_temperature_vehicle
-    elif theoretical_temperature_vehicle < heating_temperature:
+    # passive heat balance coefficients straight from the vehicle parameters (solar heat flow computed once per hour)
+    heat_solar = 0
+    if consider_solar_heating:
+        heat_solar = 1e-3 * simulate_solar_absorption(vehicle, obstacle_distance, obstacle_height,
+                                                      irradiation, month, hour, latitude, irradiation_normal)
+    coefficients = calculate_heat_flow_coefficients(vehicle)
+    heat_constant = 1e-3 * passenger_number * HEAT_PERSON + coefficients["heating_power_auxiliary"] + heat_solar
+    conductance_linear = coefficients["conductance_convection"] + coefficients["conductance_ventilation"]
+    coefficient_doors = coefficients["coefficient_doors"]
+
+    # check whether theoretical temperature is below heating temperature or above cooling temperature
+    # (power difference decreases strictly with vehicle temperature, thus its sign at the setpoints is sufficient)
+    if heating_temperature > -np.inf and calculate_power_difference_derivative(
+            heating_temperature, temperature_environment, heat_constant, conductance_linear, coefficient_doors)[0] < 0:
+        record_solver_skipped(1)
         return heating_temperature
-    else:
+    if cooling_temperature < np.inf and calculate_power_difference_derivative(
+            cooling_temperature, temperature_environment, heat_constant, conductance_linear, coefficient_doors)[0] > 0:
+        record_solver_skipped(1)
         return cooling_temperature
 
+    # calculate theoretical vehicle temperature from heat balance (within heating & cooling temperature range)
+    theoretical_temperature_vehicle = float(solve_vehicle_temperature_newton(
+        temperature_environment, heat_constant, conductance_linear, coefficient_doors)[0])
+
+    return theoretical_temperature_vehicle
+
 
 
 def simulate_vehicle(vehicle:dict,
-                     vehicle_name_version:str,
-                     temperature_control_curve:dict,
+                     compiled_curve:dict,
                      obstacle_distance:float,
                      obstacle_height:float,
                      passenger_number:float,
@@ -430,19 +747,16 @@ def simulate_vehicle(vehicle:dict,
                      hour:int,
                      latitude:float,
                      consider_solar_heating:bool,
-                     solar_heating_lookup_table:dict=None,
                      irradiation_normal:bool=True)->Tuple[float,dict,list,bool,bool]:
 
-    temperature_vehicle = simulate_vehicle_temperature(vehicle, vehicle_name_version, temperature_control_curve,
+    temperature_vehicle = simulate_vehicle_temperature(vehicle, compiled_curve,
                                                        obstacle_distance, obstacle_height, passenger_number,
                                                        temperature_environment, irradiation, month, hour,
-                                                       latitude, consider_solar_heating, solar_heating_lookup_table,
-                                                       irradiation_normal)
+                                                       latitude, consider_solar_heating, irradiation_normal)
 
-    heat_flows = simulate_heat_flows(vehicle, vehicle_name_version, obstacle_distance, obstacle_height,
+    heat_flows = simulate_heat_flows(vehicle, obstacle_distance, obstacle_height,
                                      passenger_number, temperature_vehicle, temperature_environment, irradiation,
-                                     month, hour, latitude, consider_solar_heating, solar_heating_lookup_table,
-                                     irradiation_normal)
+                                     month, hour, latitude, consider_solar_heating, irradiation_normal)
 
     electricity_demand, heating_satisfied, cooling_satisfied =(
         simulate_device_electricity_demand(vehicle,
@@ -453,6 +767,1001 @@ def simulate_vehicle(vehicle:dict,
 
 
 
+# vectorized engine (all operation hours of one vehicle version at once)
+
+
+def calculate_solar_angles_array(months:np.ndarray,
+                                 hours:np.ndarray,
+                                 latitude:float,
+                                 days:np.ndarray=None)->Tuple[np.ndarray,np.ndarray,np.ndarray]:
+    # solar altitude, zenith & azimuth angles as in simulate_solar_absorption
+    # (days: day in year for the declination instead of mid-month days, e.g. for the hourly simulation)
+    if days is None:
+        days = np.array(MONTH_DAYS_MID)[np.asarray(months) - 1]
+    delta = 23.45 / 180 * np.pi * np.sin(2 * np.pi / 365 * (284 + np.asarray(days)))
+    omega = 15 / 180 * np.pi * (np.asarray(hours) - 12)
+
+    angle_latitude = np.pi/180 * latitude
+
+    trigon_arg = (np.cos(angle_latitude) * np.cos(delta) * np.cos(omega)
+                  + np.sin(angle_latitude) * np.sin(delta))
+    angle_zenith = np.arccos(trigon_arg)
+    angle_altitude = np.arcsin(trigon_arg)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        arg_arccos = ((np.cos(angle_zenith)*np.sin(angle_latitude) - np.sin(delta))
+                      /(np.sin(angle_zenith) * np.cos(angle_latitude)))
+    arg_arccos = np.clip(arg_arccos, -1, 1)
+    angle_azimuth_south = np.sign(omega) * np.abs(np.arccos(arg_arccos))
+    angle_azimuth = np.mod(np.pi-angle_azimuth_south, 2*np.pi)
+
+    return angle_altitude, angle_zenith, angle_azimuth
+
+
+
+@functools.lru_cache(maxsize=SUN_POSITION_CACHE_SIZE)
+def calculate_sun_position_table(latitude:float)->Tuple[np.ndarray,np.ndarray,np.ndarray]:
+    # solar altitude, zenith & azimuth angles for all months & hours (12 x 24, read-only, memoized per latitude)
+    months, hours = np.meshgrid(np.arange(1, 13), np.arange(0, 24), indexing="ij")
+    angles = calculate_solar_angles_array(months, hours, latitude)
+    for angle in angles:
+        angle.setflags(write=False)
+
+    return angles
+
+
+
+@functools.lru_cache(maxsize=SUN_POSITION_CACHE_SIZE)
+def calculate_sun_position_table_hourly(latitude:float)->Tuple[np.ndarray,np.ndarray,np.ndarray]:
+    # solar altitude, zenith & azimuth angles for all hours of the reference year (8760, declination per day,
+    # read-only, memoized per latitude)
+    days, hours = np.meshgrid(np.arange(1, DAYS_YEAR + 1), np.arange(0, 24), indexing="ij")
+    angles = tuple(angle.ravel() for angle in calculate_solar_angles_array(None, hours, latitude, days))
+    for angle in angles:
+        angle.setflags(write=False)
+
+    return angles
+
+
+
+def calculate_solar_profile_hourly(location:dict, irradiation_normal:bool=True)->dict:
+    # sun geometry & irradiation components of a location for all hours of the reference year (8760)
+    angle_altitude, angle_zenith, angle_azimuth = calculate_sun_position_table_hourly(float(location["latitude"]))
+    irradiation_horizontal, irradiation_vertical = calculate_irradiation_components_array(
+        np.array(location["irradiation_direct_normal_hourly"], dtype=float), angle_altitude, angle_zenith,
+        irradiation_normal)
+
+    return {"angle_altitude": angle_altitude, "angle_zenith": angle_zenith, "angle_azimuth": angle_azimuth,
+            "irradiation_horizontal": irradiation_horizontal, "irradiation_vertical": irradiation_vertical}
+
+
+
+def calculate_solar_profile(location:dict, irradiation_normal:bool=True)->dict:
+    # sun geometry & irradiation components of a location for all months & hours (12 x 24)
+    angle_altitude, angle_zenith, angle_azimuth = calculate_sun_position_table(float(location["latitude"]))
+    irradiation_horizontal, irradiation_vertical = calculate_irradiation_components_array(
+        np.array(location["irradiation_direct_normal"], dtype=float), angle_altitude, angle_zenith, irradiation_normal)
+
+    return {"angle_altitude": angle_altitude, "angle_zenith": angle_zenith, "angle_azimuth": angle_azimuth,
+            "irradiation_horizontal": irradiation_horizontal, "irradiation_vertical": irradiation_vertical}
+
+
+
+def calculate_irradiation_components_array(irradiation:np.ndarray,
+                                           angle_altitude:np.ndarray,
+                                           angle_zenith:np.ndarray,
+                                           irradiation_normal:bool=True)->Tuple[np.ndarray,np.ndarray]:
+    # horizontal & vertical irradiation as in simulate_solar_absorption
+    if irradiation_normal:
+        irradiation_horizontal = np.maximum(0, np.cos(angle_altitude)) * irradiation
+        irradiation_vertical = np.maximum(0, np.sin(angle_altitude)) * irradiation
+    else:
+        irradiation_normal_theoretical = irradiation / np.maximum(1e-10, np.cos(angle_zenith))
+        irradiation_limited = irradiation_normal_theoretical > NORMAL_DIRECT_SOLAR_IRRADIATION_UPPER_BOUND
+        limit_factor = np.where(irradiation_limited,
+                                NORMAL_DIRECT_SOLAR_IRRADIATION_UPPER_BOUND
+                                / np.where(irradiation_limited, irradiation_normal_theoretical, 1), 1)
+        irradiation_horizontal = irradiation * limit_factor
+        irradiation_vertical = np.maximum(0, np.tan(angle_zenith)) * irradiation_horizontal * limit_factor
+
+    return irradiation_horizontal, irradiation_vertical
+
+
+
+def simulate_solar_absorption_array(vehicle:CompiledVehicle,
+                                    obstacle_distance:float,
+                                    obstacle_height:float,
+                                    irradiation:np.ndarray,
+                                    months:np.ndarray,
+                                    hours:np.ndarray,
+                                    latitude:float,
+                                    irradiation_normal:bool=True,
+                                    solar_integration:str=SOLAR_INTEGRATION_DEFAULT,
+                                    solar_profile:dict=None)->np.ndarray:
+    # (solar_profile: sun geometry & irradiation components per operation hour, see calculate_solar_profile)
+
+    # solar absorption is independent of the vehicle temperature, thus evaluate once per hour (not per solver step)
+    if solar_integration == "quad":
+        absorption = np.zeros(len(hours))
+        for i in range(len(hours)):
+            absorption[i] = simulate_solar_absorption(vehicle.vehicle_data, obstacle_distance, obstacle_height,
+                                                      irradiation[i], int(months[i]), int(hours[i]), latitude,
+                                                      irradiation_normal)
+        return absorption
+
+    # all hours at once (orientation averaging with fixed gauss-legendre rule)
+    if solar_profile is not None:
+        angle_altitude = solar_profile["angle_altitude"]
+        irradiation_horizontal = solar_profile["irradiation_horizontal"]
+        irradiation_vertical = solar_profile["irradiation_vertical"]
+    else:
+        angle_altitude, angle_zenith, angle_azimuth = calculate_solar_angles_array(months, hours, latitude)
+        irradiation_horizontal, irradiation_vertical = calculate_irradiation_components_array(
+            np.asarray(irradiation, dtype=float), angle_altitude, angle_zenith, irradiation_normal)
+
+    return simulate_solar_absorption_geometry_array(vehicle.solar_geometry, obstacle_distance, obstacle_height,
+                                                    angle_altitude, irradiation_horizontal, irradiation_vertical,
+                                                    solar_integration)
+
+
+
+def simulate_solar_absorption_geometry_array(geometry:tuple,
+                                             obstacle_distance:float,
+                                             obstacle_height:float,
+                                             angle_altitude:np.ndarray,
+                                             irradiation_horizontal:np.ndarray,
+                                             irradiation_vertical:np.ndarray,
+                                             solar_integration:str=SOLAR_INTEGRATION_DEFAULT)->np.ndarray:
+    # solar absorption [W] for arrays of hours with the sun geometry & irradiation components given (gauss-legendre
+    # orientation averaging, geometry see get_solar_absorption_geometry)
+    absorption = np.zeros(len(angle_altitude))
+    irradiated = (irradiation_horizontal != 0) | (irradiation_vertical != 0)
+    if irradiated.any():
+        coefficient_horizontal, coefficient_vertical = calculate_solar_absorption_coefficients_gauss_legendre(
+            geometry, obstacle_distance, obstacle_height, angle_altitude[irradiated], solar_integration)
+        absorption[irradiated] = (coefficient_horizontal * irradiation_horizontal[irradiated]
+                                  + coefficient_vertical * irradiation_vertical[irradiated])
+
+    return absorption
+
+
+
+def simulate_passive_heat_flows_array(vehicle:CompiledVehicle,
+                                      passenger_number:float,
+                                      temperature_vehicle:np.ndarray,
+                                      temperature_environment:np.ndarray,
+                                      heat_solar:np.ndarray)\
+        ->Tuple[np.ndarray,np.ndarray,np.ndarray,np.ndarray,np.ndarray,np.ndarray]:
+
+    # calculate remaining heat flows [kW]
+    heat_passenger = np.full(np.shape(temperature_environment), 1e-3 * passenger_number * HEAT_PERSON)
+    heat_auxiliary_devices = np.full(np.shape(temperature_environment), vehicle.heating_power_auxiliary)
+    heat_convection = vehicle.conductance_convection * (temperature_environment - temperature_vehicle)
+    heat_ventilation = vehicle.conductance_ventilation * (temperature_environment - temperature_vehicle)
+    heat_doors = (vehicle.coefficient_doors
+                  * np.sqrt(np.abs(temperature_vehicle - temperature_environment) / (C_TO_K + temperature_environment))
+                  * (temperature_environment - temperature_vehicle))
+
+    return heat_solar, heat_passenger, heat_auxiliary_devices, heat_convection, heat_ventilation, heat_doors
+
+
+
+def calculate_passive_heat_flow_coefficients(vehicle:CompiledVehicle,
+                                             passenger_number:float)->Tuple[float,float,float]:
+    # passive heat balance (without solar heat flow) in terms of the temperature difference dT = T_vehicle - T_env:
+    # heat_constant - conductance_linear * dT - coefficient_doors * sqrt(|dT| / T_env[K]) * dT   [kW, kW/K, kW/K]
+    heat_constant = 1e-3 * passenger_number * HEAT_PERSON + vehicle.heating_power_auxiliary
+    conductance_linear = vehicle.conductance_convection + vehicle.conductance_ventilation
+
+    return heat_constant, conductance_linear, vehicle.coefficient_doors
+
+
+
+def calculate_power_difference_derivative(temperature_vehicle:np.ndarray,
+                                          temperature_environment:np.ndarray,
+                                          heat_constant:np.ndarray,
+                                          conductance_linear:np.ndarray,
+                                          coefficient_doors:np.ndarray)->Tuple[np.ndarray,np.ndarray]:
+    # power difference and its analytic derivative with respect to the vehicle temperature
+    temperature_difference = temperature_vehicle - temperature_environment
+    door_factor = coefficient_doors * np.sqrt(np.abs(temperature_difference) / (C_TO_K + temperature_environment))
+
+    power = heat_constant - conductance_linear * temperature_difference - door_factor * temperature_difference
+    derivative = -conductance_linear - 1.5 * door_factor
+
+    return power, derivative
+
+
+
+def solve_vehicle_temperature_newton(temperature_environment:np.ndarray,
+                                     heat_constant:np.ndarray,
+                                     conductance_linear:np.ndarray,
+                                     coefficient_doors:np.ndarray)->Tuple[np.ndarray,dict]:
+    # batched newton solver for the free-floating vehicle temperature (arrays are broadcast, e.g. versions x hours)
+    temperature_environment, heat_constant, conductance_linear, coefficient_doors = (
+        np.broadcast_arrays(np.asarray(temperature_environment, dtype=float), np.asarray(heat_constant, dtype=float),
+                            np.asarray(conductance_linear, dtype=float), np.asarray(coefficient_doors, dtype=float)))
+
+    # start from the smaller of the solutions neglecting either the door term or the linear terms, which lies on the
+    # outer side of the root, such that the newton iteration converges monotonically (in contrast to warm starts from
+    # neighbouring hours, which may lie on either side of the root)
+    difference_linear = np.divide(np.abs(heat_constant), conductance_linear,
+                                  out=np.full(temperature_environment.shape, np.inf), where=conductance_linear > 0)
+    difference_doors = np.power(np.divide(np.abs(heat_constant) * np.sqrt(C_TO_K + temperature_environment),
+                                          coefficient_doors, out=np.full(temperature_environment.shape, np.inf),
+                                          where=coefficient_doors > 0), 2/3)
+    difference = np.minimum(difference_linear, difference_doors)
+    temperature = temperature_environment + np.sign(heat_constant) * np.where(np.isfinite(difference), difference, 0)
+
+    converged = np.zeros(temperature_environment.shape, dtype=bool)
+    iterations = 0
+    while iterations < NEWTON_ITERATIONS_MAX and not converged.all():
+        power, derivative = calculate_power_difference_derivative(temperature, temperature_environment,
+                                                                  heat_constant, conductance_linear,
+                                                                  coefficient_doors)
+        step = np.divide(power, derivative, out=np.zeros(temperature.shape), where=derivative < 0)
+        stalled = (derivative >= 0) & (power != 0)
+        temperature = np.where(converged | stalled, temperature, temperature - step)
+        converged = converged | ((np.abs(step) <= NEWTON_TOLERANCE) & ~stalled)
+        iterations += 1
+
+    # fall back to fsolve for hours without convergence
+    fallback = ~converged
+    if fallback.any():
+        def power_difference_fallback(temperature_vehicle:np.ndarray)->np.ndarray:
+            return calculate_power_difference_derivative(temperature_vehicle, temperature_environment[fallback],
+                                                         heat_constant[fallback], conductance_linear[fallback],
+                                                         coefficient_doors[fallback])[0]
+        temperature[fallback] = fsolve(power_difference_fallback, temperature_environment[fallback], band=(0, 0))
+
+    power, derivative = calculate_power_difference_derivative(temperature, temperature_environment, heat_constant,
+                                                              conductance_linear, coefficient_doors)
+    report = {
+        "hours": int(temperature.size),
+        "iterations": iterations,
+        "converged": int(converged.sum()),
+        "fallback": int(fallback.sum()),
+        "residual_max": float(np.max(np.abs(power), initial=0))
+    }
+    record_solver_report(report)
+
+    return temperature, report
+
+
+
+def record_solver_report(report:dict)->None:
+    engine_statistics = ENGINE_STATISTICS.get()
+    if engine_statistics is None:
+        return
+    engine_statistics["solver_batches"] += 1
+    engine_statistics["solver_hours"] += report["hours"]
+    engine_statistics["solver_iterations"] += report["iterations"]
+    engine_statistics["solver_fallbacks"] += report["fallback"]
+    engine_statistics["solver_reports"].append(report)
+
+
+
+def record_solver_skipped(number_hours:int)->None:
+    # hours, for which the temperature control curve binds and the root solve is skipped
+    engine_statistics = ENGINE_STATISTICS.get()
+    if engine_statistics is None:
+        return
+    engine_statistics["solver_skipped"] += number_hours
+
+
+
+def create_engine_statistics()->dict:
+    # solver statistics of one simulation run (or of one simulation task in a worker process)
+    return {
+        "solver_batches": 0,
+        "solver_hours": 0,
+        "solver_iterations": 0,
+        "solver_fallbacks": 0,
+        "solver_skipped": 0,
+        "solver_reports": [],
+        "simulation_units": 0,
+        "simulation_units_cached": 0,
+        "transient_vehicle_hours": 0,
+        "transient_seconds": 0.0
+    }
+
+
+
+def merge_engine_statistics(engine_statistics:dict, engine_statistics_task:dict)->None:
+    # add solver statistics of a simulation task in a worker process to the statistics of the simulation run
+    for key in ["solver_batches", "solver_hours", "solver_iterations", "solver_fallbacks", "solver_skipped",
+                "transient_vehicle_hours", "transient_seconds"]:
+        engine_statistics[key] += engine_statistics_task[key]
+    engine_statistics["solver_reports"] += engine_statistics_task["solver_reports"]
+
+
+
+def get_engine_statistics(engine_statistics:dict)->dict:
+    # copy of the solver statistics of a simulation run with derived values
+    engine_statistics = copy.deepcopy(engine_statistics)
+    engine_statistics["solar_absorption_cache"] = get_solar_absorption_cache_info()
+    engine_statistics["transient_vehicle_hours_per_second"] = (
+        engine_statistics["transient_vehicle_hours"] / engine_statistics["transient_seconds"]
+        if engine_statistics["transient_seconds"] > 0 else None)
+    return engine_statistics
+
+
+
+def compile_vehicle(vehicle_data:dict)->CompiledVehicle:
+    return CompiledVehicle(vehicle_data)
+
+
+
+def get_vehicle_version_data(vehicle_version_data:dict, vehicle_data:dict=None)->dict:
+    # vehicle data of a vehicle version, either complete ("vehicle_data") or materialized from the base vehicle data
+    # with the parameter set of the version as overlay (see regenerate_vehicle_versions)
+    if "vehicle_data" in vehicle_version_data.keys():
+        return vehicle_version_data["vehicle_data"]
+    if vehicle_data is None:
+        raise ValueError("The base vehicle data is required for vehicle versions given as parameter sets.")
+    return {**vehicle_data, **vehicle_version_data["parameter_set"]}
+
+
+
+def calculate_vehicle_content_hash(vehicle_data:dict)->str:
+    return hashlib.sha256(json.dumps(vehicle_data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+
+def compile_vehicle_versions(vehicle_versions_vehicle:dict, vehicle_versions_selected:tuple,
+                             vehicle_data:dict=None)->dict:
+    # compiled vehicle per selected version of one vehicle (vehicle versions as from regenerate_vehicle_versions, base
+    # vehicle data for versions given as parameter sets), e.g. the versions of one simulation task
+    return {vehicle_version: compile_vehicle(get_vehicle_version_data(vehicle_versions_vehicle[vehicle_version],
+                                                                      vehicle_data))
+            for vehicle_version in vehicle_versions_selected}
+
+
+
+def get_vehicle_version_keys(vehicle_versions:dict,
+                             vehicles:dict=None,
+                             vehicle_names:set=None,
+                             vehicle_version_selection:dict=None)->dict:
+    # content hash, temperature control curve, passive heat balance key & heat pump names per vehicle & version, for
+    # the given vehicles (e.g. vehicles in operation, all vehicles if None) and versions (versions per vehicle, all
+    # versions if None); the vehicle data of each version is only materialized temporarily (not compiled, see
+    # compile_vehicle_versions)
+    if vehicles is None:
+        vehicles = {}
+    if vehicle_version_selection is None:
+        vehicle_version_selection = {}
+
+    version_keys = {}
+    for vehicle_name, vehicle_versions_vehicle in vehicle_versions.items():
+        if vehicle_names is not None and vehicle_name not in vehicle_names:
+            continue
+        version_keys[vehicle_name] = {}
+        for vehicle_version, vehicle_version_data in vehicle_versions_vehicle.items():
+            if (vehicle_name in vehicle_version_selection.keys()
+                    and vehicle_version not in vehicle_version_selection[vehicle_name]):
+                continue
+            vehicle_data = get_vehicle_version_data(vehicle_version_data, vehicles.get(vehicle_name))
+            version_keys[vehicle_name][vehicle_version] = {
+                "content_hash": calculate_vehicle_content_hash(vehicle_data),
+                "temperature_control_curve": vehicle_data["temperature_control_curve"],
+                "passive_key": get_passive_heat_flow_parameters(vehicle_data),
+                "heat_pump_names": [heat_pump["name"]
+                                    for heat_pump in vehicle_data["heating_cooling_devices"]["heat_pumps"]]
+            }
+
+    return version_keys
+
+
+
+def get_passive_heat_flow_parameters(vehicle:dict)->tuple:
+    # vehicle parameters the passive heat balance (free-floating vehicle temperature) depends on
+    return tuple(vehicle[parameter] for parameter in VEHICLE_PARAMETERS_PASSIVE_HEAT_FLOWS)
+
+
+
+def simulate_solar_heat_array(vehicle:CompiledVehicle,
+                              obstacle_distance:float,
+                              obstacle_height:float,
+                              irradiation:np.ndarray,
+                              months:np.ndarray,
+                              hours:np.ndarray,
+                              latitude:float,
+                              consider_solar_heating:bool,
+                              irradiation_normal:bool=True,
+                              solar_integration:str=SOLAR_INTEGRATION_DEFAULT,
+                              solar_profile:dict=None)->np.ndarray:
+
+    # calculate solar heat flow [kW]
+    heat_solar = np.zeros(len(hours))
+    if consider_solar_heating:
+        heat_solar = 1e-3 * simulate_solar_absorption_array(vehicle, obstacle_distance, obstacle_height,
+                                                            irradiation, months, hours, latitude,
+                                                            irradiation_normal, solar_integration, solar_profile)
+
+    return heat_solar
+
+
+
+def simulate_passive_heat_balance_array(vehicles:list,
+                                        obstacle_distance:float,
+                                        obstacle_height:float,
+                                        passenger_number:float,
+                                        irradiation:np.ndarray,
+                                        months:np.ndarray,
+                                        hours:np.ndarray,
+                                        latitude:float,
+                                        consider_solar_heating:bool,
+                                        irradiation_normal:bool=True,
+                                        solar_integration:str=SOLAR_INTEGRATION_DEFAULT,
+                                        solar_profile:dict=None)->Tuple[np.ndarray,np.ndarray]:
+    # (independent of temperature control curve and heating & cooling devices, solar heat flow of shape
+    # vehicles x hours, heat balance coefficients of shape vehicles x 3)
+
+    heat_solar = np.array([simulate_solar_heat_array(vehicle, obstacle_distance, obstacle_height, irradiation,
+                                                     months, hours, latitude, consider_solar_heating,
+                                                     irradiation_normal, solar_integration, solar_profile)
+                           for vehicle in vehicles]).reshape(len(vehicles), len(hours))
+    coefficients = np.array([calculate_passive_heat_flow_coefficients(vehicle, passenger_number)
+                             for vehicle in vehicles]).reshape(len(vehicles), 3)
+
+    return heat_solar, coefficients
+
+
+
+def calculate_setpoint_binding_array(setpoint_temperature:np.ndarray,
+                                     temperature_environment:np.ndarray,
+                                     heat_constant:np.ndarray,
+                                     conductance_linear:float,
+                                     coefficient_doors:float)->np.ndarray:
+    # sign of power difference at setpoint temperature (positive: free-floating temperature above setpoint,
+    # negative: below setpoint, zero for undefined setpoints)
+    setpoint_defined = np.isfinite(setpoint_temperature)
+    power = calculate_power_difference_derivative(np.where(setpoint_defined, setpoint_temperature,
+                                                           temperature_environment),
+                                                  temperature_environment, heat_constant, conductance_linear,
+                                                  coefficient_doors)[0]
+
+    return np.where(setpoint_defined, np.sign(power), 0)
+
+
+
+def simulate_vehicle_temperatures_array(compiled_curves:list,
+                                        temperature_environment:np.ndarray,
+                                        heat_solar:np.ndarray,
+                                        coefficients:np.ndarray)->Tuple[list,np.ndarray]:
+    # vehicle temperatures for several temperature control curves per passive heat balance (list of lists of
+    # compiled curves, heat_solar & coefficients as from simulate_passive_heat_balance_array); the free-floating vehicle
+    # temperature is only solved for hours, in which it lies within the heating & cooling temperature range of at
+    # least one of the temperature control curves
+    heat_constant = coefficients[:, 0:1] + heat_solar
+    conductance_linear = np.broadcast_to(coefficients[:, 1:2], heat_constant.shape)
+    coefficient_doors = np.broadcast_to(coefficients[:, 2:3], heat_constant.shape)
+    temperature_environment_array = np.broadcast_to(temperature_environment[np.newaxis, :], heat_constant.shape)
+
+    # check sign of power difference at heating & cooling temperatures (power difference decreases strictly with
+    # vehicle temperature: free-floating temperature below heating temperature if negative, above cooling
+    # temperature if positive)
+    setpoints = []
+    solve_required = np.zeros(heat_constant.shape, dtype=bool)
+    for group_index, group_curves in enumerate(compiled_curves):
+        group_setpoints = []
+        for compiled_curve in group_curves:
+            heating_temperature, cooling_temperature = calculate_setpoint_temperatures_array(
+                compiled_curve, temperature_environment)
+            heating_binding = calculate_setpoint_binding_array(
+                heating_temperature, temperature_environment, heat_constant[group_index],
+                coefficients[group_index, 1], coefficients[group_index, 2]) < 0
+            cooling_binding = calculate_setpoint_binding_array(
+                cooling_temperature, temperature_environment, heat_constant[group_index],
+                coefficients[group_index, 1], coefficients[group_index, 2]) > 0
+            solve_required[group_index] |= ~(heating_binding | cooling_binding)
+            group_setpoints.append((heating_temperature, cooling_temperature, heating_binding, cooling_binding))
+        setpoints.append(group_setpoints)
+
+    # calculate theoretical vehicle temperatures from heat balance (all remaining hours in one batch)
+    temperature_free_floating = np.full(heat_constant.shape, np.nan)
+    if solve_required.any():
+        temperature_free_floating[solve_required] = solve_vehicle_temperature_newton(
+            temperature_environment_array[solve_required], heat_constant[solve_required],
+            conductance_linear[solve_required], coefficient_doors[solve_required])[0]
+    record_solver_skipped(int(np.sum(~solve_required)))
+
+    # clamp theoretical temperatures to heating & cooling temperature range
+    temperatures_vehicle = []
+    for group_index, group_setpoints in enumerate(setpoints):
+        group_temperatures_vehicle = []
+        for heating_temperature, cooling_temperature, heating_binding, cooling_binding in group_setpoints:
+            group_temperatures_vehicle.append(np.where(heating_binding, heating_temperature,
+                                                       np.where(cooling_binding, cooling_temperature,
+                                                                temperature_free_floating[group_index])))
+        temperatures_vehicle.append(group_temperatures_vehicle)
+
+    return temperatures_vehicle, temperature_free_floating
+
+
+
+def simulate_vehicle_controlled_array(vehicle:CompiledVehicle,
+                                      passenger_number:float,
+                                      temperature_environment:np.ndarray,
+                                      heat_solar:np.ndarray,
+                                      temperature_vehicle:np.ndarray)\
+        ->Tuple[np.ndarray,dict,np.ndarray,np.ndarray,np.ndarray]:
+
+    (heat_solar, heat_passenger, heat_auxiliary_devices, heat_convection, heat_ventilation, heat_doors) \
+        = simulate_passive_heat_flows_array(vehicle, passenger_number, temperature_vehicle, temperature_environment,
+                                            heat_solar)
+    heat_difference = (heat_solar + heat_passenger + heat_auxiliary_devices
+                       + heat_convection + heat_ventilation + heat_doors)
+
+    heat_flows = {'demand_heating': np.maximum(0, -heat_difference), 'demand_cooling': -np.maximum(0, heat_difference),
+                  'solar_absorption': heat_solar, 'heating_passengers': heat_passenger,
+                  'heating_auxiliary': heat_auxiliary_devices, 'heating_convection': heat_convection,
+                  'heating_ventilation_air': heat_ventilation, 'heating_doors_air': heat_doors}
+
+    # dispatch heating & cooling devices (all hours at once)
+    electricity_demand, heating_satisfied, cooling_satisfied = simulate_device_electricity_demand_array(
+        vehicle.device_table, heat_flows["demand_heating"] + heat_flows["demand_cooling"],
+        temperature_environment, temperature_vehicle)
+
+    return temperature_vehicle, heat_flows, electricity_demand, heating_satisfied, cooling_satisfied
+
+
+
+def simulate_vehicle_array(vehicle:dict,
+                           compiled_curve:dict,
+                           obstacle_distance:float,
+                           obstacle_height:float,
+                           passenger_number:float,
+                           temperature_environment:np.ndarray,
+                           irradiation:np.ndarray,
+                           months:np.ndarray,
+                           hours:np.ndarray,
+                           latitude:float,
+                           consider_solar_heating:bool,
+                           irradiation_normal:bool=True,
+                           solar_integration:str=SOLAR_INTEGRATION_DEFAULT)\
+        ->Tuple[np.ndarray,dict,np.ndarray,np.ndarray,np.ndarray]:
+
+    vehicle = compile_vehicle(vehicle)
+    heat_solar, coefficients = simulate_passive_heat_balance_array(
+        [vehicle], obstacle_distance, obstacle_height, passenger_number, irradiation, months, hours, latitude,
+        consider_solar_heating, irradiation_normal, solar_integration)
+    temperatures_vehicle = simulate_vehicle_temperatures_array([[compiled_curve]],
+                                                               temperature_environment, heat_solar, coefficients)[0]
+
+    return simulate_vehicle_controlled_array(vehicle, passenger_number, temperature_environment, heat_solar[0],
+                                             temperatures_vehicle[0][0])
+
+
+
+def simulate_vehicle_loop(vehicle:dict,
+                          compiled_curve:dict,
+                          obstacle_distance:float,
+                          obstacle_height:float,
+                          passenger_number:float,
+                          temperature_environment:np.ndarray,
+                          irradiation:np.ndarray,
+                          months:np.ndarray,
+                          hours:np.ndarray,
+                          latitude:float,
+                          consider_solar_heating:bool,
+                          irradiation_normal:bool=True)\
+        ->Tuple[np.ndarray,dict,np.ndarray,np.ndarray,np.ndarray]:
+    # scalar reference engine with the same interface as simulate_vehicle_array (one solver call per hour)
+
+    temperature_vehicle = np.zeros(len(hours))
+    heat_flows = {}
+    electricity_demand = np.zeros((len(hours), 1 + len(vehicle["heating_cooling_devices"]["heat_pumps"])))
+    heating_satisfied = np.ones(len(hours), dtype=bool)
+    cooling_satisfied = np.ones(len(hours), dtype=bool)
+    for i in range(len(hours)):
+        temperature_vehicle[i], heat_flows_hour, electricity_demand[i], heating_satisfied[i], cooling_satisfied[i] = (
+            simulate_vehicle(vehicle, compiled_curve, obstacle_distance, obstacle_height,
+                             passenger_number, temperature_environment[i], irradiation[i], int(months[i]),
+                             int(hours[i]), latitude, consider_solar_heating, irradiation_normal))
+        for key, value in heat_flows_hour.items():
+            if key not in heat_flows.keys():
+                heat_flows[key] = np.zeros(len(hours))
+            heat_flows[key][i] = value
+
+    return temperature_vehicle, heat_flows, electricity_demand, heating_satisfied, cooling_satisfied
+
+
+
+def verify_vehicle_array(vehicle:dict,
+                         compiled_curve:dict,
+                         obstacle_distance:float,
+                         obstacle_height:float,
+                         passenger_number:float,
+                         temperature_environment:np.ndarray,
+                         irradiation:np.ndarray,
+                         months:np.ndarray,
+                         hours:np.ndarray,
+                         latitude:float,
+                         consider_solar_heating:bool,
+                         irradiation_normal:bool=True,
+                         solar_integration:str=SOLAR_INTEGRATION_DEFAULT)->float:
+    # maximum absolute deviation of the vectorized engine (simulate_vehicle_array) from the scalar reference engine
+    # (simulate_vehicle_loop) over vehicle temperatures [°C], heat flows & electricity demand [kW], asserted to be
+    # within ENGINE_TOLERANCE with identical satisfaction of heating & cooling demand
+    results_array = simulate_vehicle_array(vehicle, compiled_curve, obstacle_distance, obstacle_height,
+                                           passenger_number, temperature_environment, irradiation, months, hours,
+                                           latitude, consider_solar_heating, irradiation_normal, solar_integration)
+    results_loop = simulate_vehicle_loop(vehicle, compiled_curve, obstacle_distance, obstacle_height,
+                                         passenger_number, temperature_environment, irradiation, months, hours,
+                                         latitude, consider_solar_heating, irradiation_normal)
+
+    deviations = [np.abs(results_array[0] - results_loop[0]), np.abs(results_array[2] - results_loop[2])]
+    deviations += [np.abs(results_array[1][key] - results_loop[1][key]) for key in HEAT_FLOW_KEYS]
+    deviation_max = max(float(np.max(deviation, initial=0)) for deviation in deviations)
+
+    assert deviation_max <= ENGINE_TOLERANCE, \
+        f"Vectorized engine deviates from scalar engine by {deviation_max:.3g} (tolerance {ENGINE_TOLERANCE:g})."
+    assert np.array_equal(results_array[3], results_loop[3]) and np.array_equal(results_array[4], results_loop[4]), \
+        "Vectorized engine and scalar engine differ in satisfaction of heating or cooling demand."
+
+    return deviation_max
+
+
+
+def simulate_vehicle_versions(compiled_vehicles:dict,
+                              compiled_curves:dict,
+                              operation_schedule_data:dict,
+                              temperature_environment:np.ndarray,
+                              irradiation:np.ndarray,
+                              months:np.ndarray,
+                              hours:np.ndarray,
+                              latitude:float,
+                              vectorized:bool=True,
+                              solar_integration:str=SOLAR_INTEGRATION_DEFAULT,
+                              solar_profile:dict=None)->dict:
+
+    # (compiled_vehicles: compiled vehicle per version of one vehicle, see compile_vehicle)
+    version_results = {}
+
+    if not vectorized:
+        for vehicle_version, compiled_vehicle in compiled_vehicles.items():
+            version_results[vehicle_version] = simulate_vehicle_loop(
+                compiled_vehicle.vehicle_data, compiled_curves[compiled_vehicle.temperature_control_curve],
+                operation_schedule_data["obstacle_distance"], operation_schedule_data["obstacle_height"],
+                operation_schedule_data["passenger_number"], temperature_environment, irradiation, months, hours,
+                latitude, True, irradiation_normal=True)
+        return version_results
+
+    # group vehicle versions with identical passive heat balance (e.g. only differing in temperature control curve)
+    passive_groups = {}
+    for vehicle_version, compiled_vehicle in compiled_vehicles.items():
+        if compiled_vehicle.passive_key not in passive_groups.keys():
+            passive_groups[compiled_vehicle.passive_key] = []
+        passive_groups[compiled_vehicle.passive_key].append(vehicle_version)
+
+    # solve free-floating vehicle temperature once per group (all groups in one batch, only for hours not bound by
+    # the temperature control curves), clamp & dispatch devices per version
+    heat_solar, coefficients = simulate_passive_heat_balance_array(
+        [compiled_vehicles[versions[0]] for versions in passive_groups.values()],
+        operation_schedule_data["obstacle_distance"], operation_schedule_data["obstacle_height"],
+        operation_schedule_data["passenger_number"], irradiation, months, hours, latitude, True,
+        irradiation_normal=True, solar_integration=solar_integration, solar_profile=solar_profile)
+    temperatures_vehicle = simulate_vehicle_temperatures_array(
+        [[compiled_curves[compiled_vehicles[vehicle_version].temperature_control_curve] for vehicle_version in versions]
+         for versions in passive_groups.values()],
+        temperature_environment, heat_solar, coefficients)[0]
+
+    for group_index, passive_group_versions in enumerate(passive_groups.values()):
+        for version_index, vehicle_version in enumerate(passive_group_versions):
+            version_results[vehicle_version] = simulate_vehicle_controlled_array(
+                compiled_vehicles[vehicle_version], operation_schedule_data["passenger_number"],
+                temperature_environment, heat_solar[group_index], temperatures_vehicle[group_index][version_index])
+
+    return version_results
+
+
+
+# transient engine (cabin air & chassis thermal mass, sub-hourly time steps, all vehicle versions at once)
+
+
+def simulate_vehicle_temperatures_transient_array(vehicles:list,
+                                                  compiled_curves:list,
+                                                  temperature_environment:np.ndarray,
+                                                  heat_solar:np.ndarray,
+                                                  heat_internal:np.ndarray,
+                                                  operation:np.ndarray,
+                                                  warmup_hours:int,
+                                                  time_steps_hour:int=TRANSIENT_TIME_STEPS_HOUR)\
+        ->Tuple[np.ndarray,np.ndarray,np.ndarray]:
+    # cabin temperature, heating & cooling heat flow and chassis heat flow to the cabin per time step of shape
+    # versions x periods x hours x time steps (vehicles & compiled curves per version, temperature_environment &
+    # operation of shape periods x hours, heat_solar of shape versions x periods x hours, heat_internal per version);
+    # each period (e.g. the mean day of a month) is continued cyclically for the warm-up hours ahead of the results
+    # two thermal nodes per version (implicit euler): cabin air exchanging heat with the environment by ventilation &
+    # doors during operation and with the chassis by convection, chassis (with interior) exchanging heat with the
+    # environment by convection (both convection conductances twice the steady-state conductance, such that the
+    # steady state equals the passive heat balance of simulate_passive_heat_flows)
+    number_periods, number_hours = temperature_environment.shape
+    time_step = 3600 / time_steps_hour # [s]
+
+    conductance_chassis = 2 * np.array([vehicle.conductance_convection for vehicle in vehicles])[:, np.newaxis]
+    conductance_ventilation = np.array([vehicle.conductance_ventilation for vehicle in vehicles])[:, np.newaxis]
+    coefficient_doors = np.array([vehicle.coefficient_doors for vehicle in vehicles])[:, np.newaxis]
+    capacity_cabin = np.array([vehicle.heat_capacity_cabin for vehicle in vehicles])[:, np.newaxis] / time_step
+    capacity_chassis = np.array([vehicle.heat_capacity_chassis for vehicle in vehicles])[:, np.newaxis] / time_step
+    capacity_chassis_total = capacity_chassis + 2 * conductance_chassis
+    chassis_share = conductance_chassis / capacity_chassis_total
+    conductance_chassis_cabin = conductance_chassis * (1 - chassis_share)
+
+    # setpoint temperatures per version (no heating or cooling outside operation)
+    heating_temperatures = np.full((len(vehicles), number_periods, number_hours), -np.inf)
+    cooling_temperatures = np.full((len(vehicles), number_periods, number_hours), np.inf)
+    for version_index, compiled_curve in enumerate(compiled_curves):
+        heating_temperature, cooling_temperature = calculate_setpoint_temperatures_array(compiled_curve,
+                                                                                         temperature_environment)
+        heating_temperatures[version_index] = np.where(operation, heating_temperature, -np.inf)
+        cooling_temperatures[version_index] = np.where(operation, cooling_temperature, np.inf)
+
+    temperature_cabin = np.array(np.broadcast_to(temperature_environment[:, -warmup_hours % number_hours],
+                                                 (len(vehicles), number_periods)))
+    temperature_chassis = temperature_cabin.copy()
+    shape_results = (len(vehicles), number_periods, number_hours, time_steps_hour)
+    temperatures_cabin = np.zeros(shape_results)
+    heat_control = np.zeros(shape_results)
+    heat_chassis = np.zeros(shape_results)
+    for hour_step in range(-warmup_hours, number_hours):
+        hour_index = hour_step % number_hours
+        temperature_environment_hour = temperature_environment[:, hour_index]
+        operation_hour = operation[:, hour_index]
+        heat_constant = heat_solar[:, :, hour_index] + np.where(operation_hour, heat_internal[:, np.newaxis], 0)
+        for time_step_index in range(time_steps_hour):
+            # door heat flow linearized at the cabin temperature of the previous time step
+            conductance_air = np.where(operation_hour, conductance_ventilation + coefficient_doors * np.sqrt(
+                np.abs(temperature_cabin - temperature_environment_hour) / (C_TO_K + temperature_environment_hour)), 0)
+
+            # eliminate chassis temperature (linear in cabin temperature), solve cabin balance & clamp to setpoints
+            temperature_chassis_constant = ((capacity_chassis * temperature_chassis
+                                             + conductance_chassis * temperature_environment_hour)
+                                            / capacity_chassis_total)
+            conductance_cabin = capacity_cabin + conductance_chassis_cabin + conductance_air
+            heat_cabin = (capacity_cabin * temperature_cabin + heat_constant
+                          + conductance_chassis * temperature_chassis_constant
+                          + conductance_air * temperature_environment_hour)
+            temperature_cabin = heat_cabin / conductance_cabin
+            temperature_cabin = np.where(temperature_cabin < heating_temperatures[:, :, hour_index],
+                                         heating_temperatures[:, :, hour_index],
+                                         np.minimum(temperature_cabin, cooling_temperatures[:, :, hour_index]))
+            temperature_chassis = temperature_chassis_constant + chassis_share * temperature_cabin
+
+            if hour_step >= 0:
+                temperatures_cabin[:, :, hour_index, time_step_index] = temperature_cabin
+                heat_control[:, :, hour_index, time_step_index] = (conductance_cabin * temperature_cabin
+                                                                   - heat_cabin)
+                heat_chassis[:, :, hour_index, time_step_index] = (conductance_chassis
+                                                                   * (temperature_chassis - temperature_cabin))
+
+    return temperatures_cabin, heat_control, heat_chassis
+
+
+
+def simulate_vehicle_versions_transient(compiled_vehicles:dict,
+                                        compiled_curves:dict,
+                                        operation_schedule_data:dict,
+                                        transient_input:dict,
+                                        latitude:float,
+                                        solar_integration:str=SOLAR_INTEGRATION_DEFAULT)->dict:
+    # results per vehicle version in the format of simulate_vehicle_versions for the operation hours of the schedule
+    # (transient_input: environment, sun geometry & operation of all hours of the periods, period & hour index per
+    # operation hour, see simulate_system); hourly results are means over the time steps, except for the satisfaction
+    # of the heating & cooling demand (all time steps)
+    time_begin = time.perf_counter()
+    vehicle_versions = list(compiled_vehicles.keys())
+    vehicles = [compiled_vehicles[vehicle_version] for vehicle_version in vehicle_versions]
+    temperature_environment = transient_input["temperature_environment"]
+    number_periods, number_hours = temperature_environment.shape
+    time_steps_hour = transient_input["time_steps_hour"]
+    passenger_number = operation_schedule_data["passenger_number"]
+
+    # solar heat flow once per passive group for all hours of the periods
+    passive_groups = {}
+    for version_index, vehicle in enumerate(vehicles):
+        passive_groups.setdefault(vehicle.passive_key, []).append(version_index)
+    heat_solar_groups, coefficients = simulate_passive_heat_balance_array(
+        [vehicles[version_indices[0]] for version_indices in passive_groups.values()],
+        operation_schedule_data["obstacle_distance"], operation_schedule_data["obstacle_height"], passenger_number,
+        transient_input["irradiation"].ravel(), transient_input["month_ids"].ravel() + 1,
+        transient_input["hours"].ravel(), latitude, True, irradiation_normal=True,
+        solar_integration=solar_integration,
+        solar_profile={key: value.ravel() for key, value in transient_input["solar_profile"].items()})
+    heat_solar = np.zeros((len(vehicles), number_periods, number_hours))
+    heat_internal = np.zeros(len(vehicles))
+    for group_index, version_indices in enumerate(passive_groups.values()):
+        heat_solar[version_indices] = heat_solar_groups[group_index].reshape(number_periods, number_hours)
+        heat_internal[version_indices] = coefficients[group_index, 0]
+
+    temperatures_cabin, heat_control, heat_chassis = simulate_vehicle_temperatures_transient_array(
+        vehicles, [compiled_curves[vehicle.temperature_control_curve] for vehicle in vehicles],
+        temperature_environment, heat_solar, heat_internal, transient_input["operation"],
+        transient_input["warmup_hours"], time_steps_hour)
+
+    # hourly results of operation hours (remaining passive heat flows as in the steady state, heat flows of heating &
+    # cooling include the heat stored in the cabin air)
+    periods = transient_input["periods"]
+    period_hours = transient_input["period_hours"]
+    temperature_environment_hours = temperature_environment[periods, period_hours]
+    version_results = {}
+    for version_index, vehicle_version in enumerate(vehicle_versions):
+        temperatures_cabin_hours = temperatures_cabin[version_index, periods, period_hours]
+        heat_control_hours = heat_control[version_index, periods, period_hours]
+        temperature_vehicle = np.mean(temperatures_cabin_hours, axis=1)
+
+        (heat_solar_hours, heat_passenger, heat_auxiliary_devices, heat_convection, heat_ventilation, heat_doors) \
+            = simulate_passive_heat_flows_array(vehicles[version_index], passenger_number, temperature_vehicle,
+                                                temperature_environment_hours,
+                                                heat_solar[version_index, periods, period_hours])
+        heat_flows = {'demand_heating': np.mean(np.maximum(0, heat_control_hours), axis=1),
+                      'demand_cooling': -np.mean(np.maximum(0, -heat_control_hours), axis=1),
+                      'solar_absorption': heat_solar_hours, 'heating_passengers': heat_passenger,
+                      'heating_auxiliary': heat_auxiliary_devices,
+                      'heating_convection': np.mean(heat_chassis[version_index, periods, period_hours], axis=1),
+                      'heating_ventilation_air': heat_ventilation, 'heating_doors_air': heat_doors}
+
+        # dispatch heating & cooling devices per time step
+        electricity_demand, heating_satisfied, cooling_satisfied = simulate_device_electricity_demand_array(
+            vehicles[version_index].device_table, heat_control_hours.ravel(),
+            np.repeat(temperature_environment_hours, time_steps_hour), temperatures_cabin_hours.ravel())
+        version_results[vehicle_version] = (
+            temperature_vehicle, heat_flows,
+            np.mean(electricity_demand.reshape(len(periods), time_steps_hour, -1), axis=1),
+            np.all(heating_satisfied.reshape(len(periods), time_steps_hour), axis=1),
+            np.all(cooling_satisfied.reshape(len(periods), time_steps_hour), axis=1))
+
+    engine_statistics = ENGINE_STATISTICS.get()
+    if engine_statistics is not None:
+        engine_statistics["transient_vehicle_hours"] += (len(vehicles) * number_periods
+                                                         * (number_hours + transient_input["warmup_hours"]))
+        engine_statistics["transient_seconds"] += time.perf_counter() - time_begin
+
+    return version_results
+
+
+
+def initialize_simulation_worker(simulation_inputs:dict)->None:
+    # (simulation_inputs: vehicle versions (overlays) & base vehicle data, compiled curves, operation schedules and
+    # operation hour data per schedule, shipped once per worker process; worker processes only, the serial execution
+    # passes the simulation inputs of its run explicitly)
+    SIMULATION_WORKER_INPUTS.clear()
+    SIMULATION_WORKER_INPUTS.update(simulation_inputs)
+
+
+
+def simulate_simulation_task(simulation_task:tuple, simulation_inputs:dict)->dict:
+    # simulation task: operation schedule name, vehicle name and vehicle versions (see initialize_simulation_worker),
+    # vehicle versions compiled per task only
+    operation_schedule_name, vehicle_name, vehicle_versions = simulation_task
+    schedule_input = simulation_inputs["schedule_inputs"][operation_schedule_name]
+    compiled_vehicles = compile_vehicle_versions(simulation_inputs["vehicle_versions"][vehicle_name],
+                                                 vehicle_versions,
+                                                 simulation_inputs["vehicles"].get(vehicle_name))
+
+    if schedule_input["transient_input"] is not None:
+        return simulate_vehicle_versions_transient(
+            compiled_vehicles,
+            simulation_inputs["compiled_curves"],
+            simulation_inputs["operation_schedules"][operation_schedule_name],
+            schedule_input["transient_input"], schedule_input["latitude"],
+            simulation_inputs["solar_integration"])
+
+    return simulate_vehicle_versions(
+        compiled_vehicles,
+        simulation_inputs["compiled_curves"],
+        simulation_inputs["operation_schedules"][operation_schedule_name],
+        schedule_input["temperature_environment"], schedule_input["irradiation"], schedule_input["month_ids"] + 1,
+        schedule_input["hours"], schedule_input["latitude"], simulation_inputs["vectorized"],
+        simulation_inputs["solar_integration"], schedule_input["solar_profile"])
+
+
+
+def simulate_simulation_task_worker(simulation_task:tuple)->Tuple[dict,dict]:
+    # version results & solver statistics of one simulation task in a worker process
+    engine_statistics = create_engine_statistics()
+    context_token = ENGINE_STATISTICS.set(engine_statistics)
+    try:
+        version_results = simulate_simulation_task(simulation_task, SIMULATION_WORKER_INPUTS)
+    finally:
+        ENGINE_STATISTICS.reset(context_token)
+    return version_results, engine_statistics
+
+
+
+def generate_simulation_tasks(pending_vehicles:dict, workers:int)->list:
+    # simulation tasks ordered by operation schedule and vehicle, vehicle versions split into chunks of complete
+    # passive groups of at most SIMULATION_TASK_VERSIONS_MAX versions (unless a single passive group is larger), split
+    # further for parallel execution into about SIMULATION_TASKS_PER_WORKER chunks per worker process
+    # (pending_vehicles: passive heat balance key per operation schedule, vehicle and version to simulate, see
+    # get_vehicle_version_keys)
+    simulation_tasks = []
+    for operation_schedule_name, pending_vehicles_schedule in pending_vehicles.items():
+        for vehicle_name, pending_versions in pending_vehicles_schedule.items():
+            passive_groups = {}
+            for vehicle_version, passive_key in pending_versions.items():
+                passive_groups.setdefault(passive_key, []).append(vehicle_version)
+
+            number_chunks = 1 if workers <= 1 else workers * SIMULATION_TASKS_PER_WORKER
+            chunk_versions_max = min(SIMULATION_TASK_VERSIONS_MAX,
+                                     max(1, math.ceil(len(pending_versions) / number_chunks)))
+            vehicle_versions = []
+            for passive_group in passive_groups.values():
+                if len(vehicle_versions) > 0 and len(vehicle_versions) + len(passive_group) > chunk_versions_max:
+                    simulation_tasks.append((operation_schedule_name, vehicle_name, tuple(vehicle_versions)))
+                    vehicle_versions = []
+                vehicle_versions += passive_group
+            simulation_tasks.append((operation_schedule_name, vehicle_name, tuple(vehicle_versions)))
+
+    return simulation_tasks
+
+
+
+def calculate_schedule_input_hash(schedule_input:dict, operation_schedule_data:dict, vectorized:bool,
+                                  solar_integration:str)->str:
+    # content hash of the inputs of one operation schedule the vehicle simulation depends on
+    schedule_hash = hashlib.sha256(json.dumps(
+        [operation_schedule_data["obstacle_distance"], operation_schedule_data["obstacle_height"],
+         operation_schedule_data["passenger_number"], schedule_input["latitude"], vectorized, solar_integration],
+        default=str).encode("utf-8"))
+    for key in ["days", "month_ids", "hours", "temperature_environment", "irradiation"]:
+        if schedule_input[key] is not None:
+            schedule_hash.update(key.encode("utf-8"))
+            schedule_hash.update(np.ascontiguousarray(schedule_input[key]).tobytes())
+    for key in sorted(schedule_input["solar_profile"].keys()):
+        schedule_hash.update(key.encode("utf-8"))
+        schedule_hash.update(np.ascontiguousarray(schedule_input["solar_profile"][key]).tobytes())
+    if schedule_input["transient_input"] is not None:
+        transient_input = schedule_input["transient_input"]
+        transient_arrays = {key: value for key, value in transient_input.items() if key != "solar_profile"}
+        transient_arrays.update({"solar_profile_" + key: value
+                                 for key, value in transient_input["solar_profile"].items()})
+        for key in sorted(transient_arrays.keys()):
+            schedule_hash.update(("transient_" + key).encode("utf-8"))
+            schedule_hash.update(np.ascontiguousarray(transient_arrays[key]).tobytes())
+
+    return schedule_hash.hexdigest()
+
+
+
+def calculate_simulation_unit_hash(schedule_input_hash:str, vehicle_content_hash:str, compiled_curve:dict)->str:
+    # content hash of all inputs of one simulation unit (vehicle version in operation schedule)
+    unit_hash = hashlib.sha256((schedule_input_hash + vehicle_content_hash).encode("utf-8"))
+    for mode in ["heating", "cooling"]:
+        unit_hash.update(compiled_curve[mode].tobytes())
+
+    return unit_hash.hexdigest()
+
+
+
+def simulate_simulation_tasks(simulation_tasks:list, simulation_inputs:dict,
+                              workers:int=SIMULATION_WORKERS_DEFAULT, engine_statistics:dict=None)->list:
+    # version results per simulation task (in order of simulation tasks for any number of workers), solver statistics
+    # added to engine_statistics (see create_engine_statistics)
+    if engine_statistics is None:
+        engine_statistics = create_engine_statistics()
+
+    if workers <= 1 or len(simulation_tasks) <= 1:
+        context_token = ENGINE_STATISTICS.set(engine_statistics)
+        try:
+            return [simulate_simulation_task(simulation_task, simulation_inputs)
+                    for simulation_task in simulation_tasks]
+        finally:
+            ENGINE_STATISTICS.reset(context_token)
+
+    task_results = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(simulation_tasks)), initializer=initialize_simulation_worker,
+                             initargs=(simulation_inputs,)) as executor:
+        for version_results, engine_statistics_task in executor.map(simulate_simulation_task_worker,
+                                                                    simulation_tasks):
+            merge_engine_statistics(engine_statistics, engine_statistics_task)
+            task_results.append(version_results)
+
+    return task_results
+
+
+
 def calculate_monthly_operation_days(date_begin:str, date_end:str)->list:
     # convert date str to datetime
     date_begin = datetime.strptime(date_begin, "%m-%d")
@@ -485,6 +1794,37 @@ def calculate_monthly_operation_days(date_begin:str, date_end:str)->list:
 
 
 
+def calculate_yearly_operation_days(date_begin:str, date_end:str)->list:
+    # operation (1) or no operation (0) for all days of the reference year (date range including begin & end date,
+    # wrapping around the turn of the year if the end date is before the begin date)
+    date_begin = datetime.strptime(date_begin, "%m-%d")
+    date_end = datetime.strptime(date_end, "%m-%d")
+
+    day_begin = MONTH_DAYS_BEGIN[date_begin.month - 1] + date_begin.day - 1
+    day_end = MONTH_DAYS_BEGIN[date_end.month - 1] + date_end.day - 1
+
+    days = np.arange(1, DAYS_YEAR + 1)
+    if day_begin <= day_end:
+        operation_days = (days >= day_begin) & (days <= day_end)
+    else:
+        operation_days = (days >= day_begin) | (days <= day_end)
+
+    return operation_days.astype(int).tolist()
+
+
+
+def aggregate_month_hour_array(values:np.ndarray, group_begin:np.ndarray, method:str="mean")->np.ndarray:
+    # mean ("mean"), maximum ("max") or conjunction ("all") of values per month & hour over operation days
+    # (values of shape hours (x units) ordered by month, hour and day, group_begin: first hour index per month & hour)
+    if method == "max":
+        return np.maximum.reduceat(values, group_begin, axis=0)
+    elif method == "all":
+        return np.logical_and.reduceat(values, group_begin, axis=0)
+    group_days = np.diff(np.r_[group_begin, len(values)])
+    return np.add.reduceat(values, group_begin, axis=0) / group_days.reshape((-1,) + (1,) * (values.ndim - 1))
+
+
+
 def calculate_daily_operation_hours(time_begin:str, time_end:str)->list:
     # convert time str to datetime
     time_begin = datetime.strptime(time_begin, "%H:%M")
@@ -513,135 +1853,351 @@ def calculate_daily_operation_hours(time_begin:str, time_end:str)->list:
 
 
 
+def generate_schedule_input(operation_schedule_data:dict,
+                            location:dict,
+                            solar_profile:dict=None,
+                            hourly:bool=False,
+                            transient:bool=False)->dict:
+    # operation hour data of one operation schedule (operation days & hours, environment and sun geometry per operation
+    # hour, see simulate_system)
+
+    # calculate operation days and hours
+    operation_days = calculate_monthly_operation_days(operation_schedule_data["date_begin"],
+                                                      operation_schedule_data["date_end"])
+    operation_hours = calculate_daily_operation_hours(operation_schedule_data["time_begin"],
+                                                      operation_schedule_data["time_end"])
+
+    if solar_profile is None and hourly:
+        solar_profile = calculate_solar_profile_hourly(location)
+    elif solar_profile is None:
+        solar_profile = calculate_solar_profile(location)
+
+    transient_input = None
+    if hourly:
+        # collect operation hours of the year (ordered by month, hour and day), operation days per month
+        operation_days_year = np.array(calculate_yearly_operation_days(operation_schedule_data["date_begin"],
+                                                                       operation_schedule_data["date_end"])) > 0
+        month_ids_year = np.searchsorted(MONTH_DAYS_BEGIN, np.arange(1, DAYS_YEAR + 1), side="right") - 1
+        operation_days = np.bincount(month_ids_year[operation_days_year], minlength=12).tolist()
+        days, hours = np.nonzero(np.outer(operation_days_year, np.array(operation_hours) > 0))
+        month_ids = month_ids_year[days]
+        hour_order = np.lexsort((days, hours, month_ids))
+        days, hours, month_ids = days[hour_order], hours[hour_order], month_ids[hour_order]
+        hours_year = 24 * days + hours
+        temperature_environment = np.array(location["temperature_hourly"], dtype=float)[hours_year]
+        irradiation = np.array(location["irradiation_direct_normal_hourly"], dtype=float)[hours_year]
+        solar_profile_hours = {key: value[hours_year] for key, value in solar_profile.items()}
+
+        # transient simulation of the year as one period
+        if transient:
+            transient_input = {
+                "month_ids": np.repeat(month_ids_year, 24)[np.newaxis, :],
+                "hours": np.tile(np.arange(24), DAYS_YEAR)[np.newaxis, :],
+                "temperature_environment": np.array(location["temperature_hourly"], dtype=float)[np.newaxis, :],
+                "irradiation": np.array(location["irradiation_direct_normal_hourly"], dtype=float)[np.newaxis, :],
+                "solar_profile": {key: np.asarray(value)[np.newaxis, :] for key, value in solar_profile.items()},
+                "operation": np.outer(operation_days_year, np.array(operation_hours) > 0).reshape(1, -1),
+                "periods": np.zeros(len(hours_year), dtype=int),
+                "period_hours": hours_year
+            }
+    else:
+        # collect operation hours (ordered by month and hour)
+        days = None
+        month_ids, hours = np.nonzero(np.outer(np.array(operation_days) > 0, np.array(operation_hours) > 0))
+        temperature_environment = np.array(location["temperature"], dtype=float)[month_ids, hours]
+        irradiation = np.array(location["irradiation_direct_normal"], dtype=float)[month_ids, hours]
+        solar_profile_hours = {key: value[month_ids, hours] for key, value in solar_profile.items()}
+
+        # transient simulation of the mean day of each month as one (periodic) period
+        if transient:
+            transient_input = {
+                "month_ids": np.repeat(np.arange(12)[:, np.newaxis], 24, axis=1),
+                "hours": np.repeat(np.arange(24)[np.newaxis, :], 12, axis=0),
+                "temperature_environment": np.array(location["temperature"], dtype=float),
+                "irradiation": np.array(location["irradiation_direct_normal"], dtype=float),
+                "solar_profile": {key: np.asarray(value) for key, value in solar_profile.items()},
+                "operation": np.outer(np.array(operation_days) > 0, np.array(operation_hours) > 0),
+                "periods": month_ids,
+                "period_hours": hours
+            }
+    if transient:
+        transient_input["time_steps_hour"] = TRANSIENT_TIME_STEPS_HOUR
+        transient_input["warmup_hours"] = 24 * TRANSIENT_WARMUP_DAYS
+
+    return {
+        "operation_days": operation_days,
+        "operation_hours": operation_hours,
+        "days": days,
+        "month_ids": month_ids,
+        "hours": hours,
+        "temperature_environment": temperature_environment,
+        "irradiation": irradiation,
+        "latitude": location["latitude"],
+        "solar_profile": solar_profile_hours,
+        "transient_input": transient_input
+    }
+
+
+
 def simulate_system(operation_schedules:dict,
                     vehicle_versions:dict,
                     temperature_control_curves:dict,
                     location_data:dict,
                     scenarios:dict,
-                    reference_scenario_name:str)->Tuple[pd.DataFrame,pd.DataFrame,pd.DataFrame,Warning]:
+                    reference_scenario_name:str,
+                    vectorized:bool=True,
+                    solar_integration:str=SOLAR_INTEGRATION_DEFAULT,
+                    solar_profiles:dict=None,
+                    workers:int=SIMULATION_WORKERS_DEFAULT,
+                    simulation_cache:dict=None,
+                    hourly:bool=False,
+                    transient:bool=False,
+                    vehicles:dict=None,
+                    aggregation_inputs:dict=None,
+                    vehicle_version_selection:dict=None,
+                    engine_statistics:dict=None)\
+        ->Tuple[pd.DataFrame,pd.DataFrame,pd.DataFrame,pd.DataFrame,pd.DataFrame,Warning]:
+    # (solar_profiles: sun geometry & irradiation components per location, see calculate_solar_profile or
+    # calculate_solar_profile_hourly;
+    # workers: number of worker processes for simulation tasks;
+    # simulation_cache: results per simulation unit hash of previous runs, updated to the units of this run;
+    # hourly: simulation of all hours of the year (8760) with operation per calendar day, results aggregated to means
+    # per month & hour;
+    # transient: cabin & chassis temperature integrated over time (thermal mass, sub-hourly time steps, parked vehicle
+    # outside operation) instead of the steady state per hour, see simulate_vehicle_versions_transient;
+    # vehicles: base vehicle data per vehicle for vehicle versions given as parameter sets, see
+    # get_vehicle_version_data;
+    # aggregation_inputs: updated to the unrounded annual totals per unit & hourly energies of this run, for the
+    # re-aggregation of results after changes of post-processing parameters, see aggregate_system_results;
+    # vehicle_version_selection: versions to simulate per vehicle, e.g. versions referenced by scenarios (all versions
+    # of vehicles not contained);
+    # engine_statistics: updated to the solver statistics of this run, see get_engine_statistics)
+
+    if hourly and (not vectorized or solar_integration == "quad"):
+        raise ValueError("The hourly simulation requires the vectorized engine with gauss-legendre solar integration.")
+    if transient and not vectorized:
+        raise ValueError("The transient simulation requires the vectorized engine.")
+
+    engine_statistics_run = create_engine_statistics()
+
+    # compile temperature control curves once per run, vehicle versions only per simulation task (content hash & keys
+    # of the selected versions of vehicles in operation from the overlays)
+    if vehicles is None:
+        vehicles = {}
+    compiled_curves = compile_temperature_control_curves(temperature_control_curves)
+    version_keys = get_vehicle_version_keys(
+        vehicle_versions, vehicles, {vehicle_name for operation_schedule_data in operation_schedules.values()
+                                     for vehicle_name in operation_schedule_data["vehicles_in_operation"].keys()},
+        vehicle_version_selection)
+
+    # version labels (parameter sets) computed once per vehicle version
+    version_labels = {(vehicle_name, vehicle_version):
+                          dh.convert_dictionary_to_str(vehicle_versions[vehicle_name][vehicle_version]["parameter_set"],
+                                                       keys_to_display_names=True)
+                      for vehicle_name, version_keys_vehicle in version_keys.items()
+                      for vehicle_version in version_keys_vehicle.keys()}
 
     heating_not_satisfied = {}
     cooling_not_satisfied = {}
 
-    # simulate single hours
-    result_data_vehicles = []
+    # collect operation hour data per operation schedule
+    schedule_inputs = {}
     for operation_schedule_name, operation_schedule_data in operation_schedules.items():
-
-        # calculate operation days and hours
-        operation_days = calculate_monthly_operation_days(operation_schedule_data["date_begin"],
-                                                          operation_schedule_data["date_end"])
-        operation_hours = calculate_daily_operation_hours(operation_schedule_data["time_begin"],
-                                                          operation_schedule_data["time_end"])
-
-        # simulate result data for vehicles
-        for month_id in range(0, 12):
-            month = month_id+1
-            for hour in range(0, 24):
-                if operation_days[month_id] > 0 and operation_hours[hour] > 0:
-                    for vehicle_name, vehicle_number in operation_schedule_data["vehicles_in_operation"].items():
-                        for vehicle_version, vehicle_version_data in vehicle_versions[vehicle_name].items():
-                            solar_heating_lookup_table = {}
-                            temperature_vehicle, heat_flows, electricity_demand, heating_satisfied, cooling_satisfied =(
-                                simulate_vehicle(
-                                vehicle_version_data["vehicle_data"],
-                                vehicle_name + "_" + vehicle_version,
-                                temperature_control_curves[vehicle_version_data["vehicle_data"]["temperature_control_curve"]],
-                                operation_schedule_data["obstacle_distance"],
-                                operation_schedule_data["obstacle_height"],
-                                operation_schedule_data["passenger_number"],
-                                location_data[
-                                    operation_schedule_data["location"]]["temperature"][month_id][hour],
-                                location_data[
-                                    operation_schedule_data["location"]]["irradiation_direct_normal"][month_id][hour],
-                                month,
-                                hour,
-                                location_data[operation_schedule_data["location"]]["latitude"],
-                                True,
-                                solar_heating_lookup_table=solar_heating_lookup_table,
-                                irradiation_normal=True
-                            ))
-
-                            # manage satisfied data
-
-                            if not heating_satisfied:
-                                if not operation_schedule_name in heating_not_satisfied.keys():
-                                    heating_not_satisfied[operation_schedule_name] = {}
-                                if not vehicle_name in heating_not_satisfied[operation_schedule_name].keys():
-                                    heating_not_satisfied[operation_schedule_name][vehicle_name] = {}
-                                if not vehicle_version in heating_not_satisfied[operation_schedule_name][vehicle_name].keys():
-                                    heating_not_satisfied[operation_schedule_name][vehicle_name][vehicle_version] = {}
-                                if not dh.MONTH_NAMES[month_id] in heating_not_satisfied[operation_schedule_name][vehicle_name][vehicle_version].keys():
-                                    heating_not_satisfied[operation_schedule_name][vehicle_name][vehicle_version][dh.MONTH_NAMES[month_id]] = []
-                                heating_not_satisfied[operation_schedule_name][vehicle_name][vehicle_version][dh.MONTH_NAMES[month_id]].append(hour)
-
-                            if not cooling_satisfied:
-                                if not operation_schedule_name in cooling_not_satisfied.keys():
-                                    cooling_not_satisfied[operation_schedule_name] = {}
-                                if not vehicle_name in cooling_not_satisfied[operation_schedule_name].keys():
-                                    cooling_not_satisfied[operation_schedule_name][vehicle_name] = {}
-                                if not vehicle_version in cooling_not_satisfied[operation_schedule_name][
-                                    vehicle_name].keys():
-                                    cooling_not_satisfied[operation_schedule_name][vehicle_name][vehicle_version] = {}
-                                if not dh.MONTH_NAMES[month_id] in \
-                                       cooling_not_satisfied[operation_schedule_name][vehicle_name][
-                                           vehicle_version].keys():
-                                    cooling_not_satisfied[operation_schedule_name][vehicle_name][vehicle_version][
-                                        dh.MONTH_NAMES[month_id]] = []
-                                cooling_not_satisfied[operation_schedule_name][vehicle_name][vehicle_version][
-                                    dh.MONTH_NAMES[month_id]].append(hour)
-
-                            # create vehicle result data row
-                            electric_power_heating = electricity_demand[0]
-                            electric_power_cooling = 0
-                            if len(electricity_demand) > 0:
-                                if heat_flows["demand_heating"] > 0:
-                                    electric_power_heating += sum(electricity_demand[1:])
-                                else:
-                                    electric_power_cooling += sum(electricity_demand[1:])
-
-                            result_data_vehicles_row = {
-                                "operation_schedule": operation_schedule_name,
-                                "vehicle_name": vehicle_name,
-                                "vehicle_version_parameter_set":
-                                    dh.convert_dictionary_to_str(
-                                        vehicle_versions[vehicle_name][vehicle_version]["parameter_set"],
-                                        keys_to_display_names=True),
-                                "month_name": dh.MONTH_NAMES[month-1],
-                                "hour": hour,
-                                "electric_energy_vehicle_operation": None,
-                                "electric_energy_vehicle_operation_heating": None,
-                                "electric_energy_vehicle_operation_cooling": None,
-                                "electricity_cost_vehicle_operation": None,
-                                "electric_power_vehicle": sum(electricity_demand),
-                                "electric_power_vehicle_heating": electric_power_heating,
-                                "electric_power_vehicle_cooling": electric_power_cooling,
-                                "electric_power_resistive_heating": electricity_demand[0]
-                            }
-
-                            if len(electricity_demand) > 1:
-                                heat_pump_power_dict = {}
-                                index = 1
-                                for heat_pump in vehicle_version_data["vehicle_data"]["heating_cooling_devices"]["heat_pumps"]:
-                                    heat_pump_power_dict[heat_pump["name"]] = electricity_demand[index]
-                                    index += 1
-                                #print("\npre", heat_pump_power_dict)
-                                result_data_vehicles_row["electric_power_heat_pumps"] = dh.convert_dictionary_to_str(heat_pump_power_dict)
-                                #print("post", result_data_vehicles_row["electric_power_heat_pumps"])
-
-                            for key, value in heat_flows.items():
-                                result_data_vehicles_row["power_" + key] = value
-
-                            result_data_vehicles_row["operation_days"] = operation_days[month_id]
-                            result_data_vehicles_row["operation_hours"] = operation_hours[hour]
-                            result_data_vehicles_row["number_of_vehicles"] = vehicle_number
-                            result_data_vehicles_row["unit_cost_electricity"] = operation_schedule_data["cost_electricity"]
-                            result_data_vehicles_row["temperature_vehicle"] = temperature_vehicle
-                            result_data_vehicles_row["temperature_environment"] =(
-                                location_data[operation_schedule_data["location"]]["temperature"][month_id][hour])
-                            result_data_vehicles_row["irradiation_direct_normal"] = location_data[
-                                operation_schedule_data["location"]]["irradiation_direct_normal"][month_id][hour]
-
-                            result_data_vehicles.append(result_data_vehicles_row)
+        solar_profile = None
+        if solar_profiles is not None and operation_schedule_data["location"] in solar_profiles.keys():
+            solar_profile = solar_profiles[operation_schedule_data["location"]]
+        schedule_inputs[operation_schedule_name] = generate_schedule_input(
+            operation_schedule_data, location_data[operation_schedule_data["location"]], solar_profile, hourly,
+            transient)
+
+    # simulation units keyed by the content hash of their inputs (units in the simulation cache and repeated units of
+    # this run are not simulated, units counted once per content hash)
+    if simulation_cache is None:
+        simulation_cache = {}
+    unit_hashes = {}
+    pending_unit_hashes = set()
+    pending_vehicles = {}
+    for operation_schedule_name, operation_schedule_data in operation_schedules.items():
+        schedule_input_hash = calculate_schedule_input_hash(schedule_inputs[operation_schedule_name],
+                                                            operation_schedule_data, vectorized, solar_integration)
+        for vehicle_name in operation_schedule_data["vehicles_in_operation"].keys():
+            for vehicle_version, version_key in version_keys[vehicle_name].items():
+                unit_hash = calculate_simulation_unit_hash(
+                    schedule_input_hash, version_key["content_hash"],
+                    compiled_curves[version_key["temperature_control_curve"]])
+                unit_hashes[(operation_schedule_name, vehicle_name, vehicle_version)] = unit_hash
+                if unit_hash not in simulation_cache.keys() and unit_hash not in pending_unit_hashes:
+                    pending_unit_hashes.add(unit_hash)
+                    (pending_vehicles.setdefault(operation_schedule_name, {}).setdefault(vehicle_name, {})
+                     [vehicle_version]) = version_key["passive_key"]
+    engine_statistics_run["simulation_units"] = len(set(unit_hashes.values()))
+
+    # simulate all operation hours of each pending vehicle version at once (serial or in worker processes)
+    simulation_tasks = generate_simulation_tasks(pending_vehicles, workers)
+    pending_vehicles_names = {vehicle_name for pending_vehicles_schedule in pending_vehicles.values()
+                              for vehicle_name in pending_vehicles_schedule.keys()}
+    simulation_inputs = {
+        "vehicle_versions": {vehicle_name: vehicle_versions[vehicle_name] for vehicle_name in pending_vehicles_names},
+        "vehicles": {vehicle_name: vehicles[vehicle_name] for vehicle_name in pending_vehicles_names
+                     if vehicle_name in vehicles.keys()},
+        "compiled_curves": compiled_curves,
+        "operation_schedules": operation_schedules,
+        "schedule_inputs": schedule_inputs,
+        "vectorized": vectorized,
+        "solar_integration": solar_integration
+    }
+    unit_results_run = {}
+    for simulation_task, version_results in zip(simulation_tasks,
+                                                simulate_simulation_tasks(simulation_tasks, simulation_inputs,
+                                                                          workers, engine_statistics_run)):
+        for vehicle_version, results in version_results.items():
+            unit_results_run[unit_hashes[(simulation_task[0], simulation_task[1], vehicle_version)]] = results
+    for unit_hash in set(unit_hashes.values()):
+        if unit_hash not in unit_results_run.keys():
+            unit_results_run[unit_hash] = simulation_cache[unit_hash]
+            engine_statistics_run["simulation_units_cached"] += 1
+    simulation_cache.clear()
+    simulation_cache.update(unit_results_run)
+
+    schedule_results = {operation_schedule_name: {} for operation_schedule_name in operation_schedules.keys()}
+    for (operation_schedule_name, vehicle_name, vehicle_version), unit_hash in unit_hashes.items():
+        schedule_results[operation_schedule_name][(vehicle_name, vehicle_version)] = unit_results_run[unit_hash]
+
+    # create result data per operation schedule
+    result_columns_schedules = []
+    heat_pump_columns_schedules = []
+    totals_columns_schedules = []
+    for operation_schedule_name, operation_schedule_data in operation_schedules.items():
+        operation_days = schedule_inputs[operation_schedule_name]["operation_days"]
+        operation_hours = schedule_inputs[operation_schedule_name]["operation_hours"]
+        month_ids = schedule_inputs[operation_schedule_name]["month_ids"]
+        hours = schedule_inputs[operation_schedule_name]["hours"]
+        temperature_environment = schedule_inputs[operation_schedule_name]["temperature_environment"]
+        irradiation = schedule_inputs[operation_schedule_name]["irradiation"]
+        version_results = schedule_results[operation_schedule_name]
+
+        # create result data for vehicles (columns of shape hours x units, rows ordered by month, hour, vehicle and
+        # version)
+        units = [(vehicle_name, vehicle_number, vehicle_version)
+                 for vehicle_name, vehicle_number in operation_schedule_data["vehicles_in_operation"].items()
+                 for vehicle_version in version_keys[vehicle_name].keys()]
+        if len(hours) == 0 or len(units) == 0:
+            continue
+        unit_results = [version_results[(vehicle_name, vehicle_version)]
+                        for vehicle_name, vehicle_number, vehicle_version in units]
+
+        temperature_vehicle = np.stack([results[0] for results in unit_results], axis=1)
+        heat_flows = {key: np.stack([results[1][key] for results in unit_results], axis=1)
+                      for key in unit_results[0][1].keys()}
+        electric_power_vehicle = np.stack([np.sum(results[2], axis=1) for results in unit_results], axis=1)
+        electric_power_resistive_heating = np.stack([results[2][:, 0] for results in unit_results], axis=1)
+        electric_power_heat_pumps = np.stack([np.sum(results[2][:, 1:], axis=1) for results in unit_results], axis=1)
+        demand_heating = heat_flows["demand_heating"] > 0
+        electric_power_vehicle_heating = (electric_power_resistive_heating
+                                          + np.where(demand_heating, electric_power_heat_pumps, 0))
+        electric_power_vehicle_cooling = np.where(demand_heating, 0, electric_power_heat_pumps)
+        electric_power_devices = np.concatenate([results[2][:, 1:] for results in unit_results], axis=1)
+        heating_satisfied = np.stack([results[3] for results in unit_results], axis=1)
+        cooling_satisfied = np.stack([results[4] for results in unit_results], axis=1)
+
+        # aggregate hours of the year to means & peaks per month and hour
+        if hourly:
+            group_begin = np.flatnonzero(np.r_[True, (np.diff(month_ids) != 0) | (np.diff(hours) != 0)])
+            electric_power_vehicle_peak = aggregate_month_hour_array(electric_power_vehicle, group_begin, "max")
+            electric_power_devices_peak = aggregate_month_hour_array(electric_power_devices, group_begin, "max")
+            (temperature_vehicle, electric_power_vehicle, electric_power_resistive_heating,
+             electric_power_vehicle_heating, electric_power_vehicle_cooling, electric_power_devices,
+             temperature_environment, irradiation) = [
+                aggregate_month_hour_array(values, group_begin) for values in
+                [temperature_vehicle, electric_power_vehicle, electric_power_resistive_heating,
+                 electric_power_vehicle_heating, electric_power_vehicle_cooling, electric_power_devices,
+                 temperature_environment, irradiation]]
+            heat_flows = {key: aggregate_month_hour_array(value, group_begin) for key, value in heat_flows.items()}
+            heating_satisfied = aggregate_month_hour_array(heating_satisfied, group_begin, "all")
+            cooling_satisfied = aggregate_month_hour_array(cooling_satisfied, group_begin, "all")
+            month_ids = month_ids[group_begin]
+            hours = hours[group_begin]
+        else:
+            electric_power_vehicle_peak = electric_power_vehicle
+            electric_power_devices_peak = electric_power_devices
+
+        # manage satisfied data (in order of hours, vehicles and versions)
+        for satisfied, not_satisfied in [(heating_satisfied, heating_not_satisfied),
+                                         (cooling_satisfied, cooling_not_satisfied)]:
+            for hour_index, unit_index in zip(*np.nonzero(~satisfied)):
+                vehicle_name, vehicle_number, vehicle_version = units[unit_index]
+                (not_satisfied.setdefault(operation_schedule_name, {}).setdefault(vehicle_name, {})
+                 .setdefault(vehicle_version, {}).setdefault(dh.MONTH_NAMES[month_ids[hour_index]], [])
+                 .append(int(hours[hour_index])))
+
+        # create heat pump result data columns (long format of shape hours x devices, rows ordered by month, hour,
+        # vehicle, version and heat pump)
+        devices = [(unit_index, heat_pump_name) for unit_index, (vehicle_name, vehicle_number, vehicle_version)
+                   in enumerate(units) for heat_pump_name in version_keys[vehicle_name][vehicle_version]
+                   ["heat_pump_names"]]
+        if len(devices) > 0:
+            device_units = np.array([unit_index for unit_index, heat_pump_name in devices])
+            heat_pump_columns_schedules.append({
+                "operation_schedule": np.full(len(hours) * len(devices), operation_schedule_name, dtype=object),
+                "vehicle_name": np.tile(np.array([units[unit_index][0] for unit_index in device_units],
+                                                 dtype=object), len(hours)),
+                "vehicle_version_parameter_set": np.tile(np.array(
+                    [version_labels[(units[unit_index][0], units[unit_index][2])] for unit_index in device_units],
+                    dtype=object), len(hours)),
+                "month_name": np.repeat(np.array(dh.MONTH_NAMES, dtype=object)[month_ids], len(devices)),
+                "hour": np.repeat(hours, len(devices)),
+                "heat_pump_name": np.tile(np.array([heat_pump_name for unit_index, heat_pump_name in devices],
+                                                   dtype=object), len(hours)),
+                "electric_power_heat_pump": electric_power_devices.ravel(),
+                "electric_power_heat_pump_peak": electric_power_devices_peak.ravel(),
+                "operation_days": np.repeat(np.array(operation_days)[month_ids], len(devices)),
+                "operation_hours": np.repeat(np.array(operation_hours)[hours], len(devices))
+            })
+
+        # annual totals per unit (power of shape hours x units weighted by operation days and hours)
+        operation_weights = np.array(operation_days)[month_ids] * np.array(operation_hours)[hours]
+        electric_energy_units = operation_weights @ np.stack(
+            [electric_power_vehicle, electric_power_vehicle_heating, electric_power_vehicle_cooling], axis=0)
+        totals_columns_schedules.append({
+            "operation_schedule": np.full(len(units), operation_schedule_name, dtype=object),
+            "vehicle_name": np.array([unit[0] for unit in units], dtype=object),
+            "vehicle_version_parameter_set": np.array([version_labels[(unit[0], unit[2])] for unit in units],
+                                                      dtype=object),
+            "number_of_vehicles": np.array([unit[1] for unit in units]),
+            "electric_energy_vehicle_operation_total": electric_energy_units[0],
+            "electric_energy_vehicle_operation_heating_total": electric_energy_units[1],
+            "electric_energy_vehicle_operation_cooling_total": electric_energy_units[2],
+            "electricity_cost_vehicle_operation_total": (electric_energy_units[0]
+                                                         * operation_schedule_data["cost_electricity"]),
+            "electric_power_vehicle_peak": np.max(electric_power_vehicle_peak, axis=0)
+        })
+
+        # create vehicle result data columns
+        columns_schedule = {
+            "operation_schedule": np.full(len(hours) * len(units), operation_schedule_name, dtype=object),
+            "vehicle_name": np.tile(np.array([unit[0] for unit in units], dtype=object), len(hours)),
+            "vehicle_version_parameter_set": np.tile(np.array([version_labels[(unit[0], unit[2])] for unit in units],
+                                                              dtype=object), len(hours)),
+            "month_name": np.repeat(np.array(dh.MONTH_NAMES, dtype=object)[month_ids], len(units)),
+            "hour": np.repeat(hours, len(units)),
+            "electric_power_vehicle": electric_power_vehicle.ravel(),
+            "electric_power_vehicle_peak": electric_power_vehicle_peak.ravel(),
+            "electric_power_vehicle_heating": electric_power_vehicle_heating.ravel(),
+            "electric_power_vehicle_cooling": electric_power_vehicle_cooling.ravel(),
+            "electric_power_resistive_heating": electric_power_resistive_heating.ravel()
+        }
+        for key, value in heat_flows.items():
+            columns_schedule["power_" + key] = value.ravel()
+        columns_schedule["operation_days"] = np.repeat(np.array(operation_days)[month_ids], len(units))
+        columns_schedule["operation_hours"] = np.repeat(np.array(operation_hours)[hours], len(units))
+        columns_schedule["number_of_vehicles"] = np.tile(np.array([unit[1] for unit in units]), len(hours))
+        columns_schedule["unit_cost_electricity"] = np.repeat(np.array([operation_schedule_data["cost_electricity"]]),
+                                                              len(hours) * len(units))
+        columns_schedule["temperature_vehicle"] = temperature_vehicle.ravel()
+        columns_schedule["temperature_environment"] = np.repeat(temperature_environment, len(units))
+        columns_schedule["irradiation_direct_normal"] = np.repeat(irradiation, len(units))
+
+        result_columns_schedules.append(columns_schedule)
 
     # unsatisfied demand warning
     warning = (len(heating_not_satisfied) > 0 or len(cooling_not_satisfied) > 0)
@@ -657,9 +2213,7 @@ def simulate_system(operation_schedules:dict,
                 warning_text += "\n\t- " + key_operation_schedule
                 for key_vehicle, data_vehicle in data_operation_schedule.items():
                     for key_version, data_version in data_vehicle.items():
-                        version_parameter_set_str = dh.convert_dictionary_to_str(
-                            vehicle_versions[key_vehicle][key_version]["parameter_set"],
-                            keys_to_display_names=True)
+                        version_parameter_set_str = version_labels[(key_vehicle, key_version)]
                         warning_text += "\n\t\t- " + key_vehicle + " " + version_parameter_set_str + ": "
                         first_month = True
                         for month_name, hours in data_version.items():
@@ -676,9 +2230,7 @@ def simulate_system(operation_schedules:dict,
                 warning_text += "\n\t- " + key_operation_schedule
                 for key_vehicle, data_vehicle in data_operation_schedule.items():
                     for key_version, data_version in data_vehicle.items():
-                        version_parameter_set_str = dh.convert_dictionary_to_str(
-                            vehicle_versions[key_vehicle][key_version]["parameter_set"],
-                            keys_to_display_names=True)
+                        version_parameter_set_str = version_labels[(key_vehicle, key_version)]
                         warning_text += "\n\t\t- " + key_vehicle + " " + version_parameter_set_str + ": "
                         first_month = True
                         for month_name, hours in data_version.items():
@@ -691,7 +2243,32 @@ def simulate_system(operation_schedules:dict,
 
         demand_not_satisfied_warning = Warning(warning_text)
 
-    df_vehicle_results = pd.DataFrame(result_data_vehicles)
+    # create vehicle result dataframe once from columns (repeated labels as categorical data)
+    column_names = ["operation_schedule", "vehicle_name", "vehicle_version_parameter_set", "month_name", "hour",
+                    "electric_energy_vehicle_operation", "electric_energy_vehicle_operation_heating",
+                    "electric_energy_vehicle_operation_cooling", "electricity_cost_vehicle_operation",
+                    "electric_power_vehicle", "electric_power_vehicle_peak", "electric_power_vehicle_heating",
+                    "electric_power_vehicle_cooling", "electric_power_resistive_heating"]
+    column_names += (["power_" + key for key in HEAT_FLOW_KEYS]
+                     + ["operation_days", "operation_hours", "number_of_vehicles", "unit_cost_electricity",
+                        "temperature_vehicle", "temperature_environment", "irradiation_direct_normal"])
+
+    result_columns = {}
+    for column_name in column_names:
+        if column_name in ["electric_energy_vehicle_operation", "electric_energy_vehicle_operation_heating",
+                           "electric_energy_vehicle_operation_cooling", "electricity_cost_vehicle_operation"]:
+            result_columns[column_name] = None
+        elif len(result_columns_schedules) == 0:
+            result_columns[column_name] = np.array([])
+        else:
+            result_columns[column_name] = np.concatenate([columns_schedule[column_name]
+                                                          for columns_schedule in result_columns_schedules])
+    for column_name in ["operation_schedule", "vehicle_name", "vehicle_version_parameter_set"]:
+        result_columns[column_name] = pd.Categorical(result_columns[column_name],
+                                                     categories=sorted(set(result_columns[column_name])))
+    result_columns["month_name"] = pd.Categorical(result_columns["month_name"], categories=dh.MONTH_NAMES)
+
+    df_vehicle_results = pd.DataFrame(result_columns, columns=column_names)
 
     df_vehicle_results["electric_energy_vehicle_operation"] = (df_vehicle_results["electric_power_vehicle"]
                                                                * df_vehicle_results["operation_hours"]
@@ -706,76 +2283,707 @@ def simulate_system(operation_schedules:dict,
                                                                 * df_vehicle_results["unit_cost_electricity"])
 
 
-    # group by and sum for operation schedule and vehicle version
+    # annual totals for operation schedule and vehicle version (ordered by operation schedule, vehicle and version)
+
+    totals_column_names = ["operation_schedule", "vehicle_name", "vehicle_version_parameter_set", "number_of_vehicles",
+                           "electric_energy_vehicle_operation_total", "electric_energy_vehicle_operation_heating_total",
+                           "electric_energy_vehicle_operation_cooling_total", "electricity_cost_vehicle_operation_total",
+                           "electric_power_vehicle_peak"]
+    totals_columns = {}
+    for column_name in totals_column_names:
+        if len(totals_columns_schedules) == 0:
+            totals_columns[column_name] = np.array([])
+        else:
+            totals_columns[column_name] = np.concatenate([columns_schedule[column_name]
+                                                          for columns_schedule in totals_columns_schedules])
+    for column_name in ["operation_schedule", "vehicle_name", "vehicle_version_parameter_set"]:
+        totals_columns[column_name] = pd.Categorical(totals_columns[column_name],
+                                                     categories=sorted(set(totals_columns[column_name])))
+
+    df_vehicle_operation_totals = pd.DataFrame(totals_columns, columns=totals_column_names)
+    df_vehicle_operation_totals = df_vehicle_operation_totals.sort_values(
+        ["operation_schedule", "vehicle_name", "vehicle_version_parameter_set", "number_of_vehicles"], kind="stable",
+        ignore_index=True)
+
+
+    # heat pumps (long format, one row per operation schedule, vehicle version, hour and heat pump)
+
+    heat_pump_column_names = ["operation_schedule", "vehicle_name", "vehicle_version_parameter_set", "month_name",
+                              "hour", "heat_pump_name", "electric_energy_heat_pump_operation",
+                              "electric_power_heat_pump", "electric_power_heat_pump_peak", "operation_days",
+                              "operation_hours"]
+    heat_pump_columns = {}
+    for column_name in heat_pump_column_names:
+        if column_name == "electric_energy_heat_pump_operation":
+            heat_pump_columns[column_name] = None
+        elif len(heat_pump_columns_schedules) == 0:
+            heat_pump_columns[column_name] = np.array([])
+        else:
+            heat_pump_columns[column_name] = np.concatenate([columns_schedule[column_name]
+                                                             for columns_schedule in heat_pump_columns_schedules])
+    for column_name in ["operation_schedule", "vehicle_name", "vehicle_version_parameter_set", "heat_pump_name"]:
+        heat_pump_columns[column_name] = pd.Categorical(heat_pump_columns[column_name],
+                                                        categories=sorted(set(heat_pump_columns[column_name])))
+    heat_pump_columns["month_name"] = pd.Categorical(heat_pump_columns["month_name"], categories=dh.MONTH_NAMES)
 
-    df_vehicle_operation_totals = copy.deepcopy(df_vehicle_results)
-    df_vehicle_operation_totals = df_vehicle_operation_totals.groupby(
-        ["operation_schedule", "vehicle_name", "vehicle_version_parameter_set", "number_of_vehicles"]).sum()
+    df_heat_pump_results = pd.DataFrame(heat_pump_columns, columns=heat_pump_column_names)
 
-    df_vehicle_operation_totals.reset_index(inplace=True)
-    df_vehicle_operation_totals = df_vehicle_operation_totals[[
-        "operation_schedule", "vehicle_name", "vehicle_version_parameter_set", "number_of_vehicles",
-        "electric_energy_vehicle_operation", "electric_energy_vehicle_operation_heating",
-        "electric_energy_vehicle_operation_cooling", "electricity_cost_vehicle_operation"
-    ]]
-    df_vehicle_operation_totals = df_vehicle_operation_totals.rename(columns={
-        "electric_energy_vehicle_operation": "electric_energy_vehicle_operation_total",
-        "electric_energy_vehicle_operation_heating": "electric_energy_vehicle_operation_heating_total",
-        "electric_energy_vehicle_operation_cooling": "electric_energy_vehicle_operation_cooling_total",
-        "electricity_cost_vehicle_operation": "electricity_cost_vehicle_operation_total"
-    })
+    df_heat_pump_results["electric_energy_heat_pump_operation"] = (df_heat_pump_results["electric_power_heat_pump"]
+                                                                   * df_heat_pump_results["operation_hours"]
+                                                                   * df_heat_pump_results["operation_days"])
 
+    df_heat_pump_totals = df_heat_pump_results.groupby(
+        ["operation_schedule", "vehicle_name", "vehicle_version_parameter_set", "heat_pump_name"], observed=True).agg(
+        electric_energy_heat_pump_operation_total=("electric_energy_heat_pump_operation", "sum"),
+        electric_power_heat_pump_peak=("electric_power_heat_pump_peak", "max"))
+    df_heat_pump_totals.reset_index(inplace=True)
 
-    # scenarios
 
-    data_scenarios = []
-    reference_scenario_energy = None
-    for scenario_name, scenario_data in scenarios.items():
-        scenario_row = {
-            "scenario_name": scenario_name,
-            "electric_energy_scenario_total": 0.0,
-            "electric_energy_scenario_heating_total": 0.0,
-            "electric_energy_scenario_cooling_total": 0.0,
-            "electricity_cost_scenario_total": 0.0,
-            "comparison_to_reference": None,
-            "reference_scenario": scenario_name == reference_scenario_name
-        }
+    # round dataframe floats & aggregate operation totals and scenarios (unrounded totals as aggregation inputs)
+
+    aggregation_inputs_run = {
+        "vehicle_operation_totals": df_vehicle_operation_totals,
+        "electric_energy_vehicle_operation": df_vehicle_results["electric_energy_vehicle_operation"].to_numpy()
+    }
+    if aggregation_inputs is not None:
+        aggregation_inputs.clear()
+        aggregation_inputs.update(aggregation_inputs_run)
+
+    rounding_digits = dh.get_decimal_digits(dh.get_parameter_option("results", "rounding_precision"))
+    df_vehicle_results = df_vehicle_results.round(rounding_digits)
+    df_heat_pump_results = df_heat_pump_results.round(rounding_digits)
+    df_heat_pump_totals = df_heat_pump_totals.round(rounding_digits)
+
+    df_vehicle_results, df_vehicle_operation_totals, df_scenario_totals = aggregate_system_results(
+        aggregation_inputs_run, df_vehicle_results, operation_schedules, scenarios, reference_scenario_name)
+
+
+    if engine_statistics is not None:
+        engine_statistics.clear()
+        engine_statistics.update(get_engine_statistics(engine_statistics_run))
+
+    return (df_vehicle_results, df_vehicle_operation_totals, df_scenario_totals, df_heat_pump_results,
+            df_heat_pump_totals, demand_not_satisfied_warning)
+
+
+
+def aggregate_system_results(aggregation_inputs:dict,
+                             df_vehicle_results:pd.DataFrame,
+                             operation_schedules:dict,
+                             scenarios:dict,
+                             reference_scenario_name:str)->Tuple[pd.DataFrame,pd.DataFrame,pd.DataFrame]:
+    # operation totals, scenario totals & reference comparison from the annual totals per unit of a previous run (see
+    # simulate_system), with current vehicle numbers, electricity cost and scenarios (no re-simulation); vehicle
+    # results (rounded) with updated vehicle numbers and electricity cost
+    rounding_digits = dh.get_decimal_digits(dh.get_parameter_option("results", "rounding_precision"))
+
+    # vehicle numbers & electricity cost per row from the operation schedules (via categorical codes)
+    def get_schedule_values(df:pd.DataFrame)->Tuple[np.ndarray,np.ndarray]:
+        schedule_names = df["operation_schedule"].cat.categories
+        vehicle_names = df["vehicle_name"].cat.categories
+        vehicle_numbers = np.zeros((len(schedule_names), len(vehicle_names)))
+        costs_electricity = np.zeros(len(schedule_names))
+        for schedule_index, operation_schedule_name in enumerate(schedule_names):
+            operation_schedule_data = operation_schedules[operation_schedule_name]
+            costs_electricity[schedule_index] = operation_schedule_data["cost_electricity"]
+            for vehicle_index, vehicle_name in enumerate(vehicle_names):
+                vehicle_numbers[schedule_index, vehicle_index] = (
+                    operation_schedule_data["vehicles_in_operation"].get(vehicle_name, 0))
+        schedule_codes = df["operation_schedule"].cat.codes.to_numpy()
+        vehicle_codes = df["vehicle_name"].cat.codes.to_numpy()
+        return vehicle_numbers[schedule_codes, vehicle_codes], costs_electricity[schedule_codes]
+
+    df_vehicle_operation_totals = aggregation_inputs["vehicle_operation_totals"].copy()
+    vehicle_numbers, costs_electricity = get_schedule_values(df_vehicle_operation_totals)
+    df_vehicle_operation_totals["number_of_vehicles"] = vehicle_numbers.astype(
+        df_vehicle_operation_totals["number_of_vehicles"].dtype)
+    df_vehicle_operation_totals["electricity_cost_vehicle_operation_total"] = (
+        df_vehicle_operation_totals["electric_energy_vehicle_operation_total"].to_numpy() * costs_electricity)
+
+    df_vehicle_results = df_vehicle_results.copy(deep=False)
+    vehicle_numbers, costs_electricity = get_schedule_values(df_vehicle_results)
+    df_vehicle_results["number_of_vehicles"] = vehicle_numbers.astype(df_vehicle_results["number_of_vehicles"].dtype)
+    df_vehicle_results["unit_cost_electricity"] = costs_electricity
+    df_vehicle_results["electricity_cost_vehicle_operation"] = np.round(
+        aggregation_inputs["electric_energy_vehicle_operation"] * costs_electricity, rounding_digits)
+
+
+    # scenarios (sparse selection matrix of shape scenarios x operation totals rows, entries number of vehicles)
+
+    unit_indices = {unit: index for index, unit in enumerate(zip(
+        df_vehicle_operation_totals["operation_schedule"].astype(str),
+        df_vehicle_operation_totals["vehicle_name"].astype(str),
+        df_vehicle_operation_totals["vehicle_version_parameter_set"].astype(str)))}
+    selection_rows = []
+    selection_columns = []
+    selection_values = []
+    for scenario_index, scenario_data in enumerate(scenarios.values()):
         for operation_schedule_name, operation_schedule_data in operation_schedules.items():
             for vehicle_name, vehicle_number in operation_schedule_data["vehicles_in_operation"].items():
                 if vehicle_number > 0:
                     vehicle_version_parameter_set = scenario_data[f"{operation_schedule_name} - {vehicle_name}"]
-                    operation_schedule_row = df_vehicle_operation_totals.loc[
-                        (df_vehicle_operation_totals['operation_schedule'] == operation_schedule_name)
-                        & (df_vehicle_operation_totals['vehicle_name'] == vehicle_name)
-                        & (df_vehicle_operation_totals['vehicle_version_parameter_set'] == vehicle_version_parameter_set)
-                    ]
-                    scenario_row["electric_energy_scenario_total"] += (
-                            vehicle_number * float(operation_schedule_row["electric_energy_vehicle_operation_total"].iloc[0]))
-                    scenario_row["electric_energy_scenario_heating_total"] += (
-                            vehicle_number * float(operation_schedule_row["electric_energy_vehicle_operation_heating_total"].iloc[0]))
-                    scenario_row["electric_energy_scenario_cooling_total"] += (
-                            vehicle_number * float(operation_schedule_row["electric_energy_vehicle_operation_cooling_total"].iloc[0]))
-                    scenario_row["electricity_cost_scenario_total"] += (
-                            vehicle_number * float(operation_schedule_row["electricity_cost_vehicle_operation_total"].iloc[0]))
-        if scenario_name == reference_scenario_name:
-            reference_scenario_energy = scenario_row["electric_energy_scenario_total"]
-        data_scenarios.append(scenario_row)
-
-    for scenario_row in data_scenarios:
-        if not scenario_row["scenario_name"] == reference_scenario_name:
-            scenario_row["comparison_to_reference"] = (
-                    100 * (scenario_row["electric_energy_scenario_total"] - reference_scenario_energy)
-                    / reference_scenario_energy)
-
-    df_scenario_totals = pd.DataFrame(data_scenarios)
+                    selection_rows.append(scenario_index)
+                    selection_columns.append(unit_indices[(operation_schedule_name, vehicle_name,
+                                                           vehicle_version_parameter_set)])
+                    selection_values.append(vehicle_number)
+    scenario_selection = csr_matrix((np.array(selection_values, dtype=float),
+                                     (np.array(selection_rows, dtype=int), np.array(selection_columns, dtype=int))),
+                                    shape=(len(scenarios), len(df_vehicle_operation_totals)))
+    scenario_values = scenario_selection @ df_vehicle_operation_totals[[
+        "electric_energy_vehicle_operation_total", "electric_energy_vehicle_operation_heating_total",
+        "electric_energy_vehicle_operation_cooling_total", "electricity_cost_vehicle_operation_total"
+    ]].to_numpy(dtype=float)
+
+    scenario_names = list(scenarios.keys())
+    reference_scenario = np.array([scenario_name == reference_scenario_name for scenario_name in scenario_names],
+                                  dtype=bool)
+    comparison_to_reference = np.full(len(scenarios), np.nan)
+    if reference_scenario.any():
+        reference_scenario_energy = scenario_values[reference_scenario, 0][0]
+        comparison_to_reference[~reference_scenario] = (100 * (scenario_values[~reference_scenario, 0]
+                                                               - reference_scenario_energy)
+                                                        / reference_scenario_energy)
+
+    df_scenario_totals = pd.DataFrame({
+        "scenario_name": scenario_names,
+        "electric_energy_scenario_total": scenario_values[:, 0],
+        "electric_energy_scenario_heating_total": scenario_values[:, 1],
+        "electric_energy_scenario_cooling_total": scenario_values[:, 2],
+        "electricity_cost_scenario_total": scenario_values[:, 3],
+        "comparison_to_reference": comparison_to_reference,
+        "reference_scenario": reference_scenario
+    })
 
 
     # round dataframe floats
 
-    rounding_digits = dh.get_decimal_digits(dh.get_parameter_option("results", "rounding_precision"))
-    df_vehicle_results = df_vehicle_results.round(rounding_digits)
     df_vehicle_operation_totals = df_vehicle_operation_totals.round(rounding_digits)
     df_scenario_totals = df_scenario_totals.round(rounding_digits)
 
+    return df_vehicle_results, df_vehicle_operation_totals, df_scenario_totals
+
+
+
+# parameter samples (uncertainty propagation, all samples of a vehicle version as one batch of samples x hours)
+
+
+def sample_parameter_factors(parameter_uncertainties:list, number_samples:int, seed:int=None)->dict:
+    # factors on the specified parameter values per uncertain parameter (keys: group, vehicle or operation schedule
+    # name and parameter), drawn from the distribution of the relative deviation (normal: standard deviation,
+    # uniform & triangular: half width, relative_spread as fraction of the specified value), non-negative
+    rng = np.random.default_rng(seed)
+
+    parameter_factors = {}
+    for uncertainty in parameter_uncertainties:
+        spread = float(uncertainty["relative_spread"])
+        if uncertainty["distribution"] not in UNCERTAINTY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution '{uncertainty['distribution']}' of parameter "
+                             f"'{uncertainty['parameter']}' ({uncertainty['name']}).")
+        if spread <= 0:
+            factors = np.ones(number_samples)
+        elif uncertainty["distribution"] == "normal":
+            factors = rng.normal(1, spread, number_samples)
+        elif uncertainty["distribution"] == "uniform":
+            factors = rng.uniform(1 - spread, 1 + spread, number_samples)
+        else:
+            factors = rng.triangular(1 - spread, 1, 1 + spread, number_samples)
+        parameter_factors[(uncertainty["group"], uncertainty["name"], uncertainty["parameter"])] = np.maximum(0,
+                                                                                                              factors)
+
+    return parameter_factors
+
+
+
+def sample_parameter_values(value:float, factors:np.ndarray, boundaries:tuple)->np.ndarray:
+    # parameter values of samples limited to the admissible range of the parameter (boundaries: minimum & maximum
+    # value, see data_handler.get_parameter_uncertainty_boundaries)
+    value_min, value_max = boundaries
+    return np.clip(value * np.asarray(factors, dtype=float), value_min, value_max)
+
+
+
+def simulate_solar_absorption_geometries_array(geometries:np.ndarray,
+                                               solar_profile:dict,
+                                               solar_integration:str=SOLAR_INTEGRATION_DEFAULT)->np.ndarray:
+    # solar absorption [W] of shape geometries x hours (geometries: solar absorption geometry, obstacle distance &
+    # obstacle height per row, see get_solar_absorption_geometry)
+    # the orientation integrals only depend on the obstacle slope, thus they are evaluated once per distinct slope
+    # (in batches of limited size) and combined linearly with the absorption areas of all geometries
+    irradiation_horizontal = solar_profile["irradiation_horizontal"]
+    irradiation_vertical = solar_profile["irradiation_vertical"]
+    irradiated = (irradiation_horizontal != 0) | (irradiation_vertical != 0)
+    number_irradiated = int(np.sum(irradiated))
+
+    absorption = np.zeros((len(geometries), len(irradiated)))
+    if number_irradiated == 0:
+        return absorption
+
+    vehicle = dict(zip(VEHICLE_PARAMETERS_SOLAR_ABSORPTION, geometries[:, :-2, np.newaxis].transpose(1, 0, 2)))
+    slopes_unique, slope_indices = np.unique(np.abs((geometries[:, -1] - vehicle["height"][:, 0])
+                                                    / geometries[:, -2]), return_inverse=True)
+    integrals = np.zeros((3, len(slopes_unique), number_irradiated))
+    batch_size = max(1, SAMPLE_BATCH_VALUES_MAX // (number_irradiated * len(SOLAR_INTEGRATION_STEP_GRADING) * 2
+                                                    * SOLAR_INTEGRATION_ORDERS[solar_integration]))
+    for batch_begin in range(0, len(slopes_unique), batch_size):
+        batch_slopes = slopes_unique[batch_begin:batch_begin + batch_size]
+        integrals[:, batch_begin:batch_begin + len(batch_slopes)] = np.reshape(
+            calculate_solar_orientation_integrals_gauss_legendre(
+                np.repeat(batch_slopes, number_irradiated),
+                np.tile(solar_profile["angle_altitude"][irradiated], len(batch_slopes)), solar_integration),
+            (3, len(batch_slopes), number_irradiated))
+
+    integral, integral_cos, integral_sin = integrals[:, slope_indices.ravel()]
+    area_horizontal, area_front, area_side = calculate_solar_absorption_areas(vehicle)
+    absorption[:, irradiated] = (np.abs(area_horizontal * integral) * irradiation_horizontal[irradiated]
+                                 + np.abs(area_front * integral_cos + area_side * integral_sin)
+                                 * irradiation_vertical[irradiated])
+
+    return absorption
+
+
+
+def simulate_vehicle_temperatures_samples_array(heating_temperature:np.ndarray,
+                                                cooling_temperature:np.ndarray,
+                                                temperature_environment:np.ndarray,
+                                                heat_constant:np.ndarray,
+                                                conductance_linear:np.ndarray,
+                                                coefficient_doors:np.ndarray)->np.ndarray:
+    # vehicle temperatures of shape samples x hours (setpoint temperatures & environment temperature per hour,
+    # heat_constant including solar heat flow per sample & hour, conductances per sample of shape samples x 1), the
+    # free-floating temperature is only solved where neither setpoint temperature binds (as in
+    # simulate_vehicle_temperatures_array)
+    heating_binding = calculate_setpoint_binding_array(np.broadcast_to(heating_temperature, heat_constant.shape),
+                                                       temperature_environment, heat_constant, conductance_linear,
+                                                       coefficient_doors) < 0
+    cooling_binding = calculate_setpoint_binding_array(np.broadcast_to(cooling_temperature, heat_constant.shape),
+                                                       temperature_environment, heat_constant, conductance_linear,
+                                                       coefficient_doors) > 0
+    solve_required = ~(heating_binding | cooling_binding)
+
+    temperature_free_floating = np.full(heat_constant.shape, np.nan)
+    if solve_required.any():
+        temperature_free_floating[solve_required] = solve_vehicle_temperature_newton(
+            np.broadcast_to(temperature_environment, heat_constant.shape)[solve_required],
+            heat_constant[solve_required], np.broadcast_to(conductance_linear, heat_constant.shape)[solve_required],
+            np.broadcast_to(coefficient_doors, heat_constant.shape)[solve_required])[0]
+    record_solver_skipped(int(np.sum(~solve_required)))
+
+    return np.where(heating_binding, heating_temperature,
+                    np.where(cooling_binding, cooling_temperature, temperature_free_floating))
+
+
+
+def simulate_vehicle_samples_array(vehicle_data:dict,
+                                   compiled_curve:dict,
+                                   operation_schedule_data:dict,
+                                   schedule_input:dict,
+                                   vehicle_factors:dict,
+                                   schedule_factors:dict,
+                                   parameter_boundaries:dict,
+                                   number_samples:int,
+                                   solar_integration:str=SOLAR_INTEGRATION_DEFAULT)->np.ndarray:
+    # annual electric energy (total, heating & cooling) and electricity cost of one vehicle version in one operation
+    # schedule per sample (shape samples x 4), parameter values multiplied by the factors per sample
+    # (vehicle_factors & schedule_factors: factors per parameter, see sample_parameter_factors; parameter_boundaries:
+    # admissible range per group & parameter with factors, see sample_parameter_values)
+    temperature_environment = schedule_input["temperature_environment"]
+    solar_profile = schedule_input["solar_profile"]
+    number_hours = len(temperature_environment)
+    operation_weights = np.array(schedule_input["operation_hours"])[schedule_input["hours"]]
+    if schedule_input["days"] is None:
+        operation_weights = np.array(schedule_input["operation_days"])[schedule_input["month_ids"]] * operation_weights
+
+    heating_temperature, cooling_temperature = calculate_setpoint_temperatures_array(compiled_curve,
+                                                                                     temperature_environment)
+    device_table = compile_device_table(vehicle_data)
+
+    results = np.zeros((number_samples, 4))
+    batch_size = max(1, SAMPLE_BATCH_VALUES_MAX // max(1, number_hours))
+    for batch_begin in range(0, number_samples, batch_size):
+        batch = slice(batch_begin, min(number_samples, batch_begin + batch_size))
+        batch_samples = batch.stop - batch.start
+
+        # parameter values per sample
+        vehicle_samples = dict(vehicle_data)
+        for parameter, factors in vehicle_factors.items():
+            vehicle_samples[parameter] = sample_parameter_values(vehicle_data[parameter], factors[batch],
+                                                                 parameter_boundaries[("vehicle", parameter)])
+        schedule_samples = {}
+        for parameter in ["passenger_number", "obstacle_distance", "obstacle_height", "cost_electricity"]:
+            schedule_samples[parameter] = np.full(batch_samples, float(operation_schedule_data[parameter]))
+            if parameter in schedule_factors.keys():
+                schedule_samples[parameter] = sample_parameter_values(
+                    operation_schedule_data[parameter], schedule_factors[parameter][batch],
+                    parameter_boundaries[("operation_schedule", parameter)])
+        coefficients = {name: np.broadcast_to(value, batch_samples)
+                        for name, value in calculate_heat_flow_coefficients(vehicle_samples).items()}
+
+        # solar heat flow once per distinct geometry & obstacle
+        geometries = np.column_stack([np.broadcast_to(np.asarray(vehicle_samples[parameter], dtype=float),
+                                                      batch_samples)
+                                      for parameter in VEHICLE_PARAMETERS_SOLAR_ABSORPTION]
+                                     + [schedule_samples["obstacle_distance"], schedule_samples["obstacle_height"]])
+        geometries_unique, geometry_indices = np.unique(geometries, axis=0, return_inverse=True)
+        heat_solar = 1e-3 * simulate_solar_absorption_geometries_array(geometries_unique, solar_profile,
+                                                                       solar_integration)
+        heat_solar = heat_solar[geometry_indices.ravel()]
+
+        # vehicle temperatures & heat demand (all samples & hours at once)
+        heat_constant = (1e-3 * schedule_samples["passenger_number"] * HEAT_PERSON
+                         + coefficients["heating_power_auxiliary"])[:, np.newaxis] + heat_solar
+        conductance_linear = (coefficients["conductance_convection"]
+                              + coefficients["conductance_ventilation"])[:, np.newaxis]
+        coefficient_doors = coefficients["coefficient_doors"][:, np.newaxis]
+        temperature_vehicle = simulate_vehicle_temperatures_samples_array(
+            heating_temperature, cooling_temperature, temperature_environment, heat_constant, conductance_linear,
+            coefficient_doors)
+        heat_demand = -calculate_power_difference_derivative(temperature_vehicle, temperature_environment,
+                                                             heat_constant, conductance_linear, coefficient_doors)[0]
+
+        # dispatch heating & cooling devices, annual totals weighted by operation days and hours
+        electricity_demand = simulate_device_electricity_demand_array(
+            device_table, heat_demand.ravel(), np.tile(temperature_environment, batch_samples),
+            temperature_vehicle.ravel())[0].reshape(batch_samples, number_hours, -1)
+        electric_power_heat_pumps = np.sum(electricity_demand[:, :, 1:], axis=2)
+        demand_heating = heat_demand > 0
+        results[batch, 0] = np.sum(electricity_demand, axis=2) @ operation_weights
+        results[batch, 1] = (electricity_demand[:, :, 0]
+                             + np.where(demand_heating, electric_power_heat_pumps, 0)) @ operation_weights
+        results[batch, 2] = np.where(demand_heating, 0, electric_power_heat_pumps) @ operation_weights
+        results[batch, 3] = results[batch, 0] * schedule_samples["cost_electricity"]
+
+    return results
+
+
+
+def simulate_vehicle_samples_task(sample_task:tuple)->np.ndarray:
+    # (sample_task: arguments of simulate_vehicle_samples_array, e.g. for worker processes)
+    return simulate_vehicle_samples_array(*sample_task)
+
+
+
+def simulate_system_samples(operation_schedules:dict,
+                            vehicle_versions:dict,
+                            temperature_control_curves:dict,
+                            location_data:dict,
+                            parameter_factors:dict,
+                            number_samples:int,
+                            solar_integration:str=SOLAR_INTEGRATION_DEFAULT,
+                            solar_profiles:dict=None,
+                            hourly:bool=False,
+                            workers:int=SIMULATION_WORKERS_DEFAULT,
+                            vehicles:dict=None)->dict:
+    # annual electric energy (total, heating & cooling) and electricity cost per sample of each vehicle version in
+    # operation (keys: operation schedule, vehicle & version, arrays of shape samples x 4), steady state per hour
+    # (parameter_factors: see sample_parameter_factors; workers: number of worker processes, one task per vehicle
+    # version and operation schedule, split into chunks of samples if there are fewer tasks than workers;
+    # vehicles: base vehicle data per vehicle for vehicle versions given as parameter sets)
+    if solar_integration == "quad":
+        raise ValueError("The parameter samples require gauss-legendre solar integration.")
+    if vehicles is None:
+        vehicles = {}
+
+    compiled_curves = compile_temperature_control_curves(temperature_control_curves)
+    # admissible parameter ranges resolved here, worker processes do not load the parameter options
+    parameter_boundaries = {(group, parameter): dh.get_parameter_uncertainty_boundaries(group, parameter)
+                            for group, name, parameter in parameter_factors.keys()}
+    number_units = sum(len(vehicle_versions[vehicle_name]) for operation_schedule_data in operation_schedules.values()
+                       for vehicle_name in operation_schedule_data["vehicles_in_operation"].keys())
+    number_chunks = 1
+    if workers > 1 and number_units > 0:
+        number_chunks = max(1, min(number_samples, -(-workers // number_units)))
+    chunks = np.array_split(np.arange(number_samples), number_chunks)
+
+    sample_units = []
+    sample_tasks = []
+    for operation_schedule_name, operation_schedule_data in operation_schedules.items():
+        solar_profile = None
+        if solar_profiles is not None and operation_schedule_data["location"] in solar_profiles.keys():
+            solar_profile = solar_profiles[operation_schedule_data["location"]]
+        schedule_input = generate_schedule_input(operation_schedule_data,
+                                                 location_data[operation_schedule_data["location"]], solar_profile,
+                                                 hourly)
+        schedule_factors = {parameter: factors for (group, name, parameter), factors in parameter_factors.items()
+                            if group == "operation_schedule" and name == operation_schedule_name}
+        for vehicle_name in operation_schedule_data["vehicles_in_operation"].keys():
+            vehicle_factors = {parameter: factors for (group, name, parameter), factors in parameter_factors.items()
+                               if group == "vehicle" and name == vehicle_name}
+            for vehicle_version, vehicle_version_data in vehicle_versions[vehicle_name].items():
+                vehicle_data = get_vehicle_version_data(vehicle_version_data, vehicles.get(vehicle_name))
+                sample_units.append((operation_schedule_name, vehicle_name, vehicle_version))
+                for chunk in chunks:
+                    sample_tasks.append((vehicle_data, compiled_curves[vehicle_data["temperature_control_curve"]],
+                                         operation_schedule_data, schedule_input,
+                                         {parameter: factors[chunk] for parameter, factors in vehicle_factors.items()},
+                                         {parameter: factors[chunk] for parameter, factors in schedule_factors.items()},
+                                         parameter_boundaries, len(chunk), solar_integration))
+
+    if workers <= 1 or len(sample_tasks) <= 1:
+        sample_results = [simulate_vehicle_samples_task(sample_task) for sample_task in sample_tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(sample_tasks))) as executor:
+            sample_results = list(executor.map(simulate_vehicle_samples_task, sample_tasks))
+
+    return {sample_unit: np.vstack(sample_results[index * number_chunks:(index + 1) * number_chunks])
+            for index, sample_unit in enumerate(sample_units)}
+
+
+
+def calculate_sample_statistics(values:np.ndarray, percentiles:list)->Tuple[list,np.ndarray]:
+    # mean & percentiles over samples (axis 0), statistic names ("mean", "p5", ...) and values of shape
+    # statistics x quantities
+    statistic_names = ["mean"] + [f"p{percentile:g}" for percentile in percentiles]
+    statistic_values = np.vstack([np.mean(values, axis=0, keepdims=True),
+                                  np.percentile(values, percentiles, axis=0).reshape(len(percentiles), -1)])
+
+    return statistic_names, statistic_values
+
+
+
+def simulate_system_uncertainty(operation_schedules:dict,
+                                vehicle_versions:dict,
+                                temperature_control_curves:dict,
+                                location_data:dict,
+                                scenarios:dict,
+                                parameter_uncertainties:list,
+                                number_samples:int,
+                                seed:int=None,
+                                percentiles:list=None,
+                                solar_integration:str=SOLAR_INTEGRATION_DEFAULT,
+                                solar_profiles:dict=None,
+                                hourly:bool=False,
+                                workers:int=SIMULATION_WORKERS_DEFAULT,
+                                vehicles:dict=None)->Tuple[pd.DataFrame,pd.DataFrame]:
+    # mean & percentile bands of the annual totals of vehicle operation and scenarios (long format, one row per
+    # statistic) for parameters with uncertain values (parameter_uncertainties: group, name, parameter, distribution
+    # & relative_spread per uncertain parameter, see sample_parameter_factors; seed: seed of the random number
+    # generator for reproducible samples; vehicles: base vehicle data per vehicle, see simulate_system_samples)
+    if percentiles is None:
+        percentiles = UNCERTAINTY_PERCENTILES_DEFAULT
+
+    parameter_factors = sample_parameter_factors(parameter_uncertainties, number_samples, seed)
+    unit_samples = simulate_system_samples(operation_schedules, vehicle_versions, temperature_control_curves,
+                                           location_data, parameter_factors, number_samples, solar_integration,
+                                           solar_profiles, hourly, workers, vehicles)
+
+    # vehicle operation totals (ordered by operation schedule, vehicle and version)
+    version_labels = {(vehicle_name, vehicle_version):
+                          dh.convert_dictionary_to_str(vehicle_version_data["parameter_set"], keys_to_display_names=True)
+                      for vehicle_name, vehicle_versions_vehicle in vehicle_versions.items()
+                      for vehicle_version, vehicle_version_data in vehicle_versions_vehicle.items()}
+    totals_column_names = ["electric_energy_vehicle_operation_total", "electric_energy_vehicle_operation_heating_total",
+                           "electric_energy_vehicle_operation_cooling_total", "electricity_cost_vehicle_operation_total"]
+    totals_rows = []
+    for (operation_schedule_name, vehicle_name, vehicle_version), samples in unit_samples.items():
+        statistic_names, statistic_values = calculate_sample_statistics(samples, percentiles)
+        for statistic_name, values in zip(statistic_names, statistic_values):
+            totals_rows.append({
+                "operation_schedule": operation_schedule_name,
+                "vehicle_name": vehicle_name,
+                "vehicle_version_parameter_set": version_labels[(vehicle_name, vehicle_version)],
+                "number_of_vehicles": operation_schedules[operation_schedule_name]["vehicles_in_operation"]
+                [vehicle_name],
+                "statistic": statistic_name,
+                **dict(zip(totals_column_names, values))
+            })
+    df_vehicle_operation_totals_uncertainty = pd.DataFrame(
+        totals_rows, columns=["operation_schedule", "vehicle_name", "vehicle_version_parameter_set",
+                              "number_of_vehicles", "statistic"] + totals_column_names)
+    df_vehicle_operation_totals_uncertainty = df_vehicle_operation_totals_uncertainty.sort_values(
+        ["operation_schedule", "vehicle_name", "vehicle_version_parameter_set"], kind="stable", ignore_index=True)
+
+    # scenario totals (sum over the selected vehicle versions per sample)
+    version_names = {(vehicle_name, version_label): vehicle_version
+                     for (vehicle_name, vehicle_version), version_label in version_labels.items()}
+    scenario_column_names = ["electric_energy_scenario_total", "electric_energy_scenario_heating_total",
+                             "electric_energy_scenario_cooling_total", "electricity_cost_scenario_total"]
+    scenario_rows = []
+    for scenario_name, scenario_data in scenarios.items():
+        scenario_samples = np.zeros((number_samples, 4))
+        for operation_schedule_name, operation_schedule_data in operation_schedules.items():
+            for vehicle_name, vehicle_number in operation_schedule_data["vehicles_in_operation"].items():
+                if vehicle_number > 0:
+                    vehicle_version = version_names[(vehicle_name,
+                                                     scenario_data[f"{operation_schedule_name} - {vehicle_name}"])]
+                    scenario_samples += vehicle_number * unit_samples[(operation_schedule_name, vehicle_name,
+                                                                       vehicle_version)]
+        statistic_names, statistic_values = calculate_sample_statistics(scenario_samples, percentiles)
+        for statistic_name, values in zip(statistic_names, statistic_values):
+            scenario_rows.append({"scenario_name": scenario_name, "statistic": statistic_name,
+                                  **dict(zip(scenario_column_names, values))})
+    df_scenario_totals_uncertainty = pd.DataFrame(scenario_rows,
+                                                  columns=["scenario_name", "statistic"] + scenario_column_names)
+
+    rounding_digits = dh.get_decimal_digits(dh.get_parameter_option("results", "rounding_precision"))
+    df_vehicle_operation_totals_uncertainty = df_vehicle_operation_totals_uncertainty.round(rounding_digits)
+    df_scenario_totals_uncertainty = df_scenario_totals_uncertainty.round(rounding_digits)
+
+    return df_vehicle_operation_totals_uncertainty, df_scenario_totals_uncertainty
+
+
+
+# global sensitivity analysis (morris elementary effects & sobol indices of vehicle parameters)
+
+
+def generate_morris_design(number_parameters:int, number_trajectories:int, rng:np.random.Generator,
+                           levels:int=SENSITIVITY_MORRIS_LEVELS)->Tuple[np.ndarray,np.ndarray,np.ndarray]:
+    # one-at-a-time trajectories in the unit hypercube (points of shape trajectories * (parameters + 1) x parameters),
+    # each step changes one parameter (in random order) by +/- delta on a grid with the given levels, parameter
+    # indices & signed steps per trajectory & step (shape trajectories x parameters)
+    delta = levels / (2 * (levels - 1))
+    base = rng.integers(0, levels // 2, (number_trajectories, number_parameters)) / (levels - 1)
+    start_upper = rng.random((number_trajectories, number_parameters)) < 0.5
+    order = np.argsort(rng.random((number_trajectories, number_parameters)), axis=1)
+
+    points = np.zeros((number_trajectories, number_parameters + 1, number_parameters))
+    points[:, 0] = base + delta * start_upper
+    steps = np.where(np.take_along_axis(start_upper, order, axis=1), -delta, delta)
+    trajectories = np.arange(number_trajectories)
+    for step in range(number_parameters):
+        points[:, step + 1] = points[:, step]
+        points[trajectories, step + 1, order[:, step]] += steps[:, step]
+
+    return points.reshape(-1, number_parameters), order, steps
+
+
+
+def calculate_morris_indices(values:np.ndarray, number_parameters:int, order:np.ndarray, steps:np.ndarray)\
+        ->Tuple[np.ndarray,np.ndarray]:
+    # mean of absolute elementary effects (mu*) & standard deviation of elementary effects (sigma) per parameter,
+    # effects as output change per full parameter range (values of the morris design points)
+    differences = np.diff(values.reshape(-1, number_parameters + 1), axis=1)
+    effects = np.zeros_like(differences)
+    np.put_along_axis(effects, order, differences / steps, axis=1)
+
+    return np.mean(np.abs(effects), axis=0), np.std(effects, axis=0)
+
+
+
+def generate_sobol_design(number_parameters:int, number_base_samples:int, rng:np.random.Generator)->np.ndarray:
+    # saltelli design: matrices A, B & A with column i from B for each parameter i (points of shape
+    # base samples * (parameters + 2) x parameters), base samples from a scrambled sobol sequence
+    sampler = qmc.Sobol(2 * number_parameters, scramble=True, rng=rng)
+    samples = sampler.random_base2(int(np.log2(number_base_samples)))
+    matrix_a = samples[:, :number_parameters]
+    matrix_b = samples[:, number_parameters:]
+    matrices_ab = np.repeat(matrix_a[np.newaxis], number_parameters, axis=0)
+    matrices_ab[np.arange(number_parameters), :, np.arange(number_parameters)] = matrix_b.T
+
+    return np.vstack([matrix_a, matrix_b, matrices_ab.reshape(-1, number_parameters)])
+
+
+
+def calculate_sobol_indices(values:np.ndarray, number_parameters:int)->Tuple[np.ndarray,np.ndarray]:
+    # first order (saltelli 2010) & total (jansen) indices per parameter (values of the sobol design points)
+    values = values.reshape(number_parameters + 2, -1)
+    values_a, values_b, values_ab = values[0], values[1], values[2:]
+    variance = np.var(np.concatenate([values_a, values_b]))
+    if variance <= FLOAT_TOLERANCE:
+        return np.zeros(number_parameters), np.zeros(number_parameters)
+
+    first_order = np.mean(values_b * (values_ab - values_a), axis=1) / variance
+    total = 0.5 * np.mean((values_a - values_ab) ** 2, axis=1) / variance
+
+    return first_order, total
+
+
+
+def get_sensitivity_design_sizes(number_parameters:int, number_trajectories:int, number_base_samples:int,
+                                 evaluations_max:int)->Tuple[int,int]:
+    # number of morris trajectories & sobol base samples (power of 2) within the maximum number of evaluations,
+    # the sobol base samples are reduced first
+    number_trajectories = max(2, min(number_trajectories, evaluations_max // (2 * (number_parameters + 1))))
+    evaluations_sobol = evaluations_max - number_trajectories * (number_parameters + 1)
+    number_base_samples = min(number_base_samples, evaluations_sobol // (number_parameters + 2))
+    if number_base_samples < 2:
+        raise ValueError(f"The maximum number of evaluations ({evaluations_max}) is too small for the sensitivity "
+                         f"analysis of {number_parameters} parameters.")
+
+    return number_trajectories, 2 ** int(np.log2(number_base_samples))
+
+
+
+def simulate_system_sensitivity(operation_schedules:dict,
+                                vehicles:dict,
+                                temperature_control_curves:dict,
+                                location_data:dict,
+                                number_trajectories:int,
+                                number_base_samples:int,
+                                relative_range:float=SENSITIVITY_RELATIVE_RANGE_DEFAULT,
+                                evaluations_max:int=SENSITIVITY_EVALUATIONS_MAX_DEFAULT,
+                                seed:int=None,
+                                solar_integration:str=SOLAR_INTEGRATION_DEFAULT,
+                                solar_profiles:dict=None,
+                                hourly:bool=False,
+                                workers:int=SIMULATION_WORKERS_DEFAULT)->pd.DataFrame:
+    # morris elementary effects & sobol indices of the annual electric energy of all vehicles of a type in operation
+    # (sum over operation schedules) for all numeric vehicle parameters, varied uniformly within the relative range
+    # around the specified value (limited to the admissible range), ranked by the total sobol index per vehicle
+    # (both designs are evaluated as parameter samples in one run, see simulate_system_samples)
+    rng = np.random.default_rng(seed)
+    parameters = dh.get_uncertainty_parameter_names("vehicle")
+    number_parameters = len(parameters)
+    number_trajectories, number_base_samples = get_sensitivity_design_sizes(
+        number_parameters, number_trajectories, number_base_samples, evaluations_max)
+
+    morris_points, morris_order, morris_steps = generate_morris_design(number_parameters, number_trajectories, rng)
+    sobol_points = generate_sobol_design(number_parameters, number_base_samples, rng)
+    points = np.vstack([morris_points, sobol_points])
+
+    sensitivity_rows = []
+    for vehicle_name, vehicle_data in vehicles.items():
+        operation_schedules_vehicle = {
+            operation_schedule_name: {**operation_schedule_data,
+                                      "vehicles_in_operation": {vehicle_name: operation_schedule_data[
+                                          "vehicles_in_operation"][vehicle_name]}}
+            for operation_schedule_name, operation_schedule_data in operation_schedules.items()
+            if operation_schedule_data["vehicles_in_operation"].get(vehicle_name, 0) > 0}
+        if len(operation_schedules_vehicle) == 0:
+            continue
+
+        # parameter factors of the design points (relative to the specified values)
+        values = np.array([float(vehicle_data[parameter]) for parameter in parameters])
+        boundaries = np.array([dh.get_parameter_uncertainty_boundaries("vehicle", parameter)
+                               for parameter in parameters])
+        values_min = np.maximum(boundaries[:, 0], values * (1 - relative_range))
+        values_max = np.minimum(boundaries[:, 1], values * (1 + relative_range))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            factors = np.where(values != 0, (values_min + points * (values_max - values_min)) / values, 1.0)
+        parameter_factors = {("vehicle", vehicle_name, parameter): factors[:, index]
+                             for index, parameter in enumerate(parameters)}
+
+        unit_samples = simulate_system_samples(
+            operation_schedules_vehicle, {vehicle_name: {"default": {"parameter_set": {}}}},
+            temperature_control_curves, location_data, parameter_factors, len(points), solar_integration,
+            solar_profiles, hourly, workers, {vehicle_name: vehicle_data})
+        energy = sum(operation_schedules_vehicle[operation_schedule_name]["vehicles_in_operation"][vehicle_name]
+                     * samples[:, 0] for (operation_schedule_name, _, _), samples in unit_samples.items())
+
+        morris_mu_star, morris_sigma = calculate_morris_indices(energy[:len(morris_points)], number_parameters,
+                                                                morris_order, morris_steps)
+        sobol_first_order, sobol_total = calculate_sobol_indices(energy[len(morris_points):], number_parameters)
+
+        rows_vehicle = [{
+            "vehicle_name": vehicle_name,
+            "parameter": dh.get_parameter_option("parameters_vehicle", parameter),
+            "value": values[index],
+            "value_min": values_min[index],
+            "value_max": values_max[index],
+            "morris_mu_star": morris_mu_star[index],
+            "morris_sigma": morris_sigma[index],
+            "sobol_first_order": sobol_first_order[index],
+            "sobol_total": sobol_total[index]
+        } for index, parameter in enumerate(parameters)]
+        rows_vehicle.sort(key=lambda row: (-row["sobol_total"], -row["morris_mu_star"]))
+        for rank, row in enumerate(rows_vehicle, start=1):
+            sensitivity_rows.append({"rank": rank, **row})
+
+    df_sensitivity = pd.DataFrame(sensitivity_rows, columns=[
+        "vehicle_name", "rank", "parameter", "value", "value_min", "value_max", "morris_mu_star", "morris_sigma",
+        "sobol_first_order", "sobol_total"])
+
+    rounding_digits = dh.get_decimal_digits(dh.get_parameter_option("results", "rounding_precision"))
+    df_sensitivity[["morris_mu_star", "morris_sigma"]] = df_sensitivity[["morris_mu_star", "morris_sigma"]].round(
+        rounding_digits)
 
-    return df_vehicle_results, df_vehicle_operation_totals, df_scenario_totals, demand_not_satisfied_warning
\ No newline at end of file
+    return df_sensitivity